@@ -0,0 +1,473 @@
+"""
+Throughput of the ``DB`` layer on in-memory SQLite and a local PostgreSQL.
+
+Every case times one ``DB`` method on a generated table, sweeping the number of
+rows, of value columns and the batch size of the write methods:
+
+- ``insert``: ``DB.insert`` of row dicts, one call per batch
+- ``bulk_insert``: ``DB.bulk_insert`` of Arrow tables, one call per batch
+  (PostgreSQL only, as ADBC is only wired up for it)
+- ``merge``: ``DB.merge`` of a staging table with half of its keys in the target
+- ``select`` / ``fetch_all``: every row of the table
+
+Each case runs in a fresh interpreter. Its memory is the peak RSS reached while
+the method runs above the RSS just before it, so generating the data and the
+untimed setup are left out. Statements are the cursor executions SQLAlchemy
+makes plus ADBC ingest calls, and connections are pool checkouts plus ADBC
+connects; both are counted only while the method runs, after the table has been
+reflected. Cases whose setup and run
+time, projected from the previous size, exceeds `--budget` seconds are skipped.
+PostgreSQL is skipped if it is unreachable.
+
+Usage:
+    python benchmarks/db_throughput.py                          # full sweep
+    python benchmarks/db_throughput.py --backend sqlite --rows 1000 100000
+    python benchmarks/db_throughput.py --json db.json --baseline old.json
+"""
+
+import argparse
+import json
+import platform
+import resource
+import subprocess
+import sys
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import UTC, datetime
+from itertools import cycle, product
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Bump when the result fields or their meaning change; baselines of another
+# format are not compared
+FORMAT_VERSION = 2
+
+BACKENDS = ("sqlite", "postgres")
+OPS = ("insert", "bulk_insert", "merge", "select", "fetch_all")
+# Methods that write in batches; the others run once per size
+BATCHED_OPS = ("insert", "bulk_insert")
+
+
+@dataclass(frozen=True)
+class Case:
+    backend: str
+    op: str
+    rows: int
+    columns: int
+    batch: int | None = None
+
+    @property
+    def key(self) -> str:
+        return f"{self.backend}/{self.op}/{self.rows}/{self.columns}/{self.batch}"
+
+
+@dataclass(frozen=True)
+class Result:
+    case: Case
+    # "ok", "skipped" or "error"
+    status: str
+    seconds: float = 0.0
+    rows_per_sec: float = 0.0
+    statements: int = 0
+    connections: int = 0
+    # Peak RSS during the timed call above the RSS before it
+    call_rss_mb: float = 0.0
+    # Data generation and table setup before the timed call
+    setup_seconds: float = 0.0
+    error: str = ""
+
+
+def generate(rows: int, columns: int, start: int = 0):
+    """
+    Arrow table with an ``id`` key from `start` and `columns` value columns
+    cycling through float, integer and text.
+    """
+    import numpy as np
+    import pyarrow as pa
+
+    rng = np.random.default_rng(start)
+    ids = np.arange(start, start + rows, dtype=np.int64)
+    data = {"id": pa.array(ids)}
+    for i, kind in zip(range(columns), cycle("fit"), strict=False):
+        if kind == "f":
+            data[f"c{i}"] = pa.array(rng.standard_normal(rows))
+        elif kind == "i":
+            data[f"c{i}"] = pa.array(rng.integers(0, 1 << 40, rows))
+        else:
+            data[f"c{i}"] = pa.array(ids.astype(str))
+    return pa.table(data)
+
+
+def create_table(db, name: str, columns: int) -> None:
+    from sqlalchemy import BigInteger, Column, Float, MetaData, String, Table
+
+    types = {"f": Float, "i": BigInteger, "t": lambda: String(32)}
+    metadata = MetaData()
+    Table(
+        name,
+        metadata,
+        Column("id", BigInteger, primary_key=True, autoincrement=False),
+        *[
+            Column(f"c{i}", types[kind]())
+            for i, kind in zip(range(columns), cycle("fit"), strict=False)
+        ],
+    )
+    metadata.drop_all(db.get_engine())
+    metadata.create_all(db.get_engine())
+
+
+def load(db, name: str, data) -> None:
+    """Untimed setup load, through the fastest path of the backend."""
+    if db.dialect == "postgresql":
+        db.bulk_insert(name, data)
+    else:
+        db.insert(name, data.to_pylist())
+
+
+def current_rss() -> int:
+    """
+    Resident set size in bytes. Where the current RSS is not exposed (macOS) this
+    is the peak so far, which makes `sample_rss` report only growth of the peak.
+    """
+    try:
+        with Path("/proc/self/statm").open() as f:
+            return int(f.read().split()[1]) * resource.getpagesize()
+    except FileNotFoundError:
+        # Kilobytes on Linux, bytes on macOS
+        scale = 1 if sys.platform == "darwin" else 1 << 10
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+@contextmanager
+def sample_rss(interval: float = 0.002) -> Iterator[dict[str, float]]:
+    """
+    Samples the RSS from a thread within the block and sets ``mb`` to its peak
+    above the RSS on entry.
+    """
+    before = current_rss()
+    peak = before
+    done = threading.Event()
+
+    def sample() -> None:
+        nonlocal peak
+        while not done.wait(interval):
+            peak = max(peak, current_rss())
+
+    result = {"mb": 0.0}
+    thread = threading.Thread(target=sample, daemon=True)
+    thread.start()
+    try:
+        yield result
+    finally:
+        done.set()
+        thread.join()
+        peak = max(peak, current_rss())
+        result["mb"] = (peak - before) / (1 << 20)
+
+
+@contextmanager
+def count_round_trips(db) -> Iterator[dict[str, int]]:
+    """Counts statements and connections made through `db` within the block."""
+    from sqlalchemy import event
+
+    counts = {"statements": 0, "connections": 0}
+    engine = db.get_engine()
+
+    def on_execute(*_) -> None:
+        counts["statements"] += 1
+
+    def on_checkout(*_) -> None:
+        counts["connections"] += 1
+
+    get_adbc_conn = db.get_adbc_conn
+
+    def counting_adbc_conn():
+        counts["connections"] += 1
+        return get_adbc_conn()
+
+    event.listen(engine, "before_cursor_execute", on_execute)
+    event.listen(engine.pool, "checkout", on_checkout)
+    db.get_adbc_conn = counting_adbc_conn
+    try:
+        yield counts
+    finally:
+        del db.get_adbc_conn
+        event.remove(engine, "before_cursor_execute", on_execute)
+        event.remove(engine.pool, "checkout", on_checkout)
+
+
+def prepare(db, case: Case, name: str) -> tuple[Callable[[], None], int]:
+    """
+    Sets up the tables of `case` and returns the timed call and the number of
+    ADBC ingest calls it makes.
+    """
+    from sqlalchemy import text
+
+    data = generate(case.rows, case.columns)
+    create_table(db, name, case.columns)
+    batch = case.batch or case.rows
+    chunks = [data.slice(i, batch) for i in range(0, case.rows, batch)]
+
+    if case.op == "insert":
+        batches = [chunk.to_pylist() for chunk in chunks]
+        return lambda: [db.insert(name, values) for values in batches], 0
+    if case.op == "bulk_insert":
+        return lambda: [db.bulk_insert(name, chunk) for chunk in chunks], len(chunks)
+    if case.op == "merge":
+        load(db, name, data)
+        staging = f"{name}_staging"
+        create_table(db, staging, case.columns)
+        # Half of the keys update existing rows, half insert new ones
+        load(db, staging, generate(case.rows, case.columns, start=case.rows // 2))
+        return lambda: db.merge(staging, name), 0
+    load(db, name, data)
+    if case.op == "select":
+        return lambda: db.select(name), 0
+    return lambda: db.fetch_all(text(f"SELECT * FROM {name}")), 0
+
+
+def run_case(case: Case, postgres_url: str) -> Result:
+    """Runs `case` in this process."""
+    from sqlalchemy import text
+
+    from app.common.database import DB
+
+    db = DB("sqlite:///:memory:" if case.backend == "sqlite" else postgres_url)
+    name = f"bench_{case.op}"
+    started = time.perf_counter()
+    fn, ingests = prepare(db, case, name)
+    # Reflect outside the timed call, as long-lived callers have it cached
+    db.get_table(name)
+    setup = time.perf_counter() - started
+    try:
+        with count_round_trips(db) as counts, sample_rss() as rss:
+            started = time.perf_counter()
+            fn()
+            seconds = time.perf_counter() - started
+    finally:
+        for table in (f"{name}_staging", name):
+            db.raw_query(text(f"DROP TABLE IF EXISTS {table}"))
+    return Result(
+        case,
+        "ok",
+        seconds,
+        case.rows / seconds,
+        counts["statements"] + ingests,
+        counts["connections"],
+        rss["mb"],
+        setup,
+    )
+
+
+def spawn(case: Case, postgres_url: str) -> Result:
+    """Runs `case` in a new interpreter and parses the result it prints."""
+    proc = subprocess.run(
+        [
+            sys.executable,
+            __file__,
+            "--case",
+            json.dumps(asdict(case)),
+            "--postgres-url",
+            postgres_url,
+        ],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if proc.returncode != 0:
+        return Result(case, "error", error=proc.stderr[-2000:])
+    return Result(**{**json.loads(proc.stdout.splitlines()[-1]), "case": case})
+
+
+def postgres_available(url: str) -> bool:
+    from sqlalchemy import create_engine, text
+
+    engine = create_engine(url)
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+    except Exception as e:
+        print(f"PostgreSQL unavailable, skipping it: {e}", file=sys.stderr)
+        return False
+    finally:
+        engine.dispose()
+    return True
+
+
+def cases(args: argparse.Namespace) -> list[Case]:
+    """The sweep, smallest sizes first so the budget can skip larger ones."""
+    result = []
+    for rows, backend, op, columns in product(
+        sorted(args.rows),
+        args.backend,
+        args.op,
+        args.columns,
+    ):
+        if op == "bulk_insert" and backend != "postgres":
+            continue
+        batches: list[int | None] = [None]
+        if op in BATCHED_OPS:
+            batches = [b for b in sorted(args.batch) if b < rows] or [rows]
+        result.extend(Case(backend, op, rows, columns, b) for b in batches)
+    return result
+
+
+def run(args: argparse.Namespace, baseline: dict[str, dict]) -> list[Result]:
+    results = []
+    # Last measured (rows, seconds) of each sweep line, for the budget
+    previous: dict[tuple, tuple[int, float]] = {}
+    for case in cases(args):
+        line = (case.backend, case.op, case.columns, case.batch or "rows")
+        rows, seconds = previous.get(line, (case.rows, 0.0))
+        if seconds * case.rows / rows > args.budget:
+            result = Result(case, "skipped")
+        else:
+            result = spawn(case, args.postgres_url)
+            previous[line] = (case.rows, result.setup_seconds + result.seconds)
+        results.append(result)
+        print(format_result(result, baseline.get(case.key)), flush=True)
+    return results
+
+
+def format_result(result: Result, before: dict | None) -> str:
+    c = result.case
+    head = f"{c.backend:<9} {c.op:<12} {c.rows:>9} {c.columns:>4} {c.batch or '-':>7}"
+    if result.status != "ok":
+        reason = result.error.strip().splitlines()[-1:] or [""]
+        return f"{head}  {result.status} {reason[0]}"
+    compared = before is not None and before["status"] == "ok"
+    shown = f"{before['rows_per_sec']:12,.0f}" if compared else f"{'-':>12}"
+    return (
+        f"{head} {result.seconds:9.3f} {result.rows_per_sec:12,.0f} {shown} "
+        f"{result.statements:6} {result.connections:5} {result.call_rss_mb:8.1f}"
+    )
+
+
+def compare(
+    results: list[Result],
+    baseline: dict[str, dict],
+    threshold: float,
+) -> list[str]:
+    """Keys of the cases slower than `baseline`, or making more round trips."""
+    regressions = []
+    for r in results:
+        before = baseline.get(r.case.key)
+        if r.status != "ok" or before is None or before["status"] != "ok":
+            continue
+        # The absolute margin ignores noise on cases that run in milliseconds
+        limit = max(before["seconds"] * (1 + threshold), before["seconds"] + 0.02)
+        more_trips = (
+            r.statements > before["statements"] or r.connections > before["connections"]
+        )
+        if r.seconds > limit or more_trips:
+            regressions.append(r.case.key)
+    return regressions
+
+
+def read_baseline(path: Path) -> dict[str, dict]:
+    saved = json.loads(path.read_text())
+    if saved.get("format") != FORMAT_VERSION:
+        msg = f"{path} has format {saved.get('format')}, expected {FORMAT_VERSION}"
+        raise ValueError(msg)
+    return {Case(**r["case"]).key: r for r in saved["results"]}
+
+
+def write_results(path: Path, results: list[Result]) -> None:
+    revision = subprocess.run(
+        ["git", "rev-parse", "--short", "HEAD"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=False,
+    ).stdout.strip()
+    import sqlalchemy
+
+    path.write_text(
+        json.dumps(
+            {
+                "format": FORMAT_VERSION,
+                "created_at": datetime.now(UTC).isoformat(),
+                "revision": revision,
+                "python": platform.python_version(),
+                "sqlalchemy": sqlalchemy.__version__,
+                "platform": platform.platform(),
+                "results": [asdict(r) for r in results],
+            },
+            indent=2,
+        ),
+    )
+
+
+def main() -> int:
+    from app import config
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--backend", nargs="+", choices=BACKENDS, default=BACKENDS)
+    parser.add_argument("--op", nargs="+", choices=OPS, default=OPS)
+    parser.add_argument(
+        "--rows",
+        nargs="+",
+        type=int,
+        default=[1_000, 10_000, 100_000, 1_000_000, 10_000_000],
+    )
+    parser.add_argument("--columns", nargs="+", type=int, default=[4, 16])
+    parser.add_argument(
+        "--batch",
+        nargs="+",
+        type=int,
+        default=[1_000, 10_000, 100_000],
+        help="Rows per call of the batched methods",
+    )
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=120.0,
+        help="Skip cases projected to take longer, in seconds",
+    )
+    parser.add_argument("--postgres-url", default=config.POSTGRES_URL)
+    parser.add_argument("--json", type=Path, help="Write the results to this file")
+    parser.add_argument("--baseline", type=Path, help="Results file to compare with")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="Relative slowdown against the baseline reported as a regression",
+    )
+    parser.add_argument("--case", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case:
+        case = Case(**json.loads(args.case))
+        result = asdict(run_case(case, args.postgres_url))
+        del result["case"]
+        print(json.dumps(result))
+        return 0
+
+    baseline = read_baseline(args.baseline) if args.baseline else {}
+    if "postgres" in args.backend and not postgres_available(args.postgres_url):
+        args.backend = [b for b in args.backend if b != "postgres"]
+
+    print(
+        f"{'backend':<9} {'op':<12} {'rows':>9} {'cols':>4} {'batch':>7} "
+        f"{'seconds':>9} {'rows/s':>12} {'baseline':>12} {'stmts':>6} "
+        f"{'conns':>5} {'+rss MB':>8}",
+    )
+    results = run(args, baseline)
+    regressions = compare(results, baseline, args.threshold)
+
+    if args.json:
+        write_results(args.json, results)
+    errors = [r.case.key for r in results if r.status == "error"]
+    if errors:
+        print(f"Failed: {', '.join(errors)}", file=sys.stderr)
+    if regressions:
+        print(f"Slower than baseline: {', '.join(regressions)}", file=sys.stderr)
+    return 1 if errors or regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
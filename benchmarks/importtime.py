@@ -0,0 +1,137 @@
+"""
+Cold-import time of every ``app`` module, measured with ``python -X importtime``.
+
+Each module is imported in a fresh interpreter, `--repeat` times, and the fastest
+run is kept. The report lists the cumulative import time of each module and the
+slowest third-party packages it pulled in.
+
+Usage:
+    python benchmarks/importtime.py                       # all modules
+    python benchmarks/importtime.py app app.common.utils  # selected modules
+    python benchmarks/importtime.py --json importtime.json --baseline old.json
+"""
+
+import argparse
+import json
+import pkgutil
+import re
+import subprocess
+import sys
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+
+# import time:   self [us] | cumulative | imported package
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+@dataclass(frozen=True)
+class ImportTime:
+    module: str
+    seconds: float
+    # Slowest packages imported directly by ``app`` modules, cumulative seconds
+    heaviest: dict[str, float] = field(default_factory=dict)
+
+
+def app_modules() -> list[str]:
+    """All modules of the ``app`` package, without importing them."""
+    modules = ["app"]
+    for info in pkgutil.walk_packages([str(SRC / "app")], prefix="app."):
+        if not info.name.rsplit(".", 1)[-1].startswith("__"):
+            modules.append(info.name)
+    return sorted(modules)
+
+
+def measure(module: str, top: int = 5) -> ImportTime:
+    """Imports `module` in a new interpreter and parses its importtime trace."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if proc.returncode != 0:
+        msg = f"import {module} failed:\n{proc.stderr[-2000:]}"
+        raise RuntimeError(msg)
+
+    # Children are printed before their parent, so walk the trace backwards and
+    # keep the chain of enclosing imports; only lines under `module` count
+    total = 0
+    packages: dict[str, int] = {}
+    chain: list[str] = []
+    for line in reversed(proc.stderr.splitlines()):
+        match = _LINE.match(line)
+        if match is None:
+            continue
+        _, cumulative, indent, name = match.groups()
+        depth = len(indent) // 2
+        del chain[depth:]
+        chain.append(name)
+        if depth == 0:
+            if name == module:
+                total = int(cumulative)
+            continue
+        if chain[0] != module:
+            continue
+        # Charge third-party packages to the app module that imported them
+        root = name.split(".")[0]
+        if root != "app" and chain[-2].split(".")[0] == "app":
+            packages[root] = packages.get(root, 0) + int(cumulative)
+    heaviest = sorted(packages.items(), key=lambda kv: kv[1], reverse=True)[:top]
+    return ImportTime(module, total / 1e6, {k: v / 1e6 for k, v in heaviest})
+
+
+def run(modules: list[str], repeat: int) -> list[ImportTime]:
+    results = []
+    for module in modules:
+        best = min((measure(module) for _ in range(repeat)), key=lambda r: r.seconds)
+        results.append(best)
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("modules", nargs="*", help="Modules to measure; all by default")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per module")
+    parser.add_argument("--json", type=Path, help="Write the results to this file")
+    parser.add_argument("--baseline", type=Path, help="Results file to compare with")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="Relative slowdown against the baseline reported as a regression",
+    )
+    args = parser.parse_args()
+
+    results = run(args.modules or app_modules(), args.repeat)
+    baseline = {}
+    if args.baseline:
+        baseline = {
+            r["module"]: r["seconds"] for r in json.loads(args.baseline.read_text())
+        }
+
+    regressions = []
+    print(f"{'module':<40} {'seconds':>8} {'baseline':>9}  heaviest imports")
+    for r in results:
+        before = baseline.get(r.module)
+        heaviest = ", ".join(f"{k} {v:.2f}" for k, v in r.heaviest.items())
+        shown = f"{before:9.3f}" if before is not None else f"{'-':>9}"
+        print(f"{r.module:<40} {r.seconds:8.3f} {shown}  {heaviest}")
+        if before is None:
+            continue
+        # The absolute margin ignores noise on modules that import in milliseconds
+        limit = max(before * (1 + args.threshold), before + 0.02)
+        if r.seconds > limit:
+            regressions.append(r.module)
+
+    if args.json:
+        args.json.write_text(json.dumps([asdict(r) for r in results], indent=2))
+    if regressions:
+        print(f"Slower than baseline: {', '.join(regressions)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,2 +1,46 @@
-from ._config import config
+"""
+Importing ``app`` or any of its modules has no side effects: `config` reads the
+settings on first attribute access, logging is configured when the first record
+is logged, and subpackages are imported when first accessed as attributes.
+"""
+
+from typing import TYPE_CHECKING
+
+from ._lazy import LazyObject, attach
+
+if TYPE_CHECKING:
+    from ._config import Config
+
+
+def _get_config() -> "Config":
+    from ._config import get_config
+
+    return get_config()
+
+
+# Defined before `_logger` is imported, which uses it
+config: "Config" = LazyObject(_get_config)  # type: ignore[assignment]
+
 from ._logger import get_logger, log
+
+__getattr__, _dir, _subpackages = attach(
+    __name__,
+    [
+        "analytics",
+        "backtest",
+        "common",
+        "flows",
+        "mkt_data",
+        "options",
+        "portfolio",
+        "risk",
+        "ui",
+    ],
+)
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *_dir()})
+
+
+__all__ = ["config", "get_logger", "log", *_subpackages]
@@ -1,3 +1,7 @@
+from functools import cache
+from pathlib import Path
+from typing import Literal
+
 from pydantic import ConfigDict, DirectoryPath, Field
 from pydantic_settings import BaseSettings
 
@@ -9,18 +13,45 @@ class Config(BaseSettings):
         ...,
         description="Logging level (DEBUG, INFO, WARNING, ERROR)",
     )
+    LOG_FORMAT: Literal["text", "json"] = Field(
+        "text",
+        description="Log line format for the console and file handlers",
+    )
+    LOG_LEVELS: dict[str, str] = Field(
+        default_factory=dict,
+        description='Per-logger levels as JSON, e.g. {"app.common.database": "WARNING"}',
+    )
     POSTGRES_URL: str = Field(..., description="PostgreSQL connection URL")
     LOG_DIR: DirectoryPath = Field(
         description="Directory for log files",
     )
     DBT_PROFILES_DIR: DirectoryPath
     DBT_PROJECT_DIR: DirectoryPath
+    REPORTS_DIR: Path = Field(
+        default_factory=lambda data: data.get("LOG_DIR", Path()) / "reports",
+        description="Root of the materialized report snapshots read by the UI, "
+        "LOG_DIR/reports by default",
+    )
+    SMTP_HOST: str = Field("localhost", description="SMTP relay host")
+    SMTP_PORT: int = Field(25, description="SMTP relay port")
+    SMTP_USER: str | None = Field(None, description="SMTP login, if required")
+    SMTP_PASSWORD: str | None = Field(None, description="SMTP password")
+    SMTP_STARTTLS: bool = Field(False, description="Upgrade connections with STARTTLS")
     model_config = ConfigDict(
         frozen=True,
     )  # type: ignore
 
 
-config = Config()  # type: ignore
+@cache
+def get_config() -> Config:
+    """
+    Loads the config on first call and returns the same instance afterwards.
+
+    `app.config` forwards to this, so settings are only read, and validated, when
+    one of them is first used.
+    """
+    return Config()  # type: ignore
+
 
 if __name__ == "__main__":
-    print(config)
+    print(get_config())
@@ -0,0 +1,70 @@
+"""
+Helpers that defer work from import time to first use.
+
+`attach` gives a package PEP 562 ``__getattr__`` and ``__dir__`` functions that
+import its submodules when they are first accessed as attributes, and
+`LazyObject` stands in for an object that is only created on first attribute
+access.
+"""
+
+import importlib
+from collections.abc import Callable, Iterable
+from types import ModuleType
+from typing import Any
+
+
+def attach(
+    package: str,
+    submodules: Iterable[str],
+) -> tuple[Callable[[str], ModuleType], Callable[[], list[str]], list[str]]:
+    """
+    Makes the `submodules` of `package` available as lazily imported attributes.
+
+    Usage, in the package's ``__init__.py``::
+
+        __getattr__, __dir__, __all__ = attach(__name__, ["cache", "loader"])
+
+    Args:
+        package (str): The package's ``__name__``.
+        submodules (Iterable[str]): Names of the submodules to expose.
+
+    Returns:
+        tuple: The package's ``__getattr__``, ``__dir__`` and ``__all__``.
+    """
+    names = sorted(submodules)
+    known = frozenset(names)
+
+    def __getattr__(name: str) -> ModuleType:  # noqa: N807
+        if name in known:
+            # Importing binds the submodule on the package, so this runs once
+            return importlib.import_module(f"{package}.{name}")
+        msg = f"module {package!r} has no attribute {name!r}"
+        raise AttributeError(msg)
+
+    def __dir__() -> list[str]:  # noqa: N807
+        return list(names)
+
+    return __getattr__, __dir__, list(names)
+
+
+class LazyObject:
+    """
+    Proxy that forwards attribute access to the object returned by `factory`.
+
+    `factory` is called on every access, so it should cache its result (e.g. with
+    `functools.cache`); nothing is created until an attribute is first read.
+    """
+
+    __slots__ = ("_factory",)
+
+    def __init__(self, factory: Callable[[], Any]) -> None:
+        self._factory = factory
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._factory(), name)
+
+    def __dir__(self) -> list[str]:
+        return dir(self._factory())
+
+    def __repr__(self) -> str:
+        return repr(self._factory())
@@ -1,31 +1,90 @@
+import atexit
+import json
 import logging
 import logging.config
 import threading
+from logging.handlers import QueueHandler
 from typing import Any
 
-from concurrent_log_handler import ConcurrentRotatingFileHandler  # noqa: F401
-
 from app import config
 
+# Attributes every LogRecord has; anything else was passed through `extra`
+_RECORD_ATTRS = frozenset(
+    logging.LogRecord("", 0, "", 0, "", None, None).__dict__,
+) | {"message", "asctime", "taskName"}
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as one JSON object per line, including `extra` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload: dict[str, Any] = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "module": record.module,
+            "process": record.process,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        payload.update(
+            (key, value)
+            for key, value in record.__dict__.items()
+            if key not in _RECORD_ATTRS
+        )
+        return json.dumps(payload, default=str)
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    Enqueues records without formatting them.
+
+    The stock `QueueHandler.prepare` merges the message and arguments and renders
+    tracebacks on the calling thread so records can be pickled. Records here stay
+    in-process, so all formatting is left to the listener thread; arguments are
+    rendered when the record is handled, not when it is logged.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def set_levels(levels: dict[str, str]) -> None:
+    """
+    Sets per-logger levels, e.g. ``{"app.common.database": "WARNING"}``. Module
+    loggers from `get_logger(__name__)` inherit the ``app`` level unless set here.
+    """
+    for name, level in levels.items():
+        logging.getLogger(name).setLevel(level.upper())
+
 
-@lambda _: _()
-def setup_logging():
+def setup_logging() -> QueueHandler:
     """
-    Initializes and configures the logging system for the application.
+    Initializes and configures the logging system for the application, once.
 
-    This function sets up both console and rotating file handlers with a simple log format.
-    It uses a thread lock to ensure thread-safe configuration. The file handler writes logs
-    to a specified file with rotation based on file size and backup count. The configuration
-    disables the removal of existing loggers and applies the settings using Python's
-    logging configuration dictionary.
+    Called by the ``app`` logger when it handles its first record, so importing a
+    module does not read the config or open the log file. Console and rotating
+    file handlers are configured with dictConfig but are not attached to any
+    logger. The ``app`` logger gets a queue handler instead, and a listener thread
+    drains the queue into the console and file handlers, so the logging thread
+    only creates and enqueues a record. The listener is stopped, flushing pending
+    records, at interpreter exit. `config.LOG_FORMAT` selects text or JSON output
+    and `config.LOG_LEVELS` sets per-module levels.
+
+    Returns:
+        QueueHandler: The handler attached to the ``app`` logger.
 
     Raises:
-        Exception: If the logging configuration fails to apply.
+        Exception: If the config cannot be loaded or the logging configuration
+            fails to apply.
     """
+    global _queue_handler
+    with _setup_lock:
+        if _queue_handler is not None:
+            return _queue_handler
 
-    print("Initializing logging configuration")
-    lock = threading.Lock()
-    with lock:
         _logging_config: dict[str, Any] = {
             "version": 1,
             "disable_existing_loggers": False,
@@ -35,6 +94,9 @@ def setup_logging():
                         "[%(asctime)s] [%(levelname)s] [%(name)s] [%(process)d] [%(module)s] %(message)s"
                     ),
                 },
+                "json": {
+                    "()": JsonFormatter,
+                },
             },
             "handlers": {
                 "console": {
@@ -50,42 +112,106 @@ def setup_logging():
                     "backupCount": 5,
                     "maxBytes": int(1e6 * 10),  # 10MB
                 },
+                # Attached to the app logger; its listener thread feeds the
+                # console and file handlers
+                "queue": {
+                    "class": DeferredQueueHandler,
+                    "handlers": ["console", "file"],
+                    "respect_handler_level": True,
+                },
             },
         }
+        if config.LOG_FORMAT == "json":
+            for name in ("console", "file"):
+                _logging_config["handlers"][name]["formatter"] = "json"
         logging.config.dictConfig(_logging_config)
 
+        handler: QueueHandler = logging.getHandlerByName("queue")  # type: ignore[assignment]
+        handler.listener.start()  # type: ignore[union-attr]
+        atexit.register(handler.listener.stop)  # type: ignore[union-attr]
+
+        logger = logging.getLogger("app")
+        # A new list: a logger may be iterating over the old one right now
+        logger.handlers = [
+            h for h in logger.handlers if not isinstance(h, _SetupOnFirstRecord)
+        ] + [handler]
+        logger.setLevel(config.LOG_LEVEL)
+        set_levels(config.LOG_LEVELS)
+        _queue_handler = handler
+        logger.debug("Logging configured with %s output", config.LOG_FORMAT)
+        return handler
+
+
+class _SetupOnFirstRecord(logging.Handler):
+    """
+    Placeholder on the ``app`` logger that runs `setup_logging` when the first
+    record arrives, then passes that record on to the queue handler if the
+    configured levels allow it. If setup fails, the error is reported once and
+    the ``app`` logger falls back to the stdlib defaults.
+    """
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        logger = logging.getLogger("app")
+        try:
+            handler = setup_logging()
+        except Exception:
+            logger.removeHandler(self)
+            logger.setLevel(logging.NOTSET)
+            self.handleError(record)
+            return False
+        if logging.getLogger(record.name).isEnabledFor(record.levelno):
+            return bool(handler.handle(record))
+        return False
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.handle(record)
+
+
+_setup_lock = threading.RLock()
+_queue_handler: QueueHandler | None = None
+
 
 def get_logger(
     name: str = "app",
-    level: str = config.LOG_LEVEL,
+    level: str | None = None,
     handlers: list[str] | None = None,
 ) -> logging.Logger:
     """
-    Creates and configures a logger instance with the specified name, logging level,
-    and handlers.
+    Returns the logger called `name`, optionally setting its level and handlers.
+
+    Logging is configured when the ``app`` logger handles its first record, not
+    here, unless `handlers` are requested. Modules pass `__name__`; their loggers
+    propagate to the ``app`` logger, and inherit its level unless `level` or
+    `config.LOG_LEVELS` sets their own.
 
     Args:
         name (str): The name of the logger. Defaults to "app".
-        level (str): The logging level to set for the logger. Defaults to the value
-            of `config.LOG_LEVEL`.
-        handlers (list[str] | None): A list of handler names to attach to the logger.
-            If None, defaults to ["console", "file"].
+        level (str | None): The logging level to set for the logger.
+        handlers (list[str] | None): Names of configured handlers ("console",
+            "file", "queue") to attach to the logger directly.
 
     Returns:
-        logging.Logger: A configured logger instance.
+        logging.Logger: The logger.
     """
-    if handlers is None:
-        handlers = ["console", "file"]
     logger = logging.getLogger(name)
-    logger.setLevel(level)
-
-    existing_handler_names = {h.name for h in logger.handlers}
-    for handler in handlers:
-        if handler not in existing_handler_names:
-            handler_instance = logging.getHandlerByName(handler)
-            if handler_instance is not None:
-                logger.addHandler(handler_instance)
+    if level is not None:
+        logger.setLevel(level)
+    if handlers:
+        setup_logging()
+        existing_handler_names = {h.name for h in logger.handlers}
+        for handler in handlers:
+            if handler not in existing_handler_names:
+                handler_instance = logging.getHandlerByName(handler)
+                if handler_instance is not None:
+                    logger.addHandler(handler_instance)
     return logger
 
 
+# Until the first record, the app logger passes everything to the placeholder,
+# which replaces itself and sets the configured level
+_app_logger = logging.getLogger("app")
+if not _app_logger.handlers:
+    _app_logger.addHandler(_SetupOnFirstRecord())
+    _app_logger.setLevel(logging.DEBUG)
+
 log = get_logger()
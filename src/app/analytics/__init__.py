@@ -0,0 +1,12 @@
+"""
+Return and risk analytics. Submodules are imported on first attribute access.
+"""
+
+from app._lazy import attach
+
+__getattr__, __dir__, __all__ = attach(
+    __name__,
+    [
+        "returns",
+    ],
+)
@@ -0,0 +1,138 @@
+from pathlib import Path
+from typing import Literal
+
+import numpy as np
+import pandas as pd
+import polars as pl
+import pyarrow as pa
+
+type BarsInput = pl.LazyFrame | pl.DataFrame | pa.Table | pd.DataFrame | str | Path
+
+
+def scan_bars(bars: BarsInput) -> pl.LazyFrame:
+    """
+    Returns long-format bars (symbol, date, price columns) as a lazy frame.
+
+    Parquet paths and globs are scanned rather than read, so plans built on them
+    can run with the streaming engine on datasets larger than memory.
+    """
+    if isinstance(bars, pl.LazyFrame):
+        return bars
+    if isinstance(bars, pl.DataFrame):
+        return bars.lazy()
+    if isinstance(bars, str | Path):
+        return pl.scan_parquet(bars)
+    if isinstance(bars, pd.DataFrame):
+        return pl.from_pandas(bars).lazy()
+    return pl.from_arrow(bars).lazy()  # type: ignore[union-attr]
+
+
+def with_returns(
+    bars: BarsInput,
+    kind: Literal["log", "simple"] = "log",
+    price: str = "close",
+) -> pl.LazyFrame:
+    """
+    Adds a per-symbol `ret` column of log or simple returns of `price`.
+    """
+    close = pl.col(price)
+    ret = close.log().diff() if kind == "log" else close.pct_change()
+    return (
+        scan_bars(bars)
+        .sort("symbol", "date")
+        .with_columns(ret.over("symbol").alias("ret"))
+    )
+
+
+def rolling_stats(
+    bars: BarsInput,
+    window: int = 60,
+    benchmark: str | None = None,
+    kind: Literal["log", "simple"] = "log",
+    price: str = "close",
+    periods_per_year: int = 252,
+) -> pl.LazyFrame:
+    """
+    Builds one lazy plan computing returns, rolling volatility and, when a
+    `benchmark` symbol is given, rolling beta against it for every symbol.
+
+    Args:
+        bars (BarsInput): Long-format bars with `symbol`, `date` and `price`.
+        window (int): Rolling window length in rows (trading days).
+        benchmark (str | None): Symbol whose returns are the beta market factor.
+        kind (Literal["log", "simple"]): Return definition.
+        price (str): Price column used for returns.
+        periods_per_year (int): Annualization factor for volatility.
+
+    Returns:
+        pl.LazyFrame: symbol, date, ret, rolling_vol and optionally rolling_beta.
+            Call ``.collect(engine="streaming")`` for larger-than-memory inputs.
+    """
+    returns = with_returns(bars, kind, price).select("symbol", "date", "ret")
+    ret = pl.col("ret")
+    stats = [
+        (ret.rolling_std(window) * np.sqrt(periods_per_year))
+        .over("symbol")
+        .alias("rolling_vol"),
+    ]
+    if benchmark is not None:
+        market = returns.filter(pl.col("symbol") == benchmark).select(
+            "date",
+            pl.col("ret").alias("_mkt"),
+        )
+        returns = returns.join(market, on="date", how="left").sort("symbol", "date")
+        mkt = pl.col("_mkt")
+        # beta = cov(r, m) / var(m) from rolling first and second moments
+        cov = (ret * mkt).rolling_mean(window) - ret.rolling_mean(
+            window,
+        ) * mkt.rolling_mean(window)
+        var = (mkt * mkt).rolling_mean(window) - mkt.rolling_mean(window) ** 2
+        stats.append((cov / var).over("symbol").alias("rolling_beta"))
+    return returns.with_columns(stats).drop("_mkt", strict=False)
+
+
+def correlation_matrix(
+    bars: BarsInput,
+    kind: Literal["log", "simple"] = "log",
+    price: str = "close",
+    min_periods: int = 2,
+) -> pd.DataFrame:
+    """
+    Returns the cross-sectional (symbols x symbols) return correlation matrix.
+
+    Correlations use pairwise-complete observations, computed for all pairs at
+    once from masked moment matrices instead of a loop over pairs. Pairs with
+    fewer than `min_periods` common observations are NaN.
+    """
+    # Scatter into a dense (dates x symbols) matrix by rank codes; much faster
+    # than a pivot for hundreds of columns
+    returns = (
+        with_returns(bars, kind, price)
+        .select(
+            (pl.col("date").rank("dense") - 1).alias("row"),
+            (pl.col("symbol").rank("dense") - 1).alias("col"),
+            "symbol",
+            "ret",
+        )
+        .collect()
+    )
+    symbols = returns["symbol"].unique().sort().to_list()
+    x = np.full((int(returns["row"].max() or 0) + 1, len(symbols)), np.nan)
+    rows, cols = returns["row"].to_numpy(), returns["col"].to_numpy()
+    x[rows, cols] = returns["ret"].to_numpy()
+    mask = ~np.isnan(x)
+    xz = np.where(mask, x, 0.0)
+    m = mask.astype(np.float64)
+
+    n = m.T @ m
+    with np.errstate(invalid="ignore", divide="ignore"):
+        # Row i, column j: moments of series i over dates where both i and j exist
+        mean = (xz.T @ m) / n
+        second = ((xz * xz).T @ m) / n
+        cross = (xz.T @ xz) / n
+        cov = cross - mean * mean.T
+        var = second - mean * mean
+        corr = cov / np.sqrt(var * var.T)
+    corr[n < min_periods] = np.nan
+    np.fill_diagonal(corr, np.where(np.diag(n) >= min_periods, 1.0, np.nan))
+    return pd.DataFrame(corr, index=symbols, columns=symbols)
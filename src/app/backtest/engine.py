@@ -0,0 +1,207 @@
+import itertools
+import multiprocessing
+from collections.abc import Callable, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from app import get_logger
+
+log = get_logger(__name__)
+
+# Maps (dates x assets) prices and S parameter sets to (S x dates x assets) weights
+type Strategy = Callable[[np.ndarray, dict[str, np.ndarray]], np.ndarray]
+
+STAT_COLUMNS = (
+    "total_return",
+    "annual_return",
+    "annual_volatility",
+    "sharpe",
+    "max_drawdown",
+    "avg_turnover",
+    "total_costs",
+    "hit_rate",
+)
+
+
+def param_grid(**axes: Sequence[float]) -> list[dict[str, float]]:
+    """
+    Returns the cartesian product of parameter values, e.g.
+    ``param_grid(fast=[10, 20], slow=[50, 100])`` gives four parameter sets.
+    """
+    names = list(axes)
+    return [
+        dict(zip(names, values, strict=True))
+        for values in itertools.product(*axes.values())
+    ]
+
+
+def simulate(
+    prices: np.ndarray,
+    weights: np.ndarray,
+    cost_bps: float = 0.0,
+) -> dict[str, np.ndarray]:
+    """
+    Simulates (strategies x dates x assets) target weights over a price panel.
+
+    Weights set at the close of day t are held over day t + 1 and rebalanced back
+    to target daily. Costs are `cost_bps` per unit of traded weight.
+
+    Returns:
+        dict[str, np.ndarray]: (strategies x dates) ``gross``, ``costs``, ``net``
+            returns and ``turnover``.
+    """
+    with np.errstate(invalid="ignore", divide="ignore"):
+        returns = np.diff(prices, axis=0) / prices[:-1]
+    returns = np.nan_to_num(np.vstack([np.zeros((1, prices.shape[1])), returns]))
+
+    gross = np.zeros(weights.shape[:2])
+    gross[:, 1:] = np.einsum("std,td->st", weights[:, :-1], returns[1:])
+    turnover = np.abs(np.diff(weights, axis=1, prepend=0.0)).sum(axis=-1)
+    costs = turnover * cost_bps / 10_000
+    return {"gross": gross, "costs": costs, "net": gross - costs, "turnover": turnover}
+
+
+def summary_stats(
+    result: dict[str, np.ndarray],
+    periods_per_year: int = 252,
+) -> dict[str, np.ndarray]:
+    """
+    Returns one value per strategy for each of `STAT_COLUMNS`.
+    """
+    net = result["net"]
+    n_periods = net.shape[1]
+    equity = np.cumprod(1.0 + net, axis=1)
+    drawdown = equity / np.maximum.accumulate(equity, axis=1) - 1.0
+    mean = net.mean(axis=1)
+    volatility = net.std(axis=1, ddof=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        sharpe = np.where(volatility > 0, mean / volatility, np.nan)
+    return {
+        "total_return": equity[:, -1] - 1.0,
+        "annual_return": equity[:, -1] ** (periods_per_year / n_periods) - 1.0,
+        "annual_volatility": volatility * np.sqrt(periods_per_year),
+        "sharpe": sharpe * np.sqrt(periods_per_year),
+        "max_drawdown": drawdown.min(axis=1),
+        "avg_turnover": result["turnover"].mean(axis=1),
+        "total_costs": result["costs"].sum(axis=1),
+        "hit_rate": (net > 0).mean(axis=1),
+    }
+
+
+def _run_chunk(
+    prices: np.ndarray,
+    strategy: Strategy,
+    params: list[dict[str, float]],
+    cost_bps: float,
+    periods_per_year: int,
+) -> dict[str, np.ndarray]:
+    columns = {name: np.array([p[name] for p in params]) for name in params[0]}
+    weights = strategy(prices, columns)
+    return summary_stats(simulate(prices, weights, cost_bps), periods_per_year)
+
+
+def _run_shared_chunk(
+    name: str,
+    shape: tuple[int, int],
+    strategy: Strategy,
+    params: list[dict[str, float]],
+    cost_bps: float,
+    periods_per_year: int,
+) -> dict[str, np.ndarray]:
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        prices = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+        result = _run_chunk(prices, strategy, params, cost_bps, periods_per_year)
+        # The view must be released before the segment can be closed
+        del prices
+        return result
+    finally:
+        shm.close()
+
+
+def backtest(
+    prices: pd.DataFrame,
+    strategy: Strategy,
+    params: list[dict[str, float]],
+    cost_bps: float = 1.0,
+    chunk_size: int = 16,
+    max_workers: int = 1,
+    periods_per_year: int = 252,
+) -> pa.Table:
+    """
+    Backtests `strategy` for every parameter set over a (dates x assets) panel.
+
+    Parameter sets are evaluated `chunk_size` at a time along a strategy axis, so
+    memory is bounded by chunk_size x dates x assets. With `max_workers` > 1 the
+    chunks run in a process pool that reads the price panel from one shared
+    memory segment instead of a pickled copy per task.
+
+    Args:
+        prices (pd.DataFrame): Prices indexed by date, one column per asset,
+            e.g. from `BarStore.panel`.
+        strategy (Strategy): A module-level function such as
+            `app.backtest.strategies.moving_average_crossover`.
+        params (list[dict[str, float]]): Parameter sets, see `param_grid`.
+        cost_bps (float): Transaction cost in basis points of traded weight.
+        chunk_size (int): Parameter sets per vectorized evaluation.
+        max_workers (int): Worker processes; 1 runs in this process.
+        periods_per_year (int): Annualization factor.
+
+    Returns:
+        pa.Table: One row per parameter set with the parameters followed by
+            `STAT_COLUMNS`.
+    """
+    if not params:
+        msg = "At least one parameter set is required"
+        raise ValueError(msg)
+    values = np.ascontiguousarray(prices.to_numpy(dtype=np.float64))
+    chunks = [params[i : i + chunk_size] for i in range(0, len(params), chunk_size)]
+    log.info(
+        "Backtesting %d parameter sets on %d dates x %d assets in %d chunks",
+        len(params),
+        values.shape[0],
+        values.shape[1],
+        len(chunks),
+    )
+
+    if max_workers == 1 or len(chunks) == 1:
+        results = [
+            _run_chunk(values, strategy, chunk, cost_bps, periods_per_year)
+            for chunk in chunks
+        ]
+    else:
+        shm = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+        try:
+            shared = np.ndarray(values.shape, dtype=np.float64, buffer=shm.buf)
+            shared[:] = values
+            del shared
+            # Fork is unsafe from threaded callers such as Streamlit
+            context = multiprocessing.get_context("forkserver")
+            with ProcessPoolExecutor(max_workers, mp_context=context) as executor:
+                futures = [
+                    executor.submit(
+                        _run_shared_chunk,
+                        shm.name,
+                        values.shape,
+                        strategy,
+                        chunk,
+                        cost_bps,
+                        periods_per_year,
+                    )
+                    for chunk in chunks
+                ]
+                results = [future.result() for future in futures]
+        finally:
+            shm.close()
+            shm.unlink()
+
+    columns: dict[str, np.ndarray] = {
+        name: np.array([p[name] for p in params]) for name in params[0]
+    }
+    for stat in STAT_COLUMNS:
+        columns[stat] = np.concatenate([r[stat] for r in results])
+    return pa.table(columns)
@@ -0,0 +1,73 @@
+import numpy as np
+
+
+def rolling_mean(prices: np.ndarray, windows: np.ndarray) -> np.ndarray:
+    """
+    Returns trailing means of a (dates x assets) array for several window lengths
+    at once, as a (windows x dates x assets) array.
+
+    Means are NaN until a full window of non-missing prices is available. Each
+    window is a difference of two slices of one cumulative sum, so the cost does
+    not depend on the window length.
+    """
+    windows = np.asarray(windows, dtype=np.int64)
+    n_dates, n_assets = prices.shape
+    valid = ~np.isnan(prices)
+    sums = np.zeros((n_dates + 1, n_assets))
+    np.cumsum(np.where(valid, prices, 0.0), axis=0, out=sums[1:])
+    counts = None
+    if not valid.all():
+        counts = np.zeros((n_dates + 1, n_assets), dtype=np.int64)
+        np.cumsum(valid, axis=0, out=counts[1:])
+
+    means = np.full((len(windows), n_dates, n_assets), np.nan)
+    for i, window in enumerate(windows):
+        if window > n_dates:
+            continue
+        mean = means[i, window - 1 :]
+        np.divide(sums[window:] - sums[:-window], window, out=mean)
+        if counts is not None:
+            mean[counts[window:] - counts[:-window] < window] = np.nan
+    return means
+
+
+def _equal_weight(signal: np.ndarray) -> np.ndarray:
+    gross = np.abs(signal).sum(axis=-1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(gross > 0, signal / gross, 0.0)
+
+
+def moving_average_crossover(
+    prices: np.ndarray,
+    params: dict[str, np.ndarray],
+) -> np.ndarray:
+    """
+    Equal-weight long positions in assets whose `fast` moving average is above the
+    `slow` one. One strategy per (fast, slow) pair.
+    """
+    fast, slow = np.asarray(params["fast"]), np.asarray(params["slow"])
+    # Parameter grids repeat window lengths, so each distinct mean is computed once
+    windows, inverse = np.unique(np.concatenate([fast, slow]), return_inverse=True)
+    means = rolling_mean(prices, windows)
+    signal = np.empty((len(fast), *prices.shape))
+    for i, (f, s) in enumerate(
+        zip(inverse[: len(fast)], inverse[len(fast) :], strict=True),
+    ):
+        np.greater(means[f], means[s], out=signal[i])
+    return _equal_weight(signal)
+
+
+def time_series_momentum(
+    prices: np.ndarray,
+    params: dict[str, np.ndarray],
+) -> np.ndarray:
+    """
+    Equal gross weight long assets with a positive and short assets with a negative
+    return over the trailing `lookback` days. One strategy per lookback.
+    """
+    lookback = np.asarray(params["lookback"], dtype=np.int64)
+    start = np.arange(len(prices))[None, :] - lookback[:, None]
+    past = np.where((start >= 0)[..., None], prices[np.maximum(start, 0)], np.nan)
+    with np.errstate(invalid="ignore"):
+        signal = np.sign(prices[None] / past - 1.0)
+    return _equal_weight(np.nan_to_num(signal))
@@ -0,0 +1,17 @@
+"""
+Database access, email, validation and shared models. Submodules are imported on first attribute access.
+"""
+
+from app._lazy import attach
+
+__getattr__, __dir__, __all__ = attach(
+    __name__,
+    [
+        "database",
+        "email_sender",
+        "models",
+        "table_versions",
+        "utils",
+        "validation",
+    ],
+)
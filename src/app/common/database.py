@@ -1,10 +1,9 @@
 import threading
 from collections.abc import Sequence
-from typing import Any, ClassVar, Literal, Self
+from typing import TYPE_CHECKING, Any, ClassVar, Literal, Self
 
 import pandas as pd
 import pyarrow as pa
-from adbc_driver_manager.dbapi import Connection
 from sqlalchemy import (
     Engine,
     Executable,
@@ -22,7 +21,12 @@ from sqlalchemy import (
 )
 from sqlalchemy.exc import SQLAlchemyError
 
-from app import config, log
+from app import config, get_logger
+
+if TYPE_CHECKING:
+    from adbc_driver_manager.dbapi import Connection
+
+log = get_logger(__name__)
 
 
 class DB:
@@ -52,6 +56,7 @@ class DB:
         self.metadata: MetaData = MetaData()
         self.dialect = self._engine.dialect.name.lower()
         self._tables: dict[str, Table] = {}
+        self._tables_lock = threading.Lock()
         self._initialized = True
 
     def get_engine(self) -> Engine:
@@ -60,7 +65,7 @@ class DB:
         """
         return self._engine
 
-    def get_adbc_conn(self) -> Connection:
+    def get_adbc_conn(self) -> "Connection":
         """
         Returns a connection object for ADBC operations.
         """
@@ -80,15 +85,18 @@ class DB:
         Caches the table to avoid repeated reflection.
         """
         key = f"{schema}.{table_name}" if schema else table_name
-        if key not in self._tables:
-            table = Table(
-                table_name,
-                self.metadata,
-                autoload_with=self._engine,
-                schema=schema,
-            )
-            self._tables[key] = table
-        return self._tables[key]
+        # Concurrent reflection into the shared MetaData can return a table whose
+        # columns and primary key are still being populated by another thread
+        with self._tables_lock:
+            if key not in self._tables:
+                table = Table(
+                    table_name,
+                    self.metadata,
+                    autoload_with=self._engine,
+                    schema=schema,
+                )
+                self._tables[key] = table
+            return self._tables[key]
 
     def execute(
         self,
@@ -1,14 +1,383 @@
 # Do NOT rename this module to `email.py` as it will conflict with the standard library!
 
-# import smtplib
-from email import encoders
+import base64
+import copy
+import queue
+import re
+import smtplib
+import threading
+import time
+import uuid
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager, suppress
+from dataclasses import dataclass, field
+from email import policy
 from email.mime.base import MIMEBase
 from email.mime.image import MIMEImage
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from pathlib import Path
 
-from app import log
+from app import config, get_logger
+
+log = get_logger(__name__)
+
+# Raw bytes per base64 chunk: a multiple of 57, so every chunk encodes to whole
+# 76-character lines
+_CHUNK_BYTES = 57 * 1024
+_SEND_BUFFER = 256 * 1024
+_LOG_LIMIT = 200
+_DOT_LINE = re.compile(rb"(?m)^\.")
+
+
+@dataclass(frozen=True)
+class Email:
+    subject: str
+    msg: str
+    email_from: str
+    email_to: str | list[str] | None = None
+    msg_plain: str | None = None
+    email_to_cc: str | list[str] | None = None
+    email_to_bcc: str | list[str] | None = None
+    priority: int = 3
+    attachments: tuple[Path, ...] = ()
+    inline_images: dict[str, str] | None = None
+
+    def recipients(self) -> list[str]:
+        return [
+            address
+            for value in (self.email_to, self.email_to_cc, self.email_to_bcc)
+            for address in ([value] if isinstance(value, str) else value or [])
+        ]
+
+
+@dataclass(frozen=True)
+class BulkResult:
+    sent: int
+    seconds: float
+    # Position in the input of every message that could not be sent
+    errors: dict[int, BaseException] = field(default_factory=dict)
+
+    @property
+    def messages_per_sec(self) -> float:
+        return self.sent / self.seconds if self.seconds > 0 else 0.0
+
+
+def build_message(email: Email) -> tuple[MIMEMultipart, dict[bytes, Path]]:
+    """
+    Builds the MIME message for `email` without reading its attachments.
+
+    Every attachment part holds a unique placeholder line instead of its payload,
+    which `iter_message_bytes` replaces with the file's base64 encoding.
+
+    Returns:
+        tuple[MIMEMultipart, dict[bytes, Path]]: The message and the attachment
+            file behind each placeholder.
+    """
+    message = MIMEMultipart()
+    message["Subject"] = email.subject
+    message["From"] = email.email_from
+
+    email_to_dict = {
+        "To": email.email_to,
+        "Cc": email.email_to_cc,
+        "Bcc": email.email_to_bcc,
+    }
+    if all(val is None for val in email_to_dict.values()):
+        msg = "One of email_to, email_to_cc, or email_to_bcc must be specified"
+        raise ValueError(
+            msg,
+        )
+
+    for key, val in email_to_dict.items():
+        if isinstance(val, list):
+            val = ", ".join(val)
+        if val is not None:
+            message[key] = val
+    message["X-Priority"] = str(email.priority)
+
+    # First add the message in plain text, then the HTML version;
+    # email clients try to render the last part first. UTF-8 parts are
+    # base64-encoded, which keeps generated HTML within SMTP's line limit
+    if email.msg_plain:
+        message.attach(MIMEText(email.msg_plain, "plain", "utf-8"))
+    if email.msg:
+        message.attach(MIMEText(email.msg, "html", "utf-8"))
+
+    streamed: dict[bytes, Path] = {}
+    for filepath in email.attachments:
+        if not filepath.is_file():
+            msg = f"Attachment {filepath} does not exist"
+            raise FileNotFoundError(msg)
+        placeholder = f"attachment-{uuid.uuid4().hex}"
+        part = MIMEBase("application", "octet-stream")
+        part.set_payload(placeholder)
+        part["Content-Transfer-Encoding"] = "base64"
+        part.add_header(
+            "Content-Disposition",
+            f"attachment; filename= {filepath.name}",
+        )
+        message.attach(part)
+        streamed[placeholder.encode()] = filepath
+
+    for cid, filepath in (email.inline_images or {}).items():
+        with Path(filepath).open("rb") as img_file:
+            img = MIMEImage(img_file.read())
+            img.add_header("Content-ID", f"<{cid}>")
+            img.add_header("Content-Disposition", "inline")
+            message.attach(img)
+
+    return message, streamed
+
+
+def _encode_file(path: Path) -> Iterator[bytes]:
+    with path.open("rb") as f:
+        while chunk := f.read(_CHUNK_BYTES):
+            encoded = base64.b64encode(chunk)
+            yield b"\r\n".join(encoded[i : i + 76] for i in range(0, len(encoded), 76))
+            yield b"\r\n"
+
+
+def iter_message_bytes(
+    message: MIMEMultipart,
+    streamed: dict[bytes, Path],
+) -> Iterator[bytes]:
+    """
+    Yields the wire format of `message` (CRLF line endings, no Bcc header),
+    encoding attachment files chunk by chunk as their placeholders are reached.
+    """
+    # As in `smtplib.SMTP.send_message`: deleting a header on a shallow copy
+    # leaves the caller's message intact
+    message = copy.copy(message)
+    del message["Bcc"]
+    data = message.as_bytes(policy=policy.SMTP)
+    if not streamed:
+        yield data
+        return
+    pattern = re.compile(b"(" + b"|".join(map(re.escape, streamed)) + rb")\r\n")
+    position = 0
+    for match in pattern.finditer(data):
+        yield data[position : match.start()]
+        yield from _encode_file(streamed[match.group(1)])
+        position = match.end()
+    yield data[position:]
+
+
+class SMTPPool:
+    """
+    Thread-safe pool of persistent SMTP sessions.
+
+    At most `size` sessions are in use at once. Idle sessions are kept open and
+    checked with NOOP before reuse, and broken ones are replaced. Messages are
+    written to the DATA stream as they are generated, so attachments are never
+    held in memory in full.
+    """
+
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 25,
+        size: int = 4,
+        *,
+        username: str | None = None,
+        password: str | None = None,
+        starttls: bool = False,
+        timeout: float = 30.0,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+        self._idle: queue.LifoQueue[smtplib.SMTP] = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def _open(self, conn: smtplib.SMTP) -> smtplib.SMTP:
+        conn.connect(self.host, self.port)
+        conn.ehlo()
+        if self.starttls:
+            conn.starttls()
+            conn.ehlo()
+        if self.username:
+            conn.login(self.username, self.password or "")
+        return conn
+
+    def _checkout(self) -> smtplib.SMTP:
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                return self._open(smtplib.SMTP(timeout=self.timeout))
+            try:
+                if conn.noop()[0] == 250:
+                    return conn
+            except (smtplib.SMTPException, OSError):
+                pass
+            _close(conn)
+
+    @contextmanager
+    def connection(self) -> Iterator[smtplib.SMTP]:
+        """
+        Checks out a session for the block. It is returned to the pool if the
+        block succeeds and closed otherwise, as its state is then unknown.
+        """
+        with self._slots:
+            conn = self._checkout()
+            try:
+                yield conn
+            except BaseException:
+                _close(conn)
+                raise
+            else:
+                self._idle.put(conn)
+
+    def close(self) -> None:
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                conn.quit()
+            except (smtplib.SMTPException, OSError):
+                _close(conn)
+
+    def send(self, email: Email) -> MIMEMultipart:
+        with self.connection() as conn:
+            return self._send_one(conn, email)
+
+    def send_bulk(self, emails: Iterable[Email]) -> BulkResult:
+        """
+        Sends every message over one session, reconnecting once if the server
+        drops it. A refused message is recorded without stopping the others; its
+        transaction is reset, or the session reopened if it cannot be.
+        """
+        sent = 0
+        errors: dict[int, BaseException] = {}
+        started = time.perf_counter()
+        with self.connection() as conn:
+            for i, email in enumerate(emails):
+                try:
+                    try:
+                        self._send_one(conn, email)
+                    except smtplib.SMTPServerDisconnected:
+                        self._open(conn)
+                        self._send_one(conn, email)
+                except (
+                    smtplib.SMTPRecipientsRefused,
+                    smtplib.SMTPResponseException,
+                    ValueError,
+                    FileNotFoundError,
+                ) as e:
+                    errors[i] = e
+                    continue
+                sent += 1
+        result = BulkResult(sent, time.perf_counter() - started, errors)
+        log.info(
+            "Sent %d/%d messages in %.2fs (%.0f msg/s)",
+            sent,
+            sent + len(errors),
+            result.seconds,
+            result.messages_per_sec,
+        )
+        return result
+
+    def _send_one(self, conn: smtplib.SMTP, email: Email) -> MIMEMultipart:
+        """
+        Sends `email` as one transaction on `conn`. If it fails, the transaction
+        is reset, or `conn` closed if it failed while streaming the message.
+        """
+        message, streamed = build_message(email)
+        try:
+            _start_data(conn, email.email_from, email.recipients())
+        except BaseException:
+            _reset(conn)
+            raise
+        try:
+            _write_data(conn, iter_message_bytes(message, streamed))
+        except BaseException:
+            # The server still expects the rest of the message
+            _close(conn)
+            raise
+        code, response = conn.getreply()
+        if code != 250:
+            _reset(conn)
+            raise smtplib.SMTPDataError(code, response)
+        return message
+
+
+def _start_data(conn: smtplib.SMTP, sender: str, recipients: list[str]) -> None:
+    """Sends MAIL, RCPT and DATA; the server then expects the message."""
+    code, response = conn.mail(sender)
+    if code != 250:
+        raise smtplib.SMTPSenderRefused(code, response, sender)
+    refused = {}
+    for recipient in recipients:
+        code, response = conn.rcpt(recipient)
+        if code not in (250, 251):
+            refused[recipient] = (code, response)
+    if len(refused) == len(recipients):
+        raise smtplib.SMTPRecipientsRefused(refused)
+    code, response = conn.docmd("DATA")
+    if code != 354:
+        raise smtplib.SMTPDataError(code, response)
+
+
+def _write_data(conn: smtplib.SMTP, chunks: Iterable[bytes]) -> None:
+    """Writes the message and the terminating dot line, dot-stuffing lines."""
+    # Small writes are coalesced: one send per chunk would stall on Nagle's
+    # algorithm and delayed ACKs for every message
+    buffer = bytearray()
+    tail = b""
+    for chunk in chunks:
+        # Streamed base64 lines never start with a dot
+        buffer += _DOT_LINE.sub(b"..", chunk)
+        tail = (tail + chunk)[-2:]
+        if len(buffer) >= _SEND_BUFFER:
+            conn.send(bytes(buffer))
+            buffer.clear()
+    if tail != b"\r\n":
+        buffer += b"\r\n"
+    conn.send(bytes(buffer + b".\r\n"))
+
+
+def _close(conn: smtplib.SMTP) -> None:
+    with suppress(OSError):
+        conn.close()
+
+
+def _reset(conn: smtplib.SMTP) -> None:
+    """Ends a failed transaction with RSET, closing a session that rejects it."""
+    with suppress(smtplib.SMTPException, OSError):
+        if conn.rset()[0] == 250:
+            return
+    _close(conn)
+
+
+_pool: SMTPPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_smtp_pool() -> SMTPPool:
+    """Returns the process-wide pool for the relay in `config`."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = SMTPPool(
+                config.SMTP_HOST,
+                config.SMTP_PORT,
+                username=config.SMTP_USER,
+                password=config.SMTP_PASSWORD,
+                starttls=config.SMTP_STARTTLS,
+            )
+    return _pool
+
+
+def _truncate(text: str | None, limit: int = _LOG_LIMIT) -> str | None:
+    if text is None or len(text) <= limit:
+        return text
+    return f"{text[:limit]}... ({len(text)} chars)"
 
 
 def email_send_message(
@@ -22,6 +391,7 @@ def email_send_message(
     priority: int = 3,
     attachments: str | Path | list[str | Path] | None = None,
     inline_images: dict[str, str] | None = None,
+    pool: SMTPPool | None = None,
 ) -> MIMEMultipart:
     """Send an email message with optional HTML/plain content,
     attachments, and inline images.
@@ -42,94 +412,60 @@ def email_send_message(
         priority (int, optional): Email priority (1 = highest, 5 =
             lowest). Defaults to 3.
         attachments (str | list[str] | Path | list[Path] | None,
-            optional): Filepath(s) to attach to the email. Defaults to
-            None.
+            optional): Filepath(s) to attach to the email. Files are
+            base64-encoded in chunks while sending. Defaults to None.
         inline_images (dict[str, str] | None, optional): Dictionary
             mapping Content-ID (cid) to image filepaths for inline
             images. Defaults to None.
+        pool (SMTPPool | None, optional): Pool to send through. Defaults
+            to the pool for the relay in `config`.
 
     Returns
     -------
-        email.message.Message: The constructed email message object.
+        email.message.Message: The message sent. Attachment parts hold a
+            placeholder; their content is streamed from disk.
 
     Raises
     ------
         ValueError: If none of email_to, email_to_cc, or email_to_bcc are specified.
+        smtplib.SMTPException: If the relay refuses the message.
 
     Logs:
-        Logs the email parameters and content for debugging purposes.
+        Logs the email parameters, with the content truncated.
 
     """
-    message = MIMEMultipart()
-    message["Subject"] = subject
-    message["From"] = email_from
-
-    email_to_dict = {"To": email_to, "Cc": email_to_cc, "Bcc": email_to_bcc}
-    if all(val is None for val in email_to_dict.values()):
-        msg = "One of email_to, email_to_cc, or email_to_bcc must be specified"
-        raise ValueError(
-            msg,
-        )
-
-    for key, val in email_to_dict.items():
-        if isinstance(val, list):
-            val = ", ".join(val)
-        if val is not None:
-            message[key] = val
-    message["X-Priority"] = str(priority)
-
-    # First add the message in plain text, then the HTML version;
-    # email clients try to render the last part first
-    if msg_plain:
-        message.attach(MIMEText(msg_plain, "plain"))
-    if msg:
-        message.attach(MIMEText(msg, "html"))
-
     if attachments is None:
         attachments = []
     elif isinstance(attachments, str | Path):
         attachments = [attachments]
 
-    # Ensure all attachments are Path objects
-    path_attachments = [Path(a) if not isinstance(a, Path) else a for a in attachments]
-
-    for filepath in path_attachments:
-        with filepath.open("rb") as attachment:
-            part = MIMEBase("application", "octet-stream")
-            part.set_payload(attachment.read())
-
-        encoders.encode_base64(part)
-        filename = Path(filepath).name
-        part.add_header(
-            "Content-Disposition",
-            f"attachment; filename= {filename}",
-        )
-        message.attach(part)
-
-    for cid, filepath in (inline_images or {}).items():
-        with Path(filepath).open("rb") as img_file:
-            img = MIMEImage(img_file.read())
-            img.add_header("Content-ID", f"<{cid}>")
-            img.add_header("Content-Disposition", "inline")
-            message.attach(img)
-
-    # with smtplib.SMTP("localhost") as server:
-    #     server.send_message(message)
+    email = Email(
+        subject=subject,
+        msg=msg,
+        email_from=email_from,
+        email_to=email_to,
+        msg_plain=msg_plain,
+        email_to_cc=email_to_cc,
+        email_to_bcc=email_to_bcc,
+        priority=priority,
+        attachments=tuple(Path(a) for a in attachments),
+        inline_images=inline_images,
+    )
+    message = (pool or get_smtp_pool()).send(email)
 
     log.info(
-        f"""
-        Email sent with the following parameters:
-        Subject: {subject}
-        From: {email_from}
-        To: {email_to}
-        Cc: {email_to_cc}
-        Bcc: {email_to_bcc}
-        Priority: {priority}
-        Attachments: {path_attachments}
-        Inline Images: {inline_images}
-        Message: {msg}
-        Plain Text Message: {msg_plain}
-""",
+        "Email sent: subject=%r from=%s to=%s cc=%s bcc=%s priority=%d "
+        "attachments=%s inline_images=%s message=%r plain=%r",
+        _truncate(subject),
+        email_from,
+        email_to,
+        email_to_cc,
+        email_to_bcc,
+        priority,
+        [a.name for a in email.attachments],
+        list(inline_images or {}),
+        _truncate(msg),
+        _truncate(msg_plain),
     )
 
     return message
@@ -0,0 +1,70 @@
+"""
+Change counters for tables that derived data depends on.
+
+Writers call `bump_table_versions` after changing a table, and consumers compare
+`get_table_versions` with the versions they last built from to find out whether
+an upstream table changed. `app.flows.ingest_bars.merge_table` bumps the tables
+it merges into; other writers must bump explicitly. Writers create the table once
+with `create_table_versions_table` before bumping concurrently.
+"""
+
+from collections.abc import Iterable
+from datetime import UTC, datetime
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    bindparam,
+    select,
+    text,
+)
+
+from app.common.database import DB
+
+_metadata = MetaData()
+
+table_versions_table = Table(
+    "table_versions",
+    _metadata,
+    Column("table_name", String(128), primary_key=True),
+    Column("version", Integer, nullable=False),
+    Column("updated_at", DateTime(timezone=True), nullable=False),
+)
+
+
+def create_table_versions_table(db: DB) -> None:
+    """Creates ``table_versions`` if it does not exist."""
+    _metadata.create_all(db.get_engine(), checkfirst=True)
+
+
+def bump_table_versions(db: DB, tables: Iterable[str]) -> None:
+    """
+    Increments the version of each table, starting at 1. ``table_versions`` must
+    exist: a check-then-create here would race between concurrent writers.
+    """
+    now = datetime.now(UTC)
+    # ON CONFLICT works on both PostgreSQL and SQLite
+    db.execute(
+        text(
+            f"INSERT INTO {table_versions_table.name} (table_name, version, updated_at) "
+            "VALUES (:table_name, 1, :updated_at) "
+            "ON CONFLICT (table_name) DO UPDATE SET "
+            f"version = {table_versions_table.name}.version + 1, "
+            "updated_at = excluded.updated_at",
+        ).bindparams(bindparam("updated_at", type_=DateTime(timezone=True))),
+        [{"table_name": name, "updated_at": now} for name in dict.fromkeys(tables)],
+    )
+
+
+def get_table_versions(db: DB, tables: Iterable[str]) -> dict[str, int]:
+    """Current version of each table, 0 for tables never bumped."""
+    create_table_versions_table(db)
+    names = list(dict.fromkeys(tables))
+    t = table_versions_table.c
+    rows = db.fetch_all(select(t.table_name, t.version).where(t.table_name.in_(names)))
+    versions = {row.table_name: row.version for row in rows}
+    return {name: versions.get(name, 0) for name in names}
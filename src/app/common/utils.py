@@ -3,7 +3,9 @@ import time
 import unicodedata
 from functools import wraps
 
-from app import log
+from app import get_logger
+
+log = get_logger(__name__)
 
 
 def to_snake_case(value: str) -> str:
@@ -45,7 +47,11 @@ def timeit(func):
         end_time = time.perf_counter()
         total_time = end_time - start_time
         log.info(
-            f"Function {func.__name__}{args} {kwargs} Took {total_time:.8f} seconds",
+            "Function %s%s %s Took %.8f seconds",
+            func.__name__,
+            args,
+            kwargs,
+            total_time,
         )
         return result
 
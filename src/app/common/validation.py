@@ -0,0 +1,223 @@
+from collections.abc import Iterator
+from dataclasses import dataclass
+
+import pandas as pd
+import pandera.pandas as pandera
+import polars as pl
+import pyarrow as pa
+from pandera.errors import SchemaErrors
+from pydantic import BaseModel
+
+from app import get_logger
+from app.common.models import Security, SP500Constituent
+
+log = get_logger(__name__)
+
+type Frame = pd.DataFrame | pa.Table | pl.DataFrame
+
+SP500_CONSTITUENT_SCHEMA = pandera.DataFrameSchema(
+    {
+        "index_name": pandera.Column(str, default="sp500"),
+        "symbol": pandera.Column(str, unique=True),
+        "security_name": pandera.Column(str),
+        "gics_sector": pandera.Column(str),
+        "gics_sub_industry": pandera.Column(str),
+        "date_added": pandera.Column(pandera.DateTime, coerce=True),
+    },
+    strict="filter",
+    add_missing_columns=True,
+    name="sp500_constituent",
+)
+
+SECURITY_SCHEMA = pandera.DataFrameSchema(
+    {
+        "symbol": pandera.Column(str, unique=True),
+        "isin": pandera.Column(str),
+        "short_name": pandera.Column(str),
+        "long_name": pandera.Column(str),
+        "quote_type": pandera.Column(str),
+        "currency": pandera.Column(str, pandera.Check.str_length(3, 3)),
+        "exchange": pandera.Column(str),
+        "industry_key": pandera.Column(str),
+        "sector_key": pandera.Column(str),
+        "long_business_summary": pandera.Column(str),
+    },
+    strict="filter",
+    name="security",
+)
+
+_price = pandera.Column(float, pandera.Check.gt(0), nullable=True, coerce=True)
+
+BARS_SCHEMA = pandera.DataFrameSchema(
+    {
+        "symbol": pandera.Column(str),
+        "date": pandera.Column(pandera.DateTime, coerce=True),
+        "open": _price,
+        "high": _price,
+        "low": _price,
+        "close": _price,
+        "volume": pandera.Column(
+            float,
+            pandera.Check.ge(0),
+            nullable=True,
+            coerce=True,
+        ),
+    },
+    checks=[
+        pandera.Check(
+            lambda df: df["high"].isna() | df["low"].isna() | (df["high"] >= df["low"]),
+            name="high_ge_low",
+        ),
+    ],
+    unique=["symbol", "date"],
+    name="bars",
+)
+
+MODEL_SCHEMAS: dict[type[BaseModel], pandera.DataFrameSchema] = {
+    SP500Constituent: SP500_CONSTITUENT_SCHEMA,
+    Security: SECURITY_SCHEMA,
+}
+
+
+@dataclass(frozen=True)
+class ValidationResult[T: Frame]:
+    """Rows that passed validation, in the input's type, and the failures."""
+
+    data: T
+    errors: pd.DataFrame
+    frame: pd.DataFrame
+
+    @property
+    def ok(self) -> bool:
+        return self.errors.empty
+
+    def summary(self) -> pd.DataFrame:
+        """
+        Returns one row per check: failed row count, columns involved and an example.
+        """
+        return (
+            self.errors.groupby("check", dropna=False)
+            .agg(
+                rows=("index", "nunique"),
+                columns=("column", lambda c: ", ".join(sorted(c.dropna().unique()))),
+                example=("failure_case", "first"),
+            )
+            .reset_index()
+        )
+
+    def models[M: BaseModel](
+        self,
+        model: type[M],
+        *,
+        revalidate: bool = False,
+    ) -> Iterator[M]:
+        """
+        Yields one model per valid row, built on demand. Rows are not validated
+        again by the model unless `revalidate` is set.
+        """
+        frame = self.frame.assign(
+            **{
+                col: self.frame[col].dt.date
+                for col in self.frame.select_dtypes("datetime").columns
+            },
+        )
+        for row in frame.to_dict(orient="records"):
+            if revalidate:
+                # Columns were renamed from aliases to field names by `validate`
+                yield model.model_validate(row, by_name=True)
+            else:
+                yield model.model_construct(**row)  # type: ignore[arg-type]
+
+
+def _to_pandas(data: Frame) -> pd.DataFrame:
+    if isinstance(data, pd.DataFrame):
+        return data.reset_index(drop=True)
+    return data.to_pandas()
+
+
+def _from_pandas[T: Frame](frame: pd.DataFrame, like: T) -> T:
+    if isinstance(like, pd.DataFrame):
+        return frame  # type: ignore[return-value]
+    if isinstance(like, pa.Table):
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        # Restore the input's types, e.g. date32 columns coerced to timestamps
+        return table.cast(
+            pa.schema(
+                [
+                    like.schema.field(name)
+                    if name in like.schema.names
+                    else table.schema.field(name)
+                    for name in table.schema.names
+                ],
+            ),
+        )  # type: ignore[return-value]
+    result = pl.from_pandas(frame)
+    return result.cast(
+        {name: like.schema[name] for name in result.columns if name in like.schema},
+    )  # type: ignore[return-value]
+
+
+def validate[T: Frame](
+    data: T,
+    schema: pandera.DataFrameSchema | type[BaseModel],
+) -> ValidationResult[T]:
+    """
+    Validates whole columns at once and splits the rows into valid data and errors.
+
+    Rows with failures are dropped and the remaining rows are validated again, so a
+    value that cannot be coerced does not mask failures in other rows. Failures not
+    tied to a row, such as a missing column, reject the whole table.
+
+    Args:
+        data (Frame): A pandas, Arrow or Polars table.
+        schema (DataFrameSchema | type[BaseModel]): A pandera schema, or a model
+            from `app.common.models` registered in `MODEL_SCHEMAS`.
+
+    Returns:
+        ValidationResult: Valid rows in the input's type and a report with
+            `column`, `check`, `failure_case` and `index` columns.
+    """
+    if not isinstance(schema, pandera.DataFrameSchema):
+        frame = _to_pandas(data).rename(
+            columns={
+                f.alias: name for name, f in schema.model_fields.items() if f.alias
+            },
+        )
+        schema = MODEL_SCHEMAS[schema]
+    else:
+        frame = _to_pandas(data)
+
+    failures: list[pd.DataFrame] = []
+    remaining = frame
+    valid = frame.iloc[0:0]
+    # Every failed pass drops at least one row, so this terminates
+    while True:
+        try:
+            valid = schema.validate(remaining, lazy=True)
+            break
+        except SchemaErrors as e:
+            cases = e.failure_cases
+            row_cases = cases[cases["index"].notna()]
+            if row_cases.empty:
+                failures.append(cases)
+                valid = frame.iloc[0:0]
+                break
+            failures.append(row_cases)
+            remaining = remaining.drop(index=row_cases["index"].unique())
+
+    errors = (
+        pd.concat(failures, ignore_index=True)[
+            ["column", "check", "failure_case", "index"]
+        ]
+        if failures
+        else pd.DataFrame(columns=["column", "check", "failure_case", "index"])
+    )
+    if not errors.empty:
+        log.warning(
+            "%s: %d of %d rows failed validation",
+            schema.name,
+            len(frame) - len(valid),
+            len(frame),
+        )
+    valid = valid.reset_index(drop=True)
+    return ValidationResult(_from_pandas(valid, data), errors, valid)
@@ -0,0 +1,17 @@
+"""
+Prefect flows and their hooks. Submodules are imported on first attribute access.
+"""
+
+from app._lazy import attach
+
+__getattr__, __dir__, __all__ = attach(
+    __name__,
+    [
+        "backfill_bars",
+        "flow_utils",
+        "ingest_bars",
+        "materialize_reports",
+        "my_flow",
+        "notifications",
+    ],
+)
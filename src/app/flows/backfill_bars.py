@@ -0,0 +1,297 @@
+"""
+Resumable historical backfill of daily bars.
+
+The universe is split into symbol buckets, and each bucket walks the date range
+in chunks. Every completed chunk advances its symbols' watermarks in the
+``backfill_watermarks`` table, so a rerun of the same job resumes each symbol
+from its watermark instead of from the start.
+
+Chunks of different buckets run in parallel, up to `parallelism` at a time.
+Within a bucket, chunks run in date order, and each chunk's length is rescaled
+from the previous chunk's duration towards `target_seconds`.
+"""
+
+import time
+from dataclasses import asdict, dataclass
+from datetime import UTC, date, datetime, timedelta
+
+import pyarrow as pa
+from prefect import flow, task
+from prefect.artifacts import create_table_artifact
+from prefect.futures import PrefectFuture, as_completed
+from prefect.task_runners import ThreadPoolTaskRunner
+from sqlalchemy import Column, Date, DateTime, MetaData, String, Table, select
+
+from app import config, get_logger
+from app.common.database import DB
+from app.flows.flow_utils import flow_state_hook, task_state_hook
+from app.flows.ingest_bars import create_merge_tables, daily_bars_table, merge_table
+from app.mkt_data.cache import EPOCH, to_date
+from app.mkt_data.loader import load_bars
+
+log = get_logger(__name__)
+
+_metadata = MetaData()
+
+# `watermark` is the exclusive end of the range loaded for (job, symbol)
+backfill_watermarks_table = Table(
+    "backfill_watermarks",
+    _metadata,
+    Column("job", String(64), primary_key=True),
+    Column("symbol", String(32), primary_key=True),
+    Column("watermark", Date, nullable=False),
+    Column("updated_at", DateTime(timezone=True), nullable=False),
+)
+
+_WATERMARKS_SCHEMA = pa.schema(
+    [
+        pa.field("job", pa.string(), nullable=False),
+        pa.field("symbol", pa.string(), nullable=False),
+        pa.field("watermark", pa.date32(), nullable=False),
+        pa.field("updated_at", pa.timestamp("us", tz="UTC"), nullable=False),
+    ],
+)
+
+
+@dataclass(frozen=True)
+class ChunkStats:
+    bucket: int
+    start: date
+    end: date
+    symbols: int
+    rows: int
+    seconds: float
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+
+def get_watermarks(db: DB, job: str) -> dict[str, date]:
+    t = backfill_watermarks_table.c
+    rows = db.fetch_all(select(t.symbol, t.watermark).where(t.job == job))
+    return {row.symbol: row.watermark for row in rows}
+
+
+def set_watermarks(db: DB, job: str, symbols: list[str], watermark: date) -> None:
+    n = len(symbols)
+    data = pa.Table.from_arrays(
+        [
+            pa.array([job] * n, pa.string()),
+            pa.array(symbols, pa.string()),
+            pa.array([watermark] * n, pa.date32()),
+            pa.array([datetime.now(UTC)] * n, pa.timestamp("us", tz="UTC")),
+        ],
+        schema=_WATERMARKS_SCHEMA,
+    )
+    merge_table(db, backfill_watermarks_table, data)
+
+
+def next_chunk_days(
+    days: int,
+    seconds: float,
+    target_seconds: float,
+    min_days: int,
+    max_days: int,
+) -> int:
+    """
+    Rescales a chunk length so the next chunk takes about `target_seconds`,
+    changing it by at most a factor of two per step.
+    """
+    scale = target_seconds / seconds if seconds > 0 else 2.0
+    scaled = round(days * min(2.0, max(0.5, scale)))
+    return min(max_days, max(min_days, scaled))
+
+
+@task(
+    task_run_name="backfill-{bucket}-{start}",
+    on_completion=[task_state_hook],
+    on_failure=[task_state_hook],
+)
+def backfill_chunk(
+    job: str,
+    bucket: int,
+    symbols: list[str],
+    start: date,
+    end: date,
+    db_url: str,
+    rate_per_sec: float | None = 5.0,
+    max_retries: int = 3,
+    backoff: float = 0.5,
+) -> ChunkStats:
+    """
+    Loads [start, end) for `symbols`, merges the bars and advances their
+    watermarks to `end`, including symbols with no bars in the range, e.g. before
+    their listing. Fails without advancing any watermark if a symbol cannot be
+    loaded.
+    """
+    started = time.perf_counter()
+    result = load_bars(
+        symbols,
+        start,
+        end,
+        rate_per_sec=rate_per_sec,
+        max_retries=max_retries,
+        backoff=backoff,
+    )
+    if result.errors:
+        msg = f"Failed to load {sorted(result.errors)} for [{start}, {end})"
+        raise RuntimeError(msg)
+    db = DB(db_url)
+    rows = merge_table(db, daily_bars_table, result.table)
+    set_watermarks(db, job, symbols, end)
+    stats = ChunkStats(
+        bucket,
+        start,
+        end,
+        len(symbols),
+        rows,
+        time.perf_counter() - started,
+    )
+    log.info(
+        "Backfilled bucket %d [%s, %s): %d rows in %.1fs (%.0f rows/s)",
+        bucket,
+        start,
+        end,
+        rows,
+        stats.seconds,
+        stats.rows_per_sec,
+    )
+    return stats
+
+
+@flow(
+    task_runner=ThreadPoolTaskRunner(max_workers=16),
+    on_completion=[flow_state_hook],
+    on_failure=[flow_state_hook],
+)
+def backfill_bars_flow(
+    symbols: list[str],
+    start_date: date,
+    end_date: date | None = None,
+    job: str = "daily_bars",
+    db_url: str | None = None,
+    bucket_size: int = 50,
+    parallelism: int = 4,
+    chunk_days: int = 365,
+    min_chunk_days: int = 7,
+    max_chunk_days: int = 3650,
+    target_seconds: float = 60.0,
+    rate_per_sec: float | None = 5.0,
+    max_retries: int = 3,
+    backoff: float = 0.5,
+) -> list[ChunkStats]:
+    """
+    Backfills daily bars for `symbols` over [start_date, end_date), resuming from
+    the watermarks of `job`.
+
+    A failed chunk stops its bucket; the other buckets run to completion, then
+    the run fails. Rerunning the same job picks up where each symbol stopped.
+
+    Args:
+        symbols (list[str]): Universe to backfill.
+        start_date, end_date: Date range, `end_date` exclusive and today by
+            default. Watermarks assume a fixed start per job; use a new `job`
+            for a different range.
+        job (str): Name the watermarks are recorded under.
+        db_url (str | None): Target database, `config.POSTGRES_URL` by default.
+        bucket_size (int): Symbols per chunk.
+        parallelism (int): Chunks running at once, at most 16.
+        chunk_days (int): Length of each bucket's first chunk.
+        min_chunk_days, max_chunk_days: Bounds of the adapted chunk length.
+        target_seconds (float): Chunk duration the length adapts towards.
+        rate_per_sec (float | None): Download rate limit within a chunk.
+
+    Returns:
+        list[ChunkStats]: Completed chunks in completion order.
+    """
+    db_url = db_url or config.POSTGRES_URL
+    start = to_date(start_date, EPOCH)
+    end = to_date(end_date, date.today())
+    db = DB(db_url)
+    # Once, before the chunks run concurrently
+    create_merge_tables(db, [daily_bars_table, backfill_watermarks_table])
+    marks = get_watermarks(db, job)
+    position = {s: max(start, marks.get(s, start)) for s in dict.fromkeys(symbols)}
+    # Buckets group symbols with similar progress, so resumed chunks do not reload
+    # dates that most of their symbols already have
+    remaining = sorted((p, s) for s, p in position.items() if p < end)
+    buckets = [
+        [s for _, s in remaining[i : i + bucket_size]]
+        for i in range(0, len(remaining), bucket_size)
+    ]
+    log.info(
+        "Backfilling %d/%d symbols in %d buckets for job %s",
+        len(remaining),
+        len(position),
+        len(buckets),
+        job,
+    )
+
+    days = dict.fromkeys(range(len(buckets)), chunk_days)
+    waiting = list(range(len(buckets)))[::-1]
+    running: dict[PrefectFuture[ChunkStats], int] = {}
+    completed: list[ChunkStats] = []
+    failed: dict[int, BaseException] = {}
+
+    def submit(bucket: int) -> None:
+        chunk_start = min(position[s] for s in buckets[bucket])
+        chunk_end = min(end, chunk_start + timedelta(days=days[bucket]))
+        chunk_symbols = [s for s in buckets[bucket] if position[s] < chunk_end]
+        future = backfill_chunk.submit(
+            job,
+            bucket,
+            chunk_symbols,
+            chunk_start,
+            chunk_end,
+            db_url,
+            rate_per_sec,
+            max_retries,
+            backoff,
+        )
+        running[future] = bucket
+
+    while waiting and len(running) < parallelism:
+        submit(waiting.pop())
+    while running:
+        future = next(as_completed(list(running)))
+        bucket = running.pop(future)
+        try:
+            stats = future.result()
+        except Exception as e:
+            log.exception("Backfill of bucket %d stopped", bucket)
+            failed[bucket] = e
+        else:
+            completed.append(stats)
+            for s in buckets[bucket]:
+                position[s] = max(position[s], stats.end)
+            days[bucket] = next_chunk_days(
+                days[bucket],
+                stats.seconds,
+                target_seconds,
+                min_chunk_days,
+                max_chunk_days,
+            )
+            if stats.end < end:
+                waiting.append(bucket)
+        if waiting:
+            submit(waiting.pop())
+
+    if completed:
+        create_table_artifact(
+            [
+                {
+                    **asdict(s),
+                    "start": str(s.start),
+                    "end": str(s.end),
+                    "rows_per_sec": round(s.rows_per_sec),
+                }
+                for s in completed
+            ],
+            key="backfill-chunks",
+            description=f"Chunks completed for backfill job {job}",
+        )
+    if failed:
+        msg = f"Backfill stopped for buckets {sorted(failed)}; rerun to resume"
+        raise RuntimeError(msg)
+    return completed
@@ -1,22 +1,47 @@
 from prefect import Flow, Task
 from prefect.client.schemas.objects import FlowRun, State, TaskRun
+from prefect.context import FlowRunContext
 
 from app.common.email_sender import email_send_message
+from app.flows.notifications import StateEvent, get_dispatcher
 
+EMAIL_FROM = "test"
+EMAIL_TO = "recipient@example.com"
 
-def task_state_hook(task: Task, task_run: TaskRun, state: State) -> None:
+
+def send_email(subject: str, msg: str) -> None:
     email_send_message(
-        subject=f"Task {task.name} run {task_run.id} completed",
-        msg=f"Task {task.name} run {task_run.id} has completed with state: {state}",
-        email_from="test",
-        email_to="recipient@example.com",
+        subject=subject,
+        msg=msg,
+        email_from=EMAIL_FROM,
+        email_to=EMAIL_TO,
+    )
+
+
+def task_state_hook(task: Task, task_run: TaskRun, state: State) -> None:
+    # Only queues the event; one digest per flow run is sent in the background
+    context = FlowRunContext.get()
+    started = task_run.start_time
+    get_dispatcher(send_email).put(
+        StateEvent(
+            flow_run_id=str(task_run.flow_run_id),
+            flow_name=context.flow.name if context and context.flow else "",
+            state=state.name,
+            timestamp=state.timestamp,
+            task_name=task_run.name or task.name,
+            duration=(state.timestamp - started).total_seconds() if started else 0.0,
+            message=state.message,
+        ),
     )
 
 
 def flow_state_hook(flow: Flow, flow_run: FlowRun, state: State) -> None:
-    email_send_message(
-        subject=f"Flow {flow.name} run {flow_run.id} completed",
-        msg=f"Flow {flow.name} run {flow_run.id} has completed with state: {state.data}",
-        email_from="test",
-        email_to="recipient@example.com",
+    get_dispatcher(send_email).put(
+        StateEvent(
+            flow_run_id=str(flow_run.id),
+            flow_name=flow.name,
+            state=state.name,
+            timestamp=state.timestamp,
+            message=state.message,
+        ),
     )
@@ -0,0 +1,319 @@
+"""
+Daily bar ingestion for a symbol universe.
+
+One `fetch_symbol_bars` task is mapped over the symbols and stages each symbol's
+bars as an Arrow IPC file; a single `merge_staged_bars` task then loads every
+staged file into a staging table and upserts it into ``daily_bars`` with one
+set-based `DB.merge`.
+
+Without a start date, each symbol is fetched from the last bar stored for it,
+less a few days of overlap that pick up revised bars, so a daily run only
+downloads the new days. Fetch tasks are cached on (symbol, date range, source
+version, staging root), so a rerun after a partial failure fully fetches only the
+symbols that failed. Fetch tasks
+carry the ``yfinance`` tag; limit how many run at once across all flow runs with
+a tag concurrency limit, e.g. ``prefect concurrency-limit create yfinance 4``.
+"""
+
+import tempfile
+import uuid
+from collections.abc import Iterable
+from datetime import date, timedelta
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.ipc as ipc
+from prefect import flow, task, unmapped
+from prefect.context import TaskRunContext
+from prefect.futures import PrefectFutureList
+from prefect.task_runners import ThreadPoolTaskRunner
+from prefect.utilities.hashing import hash_objects
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    Date,
+    Float,
+    MetaData,
+    String,
+    Table,
+    func,
+    insert,
+    select,
+)
+
+from app import config, get_logger
+from app.common.database import DB
+from app.common.table_versions import (
+    bump_table_versions,
+    create_table_versions_table,
+)
+from app.flows.flow_utils import flow_state_hook, task_state_hook
+from app.mkt_data.cache import EPOCH, to_date
+from app.mkt_data.loader import (
+    BARS_SCHEMA,
+    bars_to_arrow,
+    call_with_retries,
+    may_be_throttled,
+)
+from app.mkt_data.market_data import download_yfinance_bars
+
+log = get_logger(__name__)
+
+# Bump when the provider or the normalization changes, so cached fetches are redone
+SOURCE_VERSION = "yfinance-1"
+FETCH_TAG = "yfinance"
+STAGING_DIR = Path(tempfile.gettempdir()) / "quant-staging" / "bars"
+
+_metadata = MetaData()
+
+daily_bars_table = Table(
+    "daily_bars",
+    _metadata,
+    Column("symbol", String(32), primary_key=True),
+    Column("date", Date, primary_key=True),
+    Column("open", Float),
+    Column("high", Float),
+    Column("low", Float),
+    Column("close", Float),
+    Column("volume", BigInteger),
+)
+
+
+def staged_path(
+    staging_dir: str | Path,
+    symbol: str,
+    start: date,
+    end: date,
+    source_version: str,
+) -> Path:
+    return Path(staging_dir) / source_version / f"{symbol}_{start}_{end}.arrow"
+
+
+def _fetch_cache_key(context: TaskRunContext, parameters: dict) -> str:
+    return hash_objects(
+        parameters["symbol"],
+        parameters["start"],
+        parameters["end"],
+        parameters["source_version"],
+        str(Path(parameters["staging_dir"]).resolve()),
+    )
+
+
+@task(
+    tags=[FETCH_TAG],
+    cache_key_fn=_fetch_cache_key,
+    task_run_name="fetch-{symbol}",
+    on_completion=[task_state_hook],
+    on_failure=[task_state_hook],
+)
+def fetch_symbol_bars(
+    symbol: str,
+    start: date,
+    end: date,
+    source_version: str,
+    staging_dir: str,
+    max_retries: int = 3,
+    backoff: float = 0.5,
+) -> str:
+    """
+    Downloads one symbol's bars for [start, end) and stages them as an Arrow file.
+
+    Returns:
+        str: Path of the staged file.
+    """
+    bars = call_with_retries(
+        lambda: bars_to_arrow(symbol, download_yfinance_bars(symbol, start, end)),
+        symbol,
+        None,
+        max_retries,
+        backoff,
+        may_be_throttled(start, end),
+    )
+    path = staged_path(staging_dir, symbol, start, end, source_version)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    with pa.OSFile(str(tmp), "wb") as sink, ipc.new_file(sink, BARS_SCHEMA) as writer:
+        writer.write_table(bars)
+    tmp.replace(path)
+    log.debug("Staged %d rows for %s at %s", bars.num_rows, symbol, path)
+    return str(path)
+
+
+def read_staged(paths: list[str]) -> pa.Table:
+    tables = [ipc.open_file(pa.memory_map(p)).read_all() for p in paths]
+    return pa.concat_tables(tables) if tables else BARS_SCHEMA.empty_table()
+
+
+def create_merge_tables(db: DB, tables: Iterable[Table]) -> None:
+    """
+    Creates `tables` and ``table_versions`` if they do not exist.
+
+    Flows call this once before fanning out to `merge_table`: a check-then-create
+    in every task races on a fresh database, and all but one task fail with
+    "table already exists".
+    """
+    engine = db.get_engine()
+    for table in tables:
+        table.create(engine, checkfirst=True)
+    create_table_versions_table(db)
+
+
+def merge_table(db: DB, table: Table, data: pa.Table) -> int:
+    """
+    Upserts `data` into `table` in one set-based statement.
+
+    The rows are loaded into a uniquely named copy of `table` (with ADBC on
+    PostgreSQL), merged into the target with `DB.merge` and the copy is dropped.
+    The version of `table` is bumped, so reports built from it are refreshed.
+    `table` and ``table_versions`` must exist, see `create_merge_tables`.
+
+    Returns:
+        int: Number of rows merged.
+    """
+    if data.num_rows == 0:
+        return 0
+    engine = db.get_engine()
+    staging = table.to_metadata(
+        MetaData(),
+        name=f"{table.name}_staging_{uuid.uuid4().hex[:8]}",
+    )
+    try:
+        if db.dialect == "postgresql":
+            db.bulk_insert(staging.name, data, mode="create")
+        else:
+            staging.create(engine)
+            db.execute(insert(staging), data.to_pylist())
+        db.merge(staging.name, table.name)
+    finally:
+        staging.drop(engine, checkfirst=True)
+    bump_table_versions(db, [table.name])
+    return data.num_rows
+
+
+def fetch_starts(
+    db: DB,
+    symbols: list[str],
+    start_date: date | None,
+    overlap_days: int,
+) -> dict[str, date]:
+    """
+    Returns the fetch start of every symbol: `start_date` if given, otherwise the
+    day after the symbol's last stored bar less `overlap_days`, or `EPOCH` for a
+    symbol without bars.
+    """
+    if start_date is not None:
+        return dict.fromkeys(symbols, to_date(start_date, EPOCH))
+    t = daily_bars_table.c
+    rows = db.fetch_all(
+        select(t.symbol, func.max(t.date).label("last"))
+        .where(t.symbol.in_(symbols))
+        .group_by(t.symbol),
+    )
+    last = {row.symbol: row.last for row in rows}
+    overlap = timedelta(days=overlap_days - 1)
+    return {s: max(EPOCH, last[s] - overlap) if s in last else EPOCH for s in symbols}
+
+
+@task
+def merge_staged_bars(paths: list[str], db_url: str) -> int:
+    """
+    Upserts every staged file into ``daily_bars`` in one statement.
+
+    Returns:
+        int: Number of rows merged.
+    """
+    rows = merge_table(DB(db_url), daily_bars_table, read_staged(paths))
+    log.info("Merged %d bars from %d staged files", rows, len(paths))
+    return rows
+
+
+def _results(
+    symbols: list[str],
+    futures: PrefectFutureList[str],
+) -> tuple[dict[str, str], dict[str, BaseException]]:
+    paths: dict[str, str] = {}
+    errors: dict[str, BaseException] = {}
+    for symbol, future in zip(symbols, futures, strict=True):
+        try:
+            paths[symbol] = future.result()
+        except Exception as e:
+            errors[symbol] = e
+    return paths, errors
+
+
+@flow(
+    task_runner=ThreadPoolTaskRunner(max_workers=8),
+    on_completion=[flow_state_hook],
+    on_failure=[flow_state_hook],
+)
+def ingest_bars_flow(
+    symbols: list[str],
+    start_date: date | None = None,
+    end_date: date | None = None,
+    db_url: str | None = None,
+    staging_dir: str | None = None,
+    source_version: str = SOURCE_VERSION,
+    max_retries: int = 3,
+    backoff: float = 0.5,
+    overlap_days: int = 5,
+) -> int:
+    """
+    Fetches daily bars for `symbols` over [start_date, end_date) and merges them
+    into ``daily_bars``.
+
+    Symbols that fail after `max_retries` are reported after the successful ones
+    have been merged, and the run fails; rerunning it with the same parameters
+    only refetches those symbols in full.
+
+    Args:
+        symbols (list[str]): Universe to ingest; duplicates are fetched once.
+        start_date, end_date: Date range, `end_date` exclusive and today by
+            default. Without `start_date` each symbol starts from its last stored
+            bar, see `fetch_starts`, or from the full history.
+        db_url (str | None): Target database, `config.POSTGRES_URL` by default.
+        staging_dir (str | None): Root of the staged Arrow files.
+        source_version (str): Part of the cache key; change it to refetch all.
+        overlap_days (int): Stored days fetched again when `start_date` is None.
+
+    Returns:
+        int: Number of rows merged.
+    """
+    symbols = list(dict.fromkeys(s.upper() for s in symbols))
+    # `end` is exclusive, so today's incomplete bar is left out by default
+    end = to_date(end_date, date.today())
+    staging_dir = staging_dir or str(STAGING_DIR)
+    db_url = db_url or config.POSTGRES_URL
+    db = DB(db_url)
+    create_merge_tables(db, [daily_bars_table])
+    starts = fetch_starts(db, symbols, start_date, overlap_days)
+    # Symbols already stored through `end`
+    symbols = [s for s in symbols if starts[s] < end]
+
+    fetch_args = (
+        unmapped(end),
+        unmapped(source_version),
+        unmapped(staging_dir),
+        unmapped(max_retries),
+        unmapped(backoff),
+    )
+    paths, errors = _results(
+        symbols,
+        fetch_symbol_bars.map(symbols, [starts[s] for s in symbols], *fetch_args),
+    )
+    # A cache hit only returns a path; refetch symbols whose staged file is gone
+    stale = [s for s, path in paths.items() if not Path(path).exists()]
+    if stale:
+        refetch = fetch_symbol_bars.with_options(refresh_cache=True)
+        refetched, refetch_errors = _results(
+            stale,
+            refetch.map(stale, [starts[s] for s in stale], *fetch_args),
+        )
+        paths.update(refetched)
+        errors.update(refetch_errors)
+
+    rows = merge_staged_bars(list(paths.values()), db_url)
+    log.info("Ingested bars for %d/%d symbols", len(paths), len(symbols))
+    if errors:
+        msg = f"Failed to fetch bars for {sorted(errors)}"
+        raise RuntimeError(msg)
+    return rows
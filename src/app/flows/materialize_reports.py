@@ -0,0 +1,113 @@
+"""
+Materialization of the UI reports.
+
+The flow compares each report's live snapshot with the current versions of its
+upstream tables and only rebuilds the reports whose inputs changed; scheduling
+it after the ingestion flows keeps the UI a refresh behind the database.
+"""
+
+from dataclasses import asdict
+from pathlib import Path
+
+from prefect import flow, task
+from prefect.artifacts import create_table_artifact
+from prefect.task_runners import ThreadPoolTaskRunner
+
+from app import config, get_logger
+from app.common.database import DB
+from app.common.table_versions import get_table_versions
+from app.flows.flow_utils import flow_state_hook, task_state_hook
+from app.ui.reports.registry import RefreshResult, get_reports, is_stale, refresh_report
+from app.ui.reports.store import ReportStore
+
+log = get_logger(__name__)
+
+
+@task(
+    task_run_name="refresh-{name}",
+    on_completion=[task_state_hook],
+    on_failure=[task_state_hook],
+)
+def refresh_report_task(
+    name: str,
+    db_url: str,
+    reports_dir: str,
+    *,
+    force: bool = False,
+) -> RefreshResult:
+    (report,) = get_reports([name])
+    result = refresh_report(DB(db_url), ReportStore(reports_dir), report, force=force)
+    log.info(
+        "Report %s: %d rows in %.2fs",
+        name,
+        result.meta.rows,
+        result.meta.build_seconds,
+    )
+    return result
+
+
+@flow(
+    task_runner=ThreadPoolTaskRunner(max_workers=4),
+    on_completion=[flow_state_hook],
+    on_failure=[flow_state_hook],
+)
+def materialize_reports_flow(
+    names: list[str] | None = None,
+    db_url: str | None = None,
+    reports_dir: str | None = None,
+    *,
+    force: bool = False,
+) -> list[RefreshResult]:
+    """
+    Rebuilds the stale reports among `names`, all registered reports by default.
+
+    Args:
+        names (list[str] | None): Reports to refresh.
+        db_url (str | None): Source database, `config.POSTGRES_URL` by default.
+        reports_dir (str | None): Snapshot root, `config.REPORTS_DIR` by default.
+        force (bool): Rebuild even reports whose upstream tables are unchanged.
+
+    Returns:
+        list[RefreshResult]: One per rebuilt report.
+    """
+    db_url = db_url or config.POSTGRES_URL
+    reports_dir = reports_dir or str(config.REPORTS_DIR)
+    db, store = DB(db_url), ReportStore(Path(reports_dir))
+
+    reports = get_reports(names)
+    stale = [
+        r.name
+        for r in reports
+        if force or is_stale(r, store.meta(r.name), get_table_versions(db, r.upstream))
+    ]
+    log.info("Refreshing %d of %d reports: %s", len(stale), len(reports), stale)
+    futures = [
+        refresh_report_task.submit(name, db_url, reports_dir, force=force)
+        for name in stale
+    ]
+
+    results: list[RefreshResult] = []
+    errors: dict[str, BaseException] = {}
+    for name, future in zip(stale, futures, strict=True):
+        try:
+            results.append(future.result())
+        except Exception as e:
+            errors[name] = e
+
+    if results:
+        create_table_artifact(
+            [
+                {
+                    **asdict(r.meta),
+                    "upstream": str(r.meta.upstream),
+                    "built_at": r.meta.built_at.isoformat(),
+                }
+                for r in results
+            ],
+            key="materialized-reports",
+            description="Reports rebuilt in this run",
+        )
+    if errors:
+        msg = f"Failed to materialize reports {sorted(errors)}"
+        raise RuntimeError(msg)
+    return results
@@ -12,9 +12,9 @@ def my_flow(current_time: datetime | None = None):
     if current_time is None:
         current_time = datetime.now()
     exec_env = os.getenv("EXECUTION_ENVIRONMENT")
-    log.info(f"Execution environment: {exec_env}")
-    log.info(f"{log.handlers} {log.level} {log.name}")
-    log.info(f"Current time: {current_time}")
+    log.info("Execution environment: %s", exec_env)
+    log.info("%s %s %s", log.handlers, log.level, log.name)
+    log.info("Current time: %s", current_time)
     log.info("app logger info message")
     log.debug("app logger debug message")
     log.warning("app logger warning message")
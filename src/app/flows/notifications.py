@@ -0,0 +1,221 @@
+"""
+Non-blocking, coalescing delivery of flow and task state notifications.
+
+State hooks only build a `StateEvent` and put it on a queue. A background worker
+groups the events of each flow run into a `Digest` and delivers one message per
+run, when the flow's own event arrives or once the run has been quiet for
+`idle_timeout` seconds, retrying failed deliveries with exponential backoff.
+"""
+
+import atexit
+import heapq
+import html
+import queue
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from app import get_logger
+
+log = get_logger(__name__)
+
+# send(subject, html_body)
+SendFn = Callable[[str, str], object]
+
+
+@dataclass(frozen=True)
+class StateEvent:
+    flow_run_id: str
+    flow_name: str
+    state: str
+    timestamp: datetime
+    # None for the flow run's own state
+    task_name: str | None = None
+    duration: float = 0.0
+    message: str | None = None
+
+
+@dataclass
+class Digest:
+    """All state events of one flow run."""
+
+    flow_run_id: str
+    flow_name: str
+    counts: Counter = field(default_factory=Counter)
+    durations: list[tuple[float, str]] = field(default_factory=list)
+    failures: list[tuple[str, str]] = field(default_factory=list)
+    flow_state: str | None = None
+    updated: float = field(default_factory=time.monotonic)
+
+    def add(self, event: StateEvent) -> None:
+        self.updated = time.monotonic()
+        self.flow_name = self.flow_name or event.flow_name
+        if event.task_name is None:
+            self.flow_state = event.state
+            if event.state != "Completed":
+                self.failures.append((self.flow_name, event.message or ""))
+            return
+        self.counts[event.state] += 1
+        self.durations.append((event.duration, event.task_name))
+        if event.state in ("Failed", "Crashed"):
+            self.failures.append((event.task_name, event.message or ""))
+
+    def subject(self) -> str:
+        state = self.flow_state or "Running"
+        tasks = sum(self.counts.values())
+        failed = self.counts["Failed"] + self.counts["Crashed"]
+        return (
+            f"Flow {self.flow_name} run {self.flow_run_id} {state}: "
+            f"{tasks} tasks, {failed} failed"
+        )
+
+    def render(self, top: int = 5, max_failures: int = 20) -> str:
+        counts = "".join(
+            f"<li>{html.escape(state)}: {n}</li>"
+            for state, n in self.counts.most_common()
+        )
+        slowest = "".join(
+            f"<li>{html.escape(name)}: {seconds:.1f}s</li>"
+            for seconds, name in heapq.nlargest(top, self.durations)
+        )
+        failures = "".join(
+            f"<li><b>{html.escape(name)}</b>: {html.escape(message[:500])}</li>"
+            for name, message in self.failures[:max_failures]
+        )
+        if len(self.failures) > max_failures:
+            failures += f"<li>... and {len(self.failures) - max_failures} more</li>"
+        return (
+            f"<p>Flow <b>{html.escape(self.flow_name)}</b> run {self.flow_run_id}: "
+            f"{html.escape(self.flow_state or 'Running')}</p>"
+            f"<h4>Task states</h4><ul>{counts}</ul>"
+            f"<h4>Slowest tasks</h4><ul>{slowest}</ul>"
+            f"<h4>Failures</h4><ul>{failures or '<li>None</li>'}</ul>"
+        )
+
+
+_STOP = object()
+
+
+class NotificationDispatcher:
+    """
+    Coalesces state events per flow run and delivers them from a daemon thread.
+
+    Args:
+        send (SendFn): Delivers one digest; exceptions trigger a retry.
+        idle_timeout (float): Seconds without events after which a run's digest is
+            delivered even though its flow event has not arrived.
+        max_retries (int): Retries per digest after the first failed delivery.
+        backoff (float): Base retry delay in seconds, doubled after every failure.
+    """
+
+    def __init__(
+        self,
+        send: SendFn,
+        idle_timeout: float = 300.0,
+        max_retries: int = 3,
+        backoff: float = 1.0,
+    ) -> None:
+        self.send = send
+        self.idle_timeout = idle_timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.delivered = 0
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._digests: dict[str, Digest] = {}
+        self._thread = threading.Thread(
+            target=self._run,
+            name="notification-dispatcher",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def put(self, event: StateEvent) -> None:
+        """Queues an event; never blocks."""
+        self._queue.put(event)
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """
+        Delivers every pending digest, complete or not, and waits until done.
+        """
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self, timeout: float | None = None) -> None:
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while True:
+            try:
+                item = self._queue.get(timeout=min(self.idle_timeout, 1.0))
+            except queue.Empty:
+                item = None
+            if item is _STOP:
+                self._deliver_all()
+                return
+            if isinstance(item, threading.Event):
+                self._deliver_all()
+                item.set()
+            elif isinstance(item, StateEvent):
+                digest = self._digests.get(item.flow_run_id)
+                if digest is None:
+                    digest = Digest(item.flow_run_id, item.flow_name)
+                    self._digests[item.flow_run_id] = digest
+                digest.add(item)
+                if item.task_name is None:
+                    self._deliver(self._digests.pop(item.flow_run_id))
+            now = time.monotonic()
+            for run_id in [
+                run_id
+                for run_id, digest in self._digests.items()
+                if now - digest.updated >= self.idle_timeout
+            ]:
+                self._deliver(self._digests.pop(run_id))
+
+    def _deliver_all(self) -> None:
+        while self._digests:
+            self._deliver(self._digests.pop(next(iter(self._digests))))
+
+    def _deliver(self, digest: Digest) -> None:
+        subject, body = digest.subject(), digest.render()
+        for attempt in range(self.max_retries + 1):
+            try:
+                self.send(subject, body)
+            except Exception:
+                if attempt == self.max_retries:
+                    log.exception("Giving up on notification: %s", subject)
+                    return
+                delay = self.backoff * 2**attempt
+                log.warning(
+                    "Notification failed (attempt %d/%d), retrying in %.2fs",
+                    attempt + 1,
+                    self.max_retries + 1,
+                    delay,
+                )
+                time.sleep(delay)
+            else:
+                self.delivered += 1
+                return
+
+
+_dispatcher: NotificationDispatcher | None = None
+_lock = threading.Lock()
+
+
+def get_dispatcher(send: SendFn) -> NotificationDispatcher:
+    """
+    Returns the process-wide dispatcher, starting it with `send` on first use.
+    Pending digests are delivered at interpreter exit.
+    """
+    global _dispatcher
+    if _dispatcher is None:
+        with _lock:
+            if _dispatcher is None:
+                _dispatcher = NotificationDispatcher(send)
+                atexit.register(_dispatcher.close, 30.0)
+    return _dispatcher
@@ -0,0 +1,21 @@
+"""
+Market data providers, caches and stores. Submodules are imported on first attribute access.
+"""
+
+from app._lazy import attach
+
+__getattr__, __dir__, __all__ = attach(
+    __name__,
+    [
+        "bar_store",
+        "cache",
+        "constituents",
+        "corporate_actions",
+        "loader",
+        "market_data",
+        "option_chains",
+        "providers",
+        "security_master",
+        "ticks",
+    ],
+)
@@ -0,0 +1,251 @@
+import fcntl
+import json
+import os
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from app import get_logger
+
+log = get_logger(__name__)
+
+_META = "meta.json"
+_DATE = "date"
+
+
+class BarStore:
+    """
+    Append-only, memory-mapped columnar store of daily bars.
+
+    Layout::
+
+        <root>/<SYMBOL>/meta.json     committed row count and field dtypes
+        <root>/<SYMBOL>/date.bin      datetime64[D] as fixed-width int64
+        <root>/<SYMBOL>/<field>.bin   one fixed-width column per field
+
+    Readers map the column files with ``np.memmap`` and slice them by date with a
+    binary search, so reads return views into the OS page cache shared by every
+    process. Appends write past the committed row count and then atomically
+    replace ``meta.json``; readers never see a partially written row, and bytes
+    left behind by an interrupted append are truncated by the next one.
+    """
+
+    def __init__(self, root: str | Path) -> None:
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._maps: dict[tuple[str, str], np.memmap] = {}
+        self._metas: dict[str, tuple[tuple[int, int], dict]] = {}
+        self._lock = threading.Lock()
+
+    def _dir(self, symbol: str) -> Path:
+        return self.root / symbol.upper()
+
+    def symbols(self) -> list[str]:
+        return sorted(p.parent.name for p in self.root.glob(f"*/{_META}"))
+
+    def meta(self, symbol: str) -> dict:
+        path = self._dir(symbol) / _META
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return {"rows": 0, "fields": {}}
+        # meta.json is only ever replaced, so its inode and mtime identify a version
+        version = (stat.st_ino, stat.st_mtime_ns)
+        cached = self._metas.get(symbol.upper())
+        if cached is None or cached[0] != version:
+            cached = (version, json.loads(path.read_text()))
+            self._metas[symbol.upper()] = cached
+        return cached[1]
+
+    @contextmanager
+    def _write_lock(self, symbol: str) -> Iterator[None]:
+        # Cross-process writer lock; readers never take it
+        directory = self._dir(symbol)
+        directory.mkdir(parents=True, exist_ok=True)
+        with (directory / ".lock").open("w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def append(self, symbol: str, bars: pd.DataFrame) -> int:
+        """
+        Appends bars (date index, one column per field) after the last stored date.
+
+        Rows on or before the last stored date are skipped, so re-appending an
+        overlapping download is a no-op for the overlap. The field set is fixed by
+        the first append; later missing fields are stored as NaN.
+
+        Returns:
+            int: Number of rows appended.
+        """
+        bars = bars.rename(columns=str.lower).sort_index()
+        dates = pd.DatetimeIndex(bars.index).to_numpy(dtype="datetime64[D]")
+        with self._write_lock(symbol):
+            meta = self.meta(symbol)
+            rows = meta["rows"]
+            fields: dict[str, str] = meta["fields"] or {
+                col: np.dtype("float64").str for col in bars.columns
+            }
+            extra = set(bars.columns) - set(fields)
+            if extra:
+                msg = f"Fields {sorted(extra)} are not stored for {symbol}"
+                raise ValueError(msg)
+
+            if rows:
+                last = self._column(symbol, _DATE, "<M8[D]", rows)[-1]
+                keep = dates > last
+                bars, dates = bars[keep], dates[keep]
+            if len(dates) == 0:
+                return 0
+
+            columns = {_DATE: dates.astype("<M8[D]")}
+            for name, dtype in fields.items():
+                values = (
+                    bars[name].to_numpy(dtype=dtype)
+                    if name in bars.columns
+                    else np.full(len(dates), np.nan, dtype=dtype)
+                )
+                columns[name] = values
+            for name, values in columns.items():
+                self._append_column(symbol, name, values, rows)
+
+            new_meta = {"rows": rows + len(dates), "fields": fields}
+            tmp = self._dir(symbol) / f"{_META}.tmp"
+            tmp.write_text(json.dumps(new_meta))
+            tmp.replace(self._dir(symbol) / _META)
+        log.debug("Appended %d rows to %s", len(dates), symbol)
+        return len(dates)
+
+    def _append_column(
+        self,
+        symbol: str,
+        name: str,
+        values: np.ndarray,
+        committed_rows: int,
+    ) -> None:
+        path = self._dir(symbol) / f"{name}.bin"
+        with path.open("ab") as f:
+            # Discard bytes from an interrupted append before writing
+            f.truncate(committed_rows * values.dtype.itemsize)
+            f.write(np.ascontiguousarray(values).tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _column(self, symbol: str, name: str, dtype: str, rows: int) -> np.ndarray:
+        if rows == 0:
+            return np.empty(0, dtype=dtype)
+        key = (symbol.upper(), name)
+        with self._lock:
+            mapped = self._maps.get(key)
+            if mapped is None or len(mapped) < rows:
+                mapped = np.memmap(
+                    self._dir(symbol) / f"{name}.bin",
+                    dtype=dtype,
+                    mode="r",
+                    shape=(rows,),
+                )
+                self._maps[key] = mapped
+        return mapped[:rows]
+
+    def read(
+        self,
+        symbol: str,
+        start_date: str | date | None = None,
+        end_date: str | date | None = None,
+        fields: list[str] | None = None,
+    ) -> dict[str, np.ndarray]:
+        """
+        Returns read-only views of the columns for [start_date, end_date).
+
+        Returns:
+            dict[str, np.ndarray]: ``date`` plus the requested fields, all views
+                into the memory-mapped files.
+        """
+        meta = self.meta(symbol)
+        rows = meta["rows"]
+        dates = self._column(symbol, _DATE, "<M8[D]", rows)
+        lo = 0 if start_date is None else np.searchsorted(dates, _day(start_date))
+        hi = rows if end_date is None else np.searchsorted(dates, _day(end_date))
+        result = {_DATE: dates[lo:hi]}
+        for name in list(meta["fields"]) if fields is None else fields:
+            if name not in meta["fields"]:
+                msg = f"Field {name} is not stored for {symbol}"
+                raise KeyError(msg)
+            column = self._column(symbol, name, meta["fields"][name], rows)
+            result[name] = column[lo:hi]
+        return result
+
+    def panel(
+        self,
+        symbols: list[str],
+        field: str = "close",
+        start_date: str | date | None = None,
+        end_date: str | date | None = None,
+    ) -> pd.DataFrame:
+        """
+        Returns a (dates x symbols) frame of `field` on the union of stored dates.
+        """
+        slices = [self.read(s, start_date, end_date, [field]) for s in symbols]
+        return align_panel(symbols, slices, field)
+
+
+def align_panel(
+    symbols: list[str],
+    slices: list[dict[str, np.ndarray]],
+    field: str,
+) -> pd.DataFrame:
+    """
+    Aligns per-symbol column slices (as returned by `BarStore.read`) into a
+    (dates x symbols) frame of `field` on the union of their dates.
+    """
+    # Symbols usually share a trading calendar, so only distinct date arrays are
+    # merged and each one is positioned on the calendar once
+    distinct: list[np.ndarray] = []
+    owners: list[int] = []
+    for columns in slices:
+        dates = columns[_DATE]
+        match = next(
+            (k for k, other in enumerate(distinct) if _same_dates(dates, other)),
+            None,
+        )
+        if match is None:
+            match = len(distinct)
+            distinct.append(dates)
+        owners.append(match)
+    calendar = (
+        np.asarray(distinct[0])
+        if len(distinct) == 1
+        else np.unique(np.concatenate(distinct or [[]]))
+    ).astype("datetime64[D]")
+    positions = [
+        np.searchsorted(calendar.view("int64"), dates.view("int64"))
+        for dates in distinct
+    ]
+    values = np.full((len(calendar), len(symbols)), np.nan, order="F")
+    for i, (columns, owner) in enumerate(zip(slices, owners, strict=True)):
+        if len(positions[owner]) == len(calendar):
+            values[:, i] = columns[field]
+        else:
+            values[positions[owner], i] = columns[field]
+    return pd.DataFrame(
+        values,
+        index=pd.DatetimeIndex(calendar, name="Date"),
+        columns=symbols,
+    )
+
+
+def _same_dates(a: np.ndarray, b: np.ndarray) -> bool:
+    if len(a) != len(b):
+        return False
+    return len(a) == 0 or (a[0] == b[0] and a[-1] == b[-1] and np.array_equal(a, b))
+
+
+def _day(value: str | date) -> np.datetime64:
+    return np.datetime64(pd.Timestamp(value).date(), "D")
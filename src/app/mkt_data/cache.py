@@ -0,0 +1,199 @@
+import json
+import threading
+from collections.abc import Callable
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from app import get_logger
+
+log = get_logger(__name__)
+
+# fetch(ticker, start, end) -> daily bars indexed by date with lowercase field columns.
+# `end` is exclusive, matching yfinance.
+FetchFn = Callable[[str, date, date], pd.DataFrame]
+
+EPOCH = date(1970, 1, 1)
+_COVERAGE_KEY = b"coverage"
+
+
+def to_date(value: str | date | pd.Timestamp | None, default: date) -> date:
+    if value is None:
+        return default
+    return pd.Timestamp(value).date()
+
+
+def merge_ranges(ranges: list[tuple[date, date]]) -> list[tuple[date, date]]:
+    """Sort half-open [start, end) ranges and merge overlapping or adjacent ones."""
+    merged: list[tuple[date, date]] = []
+    for lo, hi in sorted(ranges):
+        if merged and lo <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], hi))
+        else:
+            merged.append((lo, hi))
+    return merged
+
+
+def missing_ranges(
+    covered: list[tuple[date, date]],
+    start: date,
+    end: date,
+) -> list[tuple[date, date]]:
+    """Return the parts of [start, end) not covered by the merged `covered` ranges."""
+    gaps: list[tuple[date, date]] = []
+    cursor = start
+    for lo, hi in covered:
+        if hi <= cursor:
+            continue
+        if lo >= end:
+            break
+        if lo > cursor:
+            gaps.append((cursor, lo))
+        cursor = max(cursor, hi)
+    if cursor < end:
+        gaps.append((cursor, end))
+    return gaps
+
+
+class BarCache:
+    """
+    Persistent Parquet cache of daily bars keyed by (ticker, field).
+
+    Each (ticker, field) pair is stored as ``<root>/<TICKER>/<field>.parquet`` with
+    ``date`` and ``value`` columns. The date ranges already fetched are kept in the
+    file's schema metadata, so a request only fetches the gaps it does not hold yet.
+    Ranges are half-open ``[start, end)``; holidays and weekends inside a fetched
+    range are remembered as covered and never requested again. A fetch returning no
+    bars is not recorded, as providers also answer failures with an empty frame, so
+    the range is requested again next time.
+    """
+
+    def __init__(self, root: str | Path, fetch: FetchFn) -> None:
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.fetch = fetch
+        self._lock = threading.Lock()
+
+    def path(self, ticker: str, field: str) -> Path:
+        return self.root / ticker.upper() / f"{field}.parquet"
+
+    def coverage(self, ticker: str, field: str) -> list[tuple[date, date]]:
+        """
+        Returns the merged date ranges held for (ticker, field).
+        """
+        path = self.path(ticker, field)
+        if not path.exists():
+            return []
+        metadata = pq.read_schema(path).metadata or {}
+        raw = json.loads(metadata.get(_COVERAGE_KEY, b"[]"))
+        return [(date.fromisoformat(lo), date.fromisoformat(hi)) for lo, hi in raw]
+
+    def get(
+        self,
+        ticker: str,
+        field: str = "close",
+        start_date: str | date | None = None,
+        end_date: str | date | None = None,
+    ) -> pd.Series:
+        """
+        Returns the cached series for [start_date, end_date), fetching missing gaps.
+
+        A missing `start_date` means the full history and a missing `end_date`
+        means today (exclusive), so a partially formed bar is never cached.
+        """
+        start = to_date(start_date, EPOCH)
+        end = to_date(end_date, date.today())
+        with self._lock:
+            for gap_start, gap_end in missing_ranges(
+                self.coverage(ticker, field),
+                start,
+                end,
+            ):
+                log.info("Fetching %s %s for %s..%s", ticker, field, gap_start, gap_end)
+                bars = self.fetch(ticker, gap_start, gap_end)
+                self._store(ticker, field, bars, gap_start, gap_end)
+            return self._read(ticker, field, start, end)
+
+    def _store(
+        self,
+        ticker: str,
+        field: str,
+        bars: pd.DataFrame,
+        start: date,
+        end: date,
+    ) -> None:
+        if bars.empty:
+            log.warning(
+                "No %s bars for %s..%s; not marking the range as covered",
+                ticker,
+                start,
+                end,
+            )
+            return
+        # Every field returned by the fetch is stored, so a later request for another
+        # field of the same ticker and range is served without a second download.
+        fields = {str(col).lower() for col in bars.columns} | {field}
+        columns = {str(col).lower(): col for col in bars.columns}
+        dates = pd.DatetimeIndex(bars.index).date
+        for name in fields:
+            values = (
+                bars[columns[name]].to_numpy(dtype="float64") if name in columns else []
+            )
+            new = pa.table(
+                {
+                    "date": pa.array(dates if name in columns else [], pa.date32()),
+                    "value": pa.array(values, pa.float64()),
+                },
+            )
+            self._write(ticker, name, new, (start, end))
+
+    def _write(
+        self,
+        ticker: str,
+        field: str,
+        new: pa.Table,
+        fetched: tuple[date, date],
+    ) -> None:
+        path = self.path(ticker, field)
+        coverage = merge_ranges([*self.coverage(ticker, field), fetched])
+        if path.exists():
+            old = pq.read_table(path).replace_schema_metadata(None)
+            # Drop overlapping dates from the old data so refetched bars win
+            keep = pc.invert(
+                pc.is_in(old["date"], value_set=new["date"]),
+            )
+            new = pa.concat_tables([old.filter(keep), new])
+        new = new.sort_by("date").replace_schema_metadata(
+            {
+                _COVERAGE_KEY: json.dumps(
+                    [[lo.isoformat(), hi.isoformat()] for lo, hi in coverage],
+                ),
+            },
+        )
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".parquet.tmp")
+        pq.write_table(new, tmp)
+        tmp.replace(path)
+
+    def _read(self, ticker: str, field: str, start: date, end: date) -> pd.Series:
+        path = self.path(ticker, field)
+        if not path.exists():
+            return pd.Series(
+                [],
+                index=pd.DatetimeIndex([], name="Date"),
+                name=field,
+                dtype="float64",
+            )
+        table = pq.read_table(
+            path,
+            filters=[("date", ">=", start), ("date", "<", end)],
+        )
+        return pd.Series(
+            table["value"].to_numpy(),
+            index=pd.DatetimeIndex(table["date"].to_numpy(), name="Date"),
+            name=field,
+        )
@@ -0,0 +1,304 @@
+import threading
+from collections.abc import Iterable
+from datetime import date
+from pathlib import Path
+from typing import Literal
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import Column, Date, MetaData, String, Table, bindparam, select, text
+
+from app import get_logger
+from app.common.database import DB
+
+log = get_logger(__name__)
+
+SP500_URL = "https://en.wikipedia.org/wiki/List_of_S%26P_500_companies"
+
+SP500_COLUMNS = [
+    "symbol",
+    "security_name",
+    "gics_sector",
+    "gics_sub_industry",
+    "headquarters_location",
+    "date_added",
+    "cik",
+    "founded",
+]
+
+_metadata = MetaData()
+
+membership_events_table = Table(
+    "index_membership_events",
+    _metadata,
+    Column("index_name", String(32), primary_key=True),
+    Column("symbol", String(32), primary_key=True),
+    Column("effective_date", Date, primary_key=True),
+    Column("action", String(8), primary_key=True),
+)
+
+# Typed bind so SQLAlchemy converts dates for drivers without a native date type
+_INSERT_EVENTS_SQL = text(
+    """
+    INSERT INTO index_membership_events (index_name, symbol, effective_date, action)
+    VALUES (:index_name, :symbol, :effective_date, :action)
+    ON CONFLICT DO NOTHING
+    """,
+).bindparams(bindparam("effective_date", type_=Date))
+
+_MIN_DAY = np.datetime64("0001-01-01", "D")
+_MAX_DAY = np.datetime64("9999-12-31", "D")
+
+
+def parse_sp500_constituents(source: str | Path = SP500_URL) -> pd.DataFrame:
+    """
+    Parses the current S&P 500 constituents table from the Wikipedia page.
+
+    Args:
+        source (str | Path): URL, file path or file-like object of the page, so a
+            saved copy can be parsed without network access.
+
+    Returns:
+        pd.DataFrame: One row per constituent with `SP500_COLUMNS` columns.
+    """
+    tickers: pd.DataFrame = pd.read_html(source)[0]
+    tickers.columns = SP500_COLUMNS
+    return tickers
+
+
+def parse_sp500_changes(source: str | Path = SP500_URL) -> pd.DataFrame:
+    """
+    Parses the historical changes table from the Wikipedia page.
+
+    Returns:
+        pd.DataFrame: One row per add or remove with `symbol`, `effective_date`
+            and `action` columns.
+    """
+    changes: pd.DataFrame = pd.read_html(source)[1]
+    changes.columns = [
+        "effective_date",
+        "added",
+        "added_security",
+        "removed",
+        "removed_security",
+        "reason",
+    ]
+    changes["effective_date"] = pd.to_datetime(
+        changes["effective_date"],
+        format="mixed",
+    ).dt.date
+    events = [
+        changes[["effective_date", col]]
+        .dropna()
+        .rename(columns={col: "symbol"})
+        .assign(action=action)
+        for col, action in (("added", "add"), ("removed", "remove"))
+    ]
+    return pd.concat(events, ignore_index=True)[["symbol", "effective_date", "action"]]
+
+
+class MembershipIndex:
+    """
+    In-memory point-in-time membership index built from add/remove events.
+
+    Membership is precomputed once for every date an event happens on, so a
+    lookup is a binary search over those dates followed by a row read.
+    A symbol whose first event is a removal is treated as a member since before
+    the first recorded date.
+    """
+
+    def __init__(self, events: pd.DataFrame) -> None:
+        events = events.assign(
+            effective_date=pd.to_datetime(events["effective_date"]).to_numpy(
+                dtype="datetime64[D]",
+            ),
+            _order=(events["action"] == "remove").astype(int),
+        ).sort_values(["symbol", "effective_date", "_order"])
+
+        symbols: list[str] = []
+        codes: list[int] = []
+        starts: list[np.datetime64] = []
+        ends: list[np.datetime64] = []
+        for symbol, group in events.groupby("symbol", sort=True):
+            code = len(symbols)
+            symbols.append(str(symbol))
+            start: np.datetime64 | None = None
+            first = True
+            for day, action in zip(
+                group["effective_date"],
+                group["action"],
+                strict=True,
+            ):
+                if action == "add" and start is None:
+                    start = day
+                elif action == "remove" and (start is not None or first):
+                    codes.append(code)
+                    starts.append(_MIN_DAY if start is None else start)
+                    ends.append(day)
+                    start = None
+                first = False
+            if start is not None:
+                codes.append(code)
+                starts.append(start)
+                ends.append(_MAX_DAY)
+
+        self.symbols = np.asarray(symbols, dtype=object)
+        self.starts = np.asarray(starts, dtype="datetime64[D]")
+        self.ends = np.asarray(ends, dtype="datetime64[D]")
+        self.codes = np.asarray(codes, dtype=np.intp)
+
+        # Row k holds membership from _days[k] until the next event date
+        self._days = np.concatenate(
+            [[_MIN_DAY], np.unique(events["effective_date"].to_numpy())],
+        ).astype("datetime64[D]")
+        in_interval = (self.starts[None, :] <= self._days[:, None]) & (
+            self._days[:, None] < self.ends[None, :]
+        )
+        self._matrix = np.zeros((len(self._days), len(self.symbols)), dtype=bool)
+        np.logical_or.at(self._matrix.T, self.codes, in_interval.T)
+        self._member_sets: dict[int, frozenset[str]] = {}
+
+    def _rows(self, dates: np.ndarray) -> np.ndarray:
+        return np.searchsorted(self._days, dates, side="right") - 1
+
+    def members_as_of(self, as_of: date | str | np.datetime64) -> frozenset[str]:
+        """
+        Returns the index members on `as_of`.
+        """
+        row = int(self._rows(np.datetime64(as_of, "D")))
+        members = self._member_sets.get(row)
+        if members is None:
+            members = frozenset(self.symbols[self._matrix[row]])
+            self._member_sets[row] = members
+        return members
+
+    def membership_matrix(self, dates: Iterable[date | str]) -> pd.DataFrame:
+        """
+        Returns a boolean (dates x symbols) frame, True where the symbol was a member.
+        """
+        index = pd.DatetimeIndex(list(dates))
+        rows = self._rows(index.to_numpy(dtype="datetime64[D]"))
+        return pd.DataFrame(self._matrix[rows], index=index, columns=self.symbols)
+
+    def current_members(self) -> frozenset[str]:
+        return frozenset(self.symbols[self.codes[self.ends == _MAX_DAY]])
+
+
+class ConstituentsStore:
+    """
+    Persisted index membership history stored as add/remove events.
+
+    Each snapshot is diffed against the members implied by the stored events and
+    only the differences are written, dated with the snapshot's as-of date.
+    """
+
+    def __init__(self, db: DB, index_name: str = "sp500") -> None:
+        self.db = db
+        self.index_name = index_name
+        self._index: MembershipIndex | None = None
+        self._lock = threading.Lock()
+        _metadata.create_all(db.get_engine(), checkfirst=True)
+
+    def events(self) -> pd.DataFrame:
+        stmt = select(
+            membership_events_table.c.symbol,
+            membership_events_table.c.effective_date,
+            membership_events_table.c.action,
+        ).where(membership_events_table.c.index_name == self.index_name)
+        return pd.DataFrame(
+            self.db.fetch_all(stmt),
+            columns=["symbol", "effective_date", "action"],
+        )
+
+    def index(self) -> MembershipIndex:
+        """
+        Returns the membership index, rebuilt only after new events are recorded.
+        """
+        with self._lock:
+            if self._index is None:
+                self._index = MembershipIndex(self.events())
+            return self._index
+
+    def _insert(
+        self,
+        rows: Iterable[tuple[str, date, Literal["add", "remove"]]],
+    ) -> int:
+        params = [
+            {
+                "index_name": self.index_name,
+                "symbol": symbol,
+                "effective_date": effective_date,
+                "action": action,
+            }
+            for symbol, effective_date, action in rows
+        ]
+        if params:
+            self.db.execute(_INSERT_EVENTS_SQL, params)
+            with self._lock:
+                self._index = None
+        return len(params)
+
+    def record_changes(self, changes: pd.DataFrame) -> int:
+        """
+        Stores historical add/remove events, e.g. from `parse_sp500_changes`.
+        """
+        return self._insert(
+            zip(
+                changes["symbol"],
+                changes["effective_date"],
+                changes["action"],
+                strict=True,
+            ),
+        )
+
+    def record_snapshot(
+        self,
+        constituents: pd.DataFrame,
+        as_of: date,
+    ) -> tuple[set[str], set[str]]:
+        """
+        Diffs a constituents snapshot against the stored membership and stores the
+        adds and removes effective `as_of`.
+
+        A symbol with no stored history is dated with its `date_added` column when
+        available, so the first snapshot seeds the history of the current members.
+
+        Returns:
+            tuple[set[str], set[str]]: The added and removed symbols.
+        """
+        index = self.index()
+        current = index.current_members()
+        known = set(index.symbols)
+        snapshot = set(constituents["symbol"])
+        date_added = (
+            dict(
+                zip(
+                    constituents["symbol"],
+                    pd.to_datetime(constituents["date_added"], errors="coerce"),
+                    strict=True,
+                ),
+            )
+            if "date_added" in constituents.columns
+            else {}
+        )
+
+        def added_on(symbol: str) -> date:
+            added = date_added.get(symbol)
+            if symbol in known or added is None or pd.isna(added):
+                return as_of
+            return min(added.date(), as_of)
+
+        added = snapshot - current
+        removed = current - snapshot
+        self._insert(
+            [(s, added_on(s), "add") for s in sorted(added)]
+            + [(s, as_of, "remove") for s in sorted(removed)],
+        )
+        log.info(
+            "%s snapshot %s: %d added, %d removed",
+            self.index_name,
+            as_of,
+            len(added),
+            len(removed),
+        )
+        return added, removed
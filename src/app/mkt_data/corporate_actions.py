@@ -0,0 +1,261 @@
+import threading
+from datetime import date
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import (
+    Column,
+    Date,
+    Float,
+    MetaData,
+    String,
+    Table,
+    bindparam,
+    select,
+    text,
+)
+
+from app import get_logger
+from app.common.database import DB
+from app.mkt_data.bar_store import BarStore, _day, align_panel
+
+log = get_logger(__name__)
+
+PRICE_FIELDS = ("open", "high", "low", "close")
+
+_metadata = MetaData()
+
+corporate_actions_table = Table(
+    "corporate_actions",
+    _metadata,
+    Column("symbol", String(32), primary_key=True),
+    Column("ex_date", Date, primary_key=True),
+    Column("action", String(16), primary_key=True),
+    Column("value", Float, nullable=False),
+)
+
+_UPSERT_SQL = text(
+    """
+    INSERT INTO corporate_actions (symbol, ex_date, action, value)
+    VALUES (:symbol, :ex_date, :action, :value)
+    ON CONFLICT (symbol, ex_date, action) DO UPDATE SET value = excluded.value
+    """,
+).bindparams(bindparam("ex_date", type_=Date))
+
+
+class CorporateActionsStore:
+    """
+    Corporate actions table: one row per (symbol, ex_date, action).
+
+    `action` is ``split`` with `value` the share ratio (4.0 for a 4-for-1 split) or
+    ``dividend`` with `value` the cash amount per share.
+    """
+
+    def __init__(self, db: DB) -> None:
+        self.db = db
+        _metadata.create_all(db.get_engine(), checkfirst=True)
+
+    def add(self, actions: pd.DataFrame) -> int:
+        """
+        Upserts actions from a frame with symbol, ex_date, action and value columns.
+        """
+        rows = [
+            {
+                "symbol": str(row.symbol).upper(),
+                "ex_date": pd.Timestamp(row.ex_date).date(),
+                "action": row.action,
+                "value": float(row.value),
+            }
+            for row in actions.itertuples(index=False)
+        ]
+        if rows:
+            self.db.execute(_UPSERT_SQL, rows)
+        return len(rows)
+
+    def get(self, symbol: str) -> pd.DataFrame:
+        stmt = (
+            select(
+                corporate_actions_table.c.ex_date,
+                corporate_actions_table.c.action,
+                corporate_actions_table.c.value,
+            )
+            .where(corporate_actions_table.c.symbol == symbol.upper())
+            .order_by(corporate_actions_table.c.ex_date)
+        )
+        return pd.DataFrame(
+            self.db.fetch_all(stmt),
+            columns=["ex_date", "action", "value"],
+        )
+
+    def get_many(self, symbols: list[str]) -> dict[str, pd.DataFrame]:
+        """
+        Returns the actions of every symbol, as `get` does, with one query.
+        """
+        stmt = (
+            select(corporate_actions_table)
+            .where(corporate_actions_table.c.symbol.in_({s.upper() for s in symbols}))
+            .order_by(
+                corporate_actions_table.c.symbol,
+                corporate_actions_table.c.ex_date,
+            )
+        )
+        frame = pd.DataFrame(
+            self.db.fetch_all(stmt),
+            columns=["symbol", "ex_date", "action", "value"],
+        )
+        groups = {
+            symbol: group.drop(columns="symbol").reset_index(drop=True)
+            for symbol, group in frame.groupby("symbol")
+        }
+        empty = frame.drop(columns="symbol").iloc[:0]
+        return {s: groups.get(s.upper(), empty) for s in symbols}
+
+
+def adjustment_factors(
+    dates: np.ndarray,
+    close: np.ndarray,
+    actions: pd.DataFrame,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Computes cumulative backward adjustment factors for one symbol.
+
+    Each action contributes a multiplier to every bar before its ex-date: 1/ratio
+    for a split, and 1 - dividend / previous close for a cash dividend. The
+    multipliers are placed on the last bar before each ex-date and turned into
+    cumulative factors with one reverse cumulative product.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Price and volume factors aligned with `dates`.
+    """
+    price_step = np.ones(len(dates))
+    volume_step = np.ones(len(dates))
+    if len(dates) and not actions.empty:
+        ex_dates = pd.to_datetime(actions["ex_date"]).to_numpy(dtype="datetime64[D]")
+        # Index of the last bar strictly before each ex-date; -1 if none
+        last = np.searchsorted(dates, ex_dates, side="left") - 1
+        values = actions["value"].to_numpy(dtype=np.float64)
+        valid = last >= 0
+        is_split = (actions["action"] == "split").to_numpy() & valid
+        is_dividend = (actions["action"] == "dividend").to_numpy() & valid
+
+        np.multiply.at(price_step, last[is_split], 1.0 / values[is_split])
+        np.multiply.at(volume_step, last[is_split], values[is_split])
+        prev_close = close[last[is_dividend]]
+        np.multiply.at(
+            price_step,
+            last[is_dividend],
+            1.0 - values[is_dividend] / prev_close,
+        )
+    price_factor = np.cumprod(price_step[::-1])[::-1]
+    volume_factor = np.cumprod(volume_step[::-1])[::-1]
+    return price_factor, volume_factor
+
+
+class AdjustmentEngine:
+    """
+    Serves split- and dividend-adjusted bars from raw bars in a `BarStore`.
+
+    Raw history is never rewritten: adjusted values are raw values times a factor
+    vector computed on read and cached per symbol. The cache is keyed by the number
+    of stored rows and the symbol's actions, so a new bar or a new action only
+    recomputes that symbol's factors. A panel loads the actions of all its symbols
+    with one query.
+    """
+
+    def __init__(self, bars: BarStore, actions: CorporateActionsStore) -> None:
+        self.bars = bars
+        self.actions = actions
+        self._factors: dict[str, tuple[tuple, np.ndarray, np.ndarray]] = {}
+        self._lock = threading.Lock()
+
+    def factors(self, symbol: str) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the price and volume factors aligned with all stored bars.
+        """
+        raw = self.bars.read(symbol, fields=["close"])
+        return self._factors_for(symbol, raw, self.actions.get(symbol))
+
+    def _factors_for(
+        self,
+        symbol: str,
+        raw: dict[str, np.ndarray],
+        actions: pd.DataFrame,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        key = (len(raw["date"]), tuple(map(tuple, actions.to_numpy().tolist())))
+        with self._lock:
+            cached = self._factors.get(symbol.upper())
+        if cached is not None and cached[0] == key:
+            return cached[1], cached[2]
+
+        price_factor, volume_factor = adjustment_factors(
+            raw["date"],
+            raw["close"],
+            actions,
+        )
+        log.debug("Computed adjustment factors for %s", symbol)
+        with self._lock:
+            self._factors[symbol.upper()] = (key, price_factor, volume_factor)
+        return price_factor, volume_factor
+
+    def read(
+        self,
+        symbol: str,
+        start_date: str | date | None = None,
+        end_date: str | date | None = None,
+        fields: list[str] | None = None,
+    ) -> dict[str, np.ndarray]:
+        """
+        Returns adjusted columns for [start_date, end_date), like `BarStore.read`.
+        """
+        return self._read(
+            symbol,
+            self.actions.get(symbol),
+            start_date,
+            end_date,
+            fields,
+        )
+
+    def _read(
+        self,
+        symbol: str,
+        actions: pd.DataFrame,
+        start_date: str | date | None,
+        end_date: str | date | None,
+        fields: list[str] | None,
+    ) -> dict[str, np.ndarray]:
+        # The whole history is needed for the factors; reads are memory-mapped views
+        raw = self.bars.read(
+            symbol,
+            fields=None if fields is None else list(dict.fromkeys([*fields, "close"])),
+        )
+        price_factor, volume_factor = self._factors_for(symbol, raw, actions)
+        dates = raw["date"]
+        lo = 0 if start_date is None else np.searchsorted(dates, _day(start_date))
+        hi = len(dates) if end_date is None else np.searchsorted(dates, _day(end_date))
+
+        adjusted = {"date": dates[lo:hi]}
+        for name in [n for n in raw if n != "date"] if fields is None else fields:
+            values = raw[name][lo:hi]
+            if name in PRICE_FIELDS:
+                adjusted[name] = values * price_factor[lo:hi]
+            elif name == "volume":
+                adjusted[name] = values * volume_factor[lo:hi]
+            else:
+                adjusted[name] = values
+        return adjusted
+
+    def panel(
+        self,
+        symbols: list[str],
+        field: str = "close",
+        start_date: str | date | None = None,
+        end_date: str | date | None = None,
+    ) -> pd.DataFrame:
+        """
+        Returns an adjusted (dates x symbols) frame of `field`.
+        """
+        actions = self.actions.get_many(symbols)
+        slices = [
+            self._read(s, actions[s], start_date, end_date, [field]) for s in symbols
+        ]
+        return align_panel(symbols, slices, field)
@@ -0,0 +1,234 @@
+import threading
+import time
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import date
+
+import pandas as pd
+import pyarrow as pa
+
+from app import get_logger
+from app.mkt_data.cache import EPOCH, FetchFn, to_date
+from app.mkt_data.market_data import download_yfinance_bars
+
+log = get_logger(__name__)
+
+BARS_SCHEMA = pa.schema(
+    [
+        pa.field("symbol", pa.string(), nullable=False),
+        pa.field("date", pa.date32(), nullable=False),
+        pa.field("open", pa.float64()),
+        pa.field("high", pa.float64()),
+        pa.field("low", pa.float64()),
+        pa.field("close", pa.float64()),
+        pa.field("volume", pa.int64()),
+    ],
+)
+
+
+class TokenBucket:
+    """
+    Thread-safe token-bucket rate limiter.
+
+    Tokens refill continuously at `rate` per second up to `capacity`; `acquire`
+    blocks the calling thread until enough tokens are available.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        if rate <= 0:
+            msg = "rate must be positive"
+            raise ValueError(msg)
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0) -> None:
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._tokens = min(
+                    self.capacity,
+                    self._tokens + (now - self._updated) * self.rate,
+                )
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            self._sleep(wait)
+
+
+@dataclass(frozen=True)
+class LoadResult:
+    """Long-format bars for every symbol that loaded, plus the errors for those that did not."""
+
+    table: pa.Table
+    errors: dict[str, BaseException] = field(default_factory=dict)
+
+
+def bars_to_arrow(symbol: str, bars: pd.DataFrame) -> pa.Table:
+    """
+    Converts one symbol's daily bars (date index, OHLCV columns) to `BARS_SCHEMA`.
+    """
+    columns = {str(col).lower(): col for col in bars.columns}
+    n = len(bars)
+    arrays: list[pa.Array] = [
+        pa.array([symbol] * n, pa.string()),
+        pa.array(pd.DatetimeIndex(bars.index).date, pa.date32()),
+    ]
+    for name in ("open", "high", "low", "close", "volume"):
+        if name not in columns:
+            arrays.append(pa.nulls(n, BARS_SCHEMA.field(name).type))
+            continue
+        values = pa.array(bars[columns[name]], pa.float64(), from_pandas=True)
+        arrays.append(values.cast(BARS_SCHEMA.field(name).type))
+    return pa.Table.from_arrays(arrays, schema=BARS_SCHEMA)
+
+
+def may_be_throttled(start: date, end: date) -> Callable[[pa.Table], bool]:
+    """
+    Returns a `call_with_retries` predicate for bars of [start, end): yfinance
+    reports throttling and network errors as an empty frame, so no rows for a
+    range with business days is retried. A range that still has no rows after
+    the retries, e.g. before a listing or over holidays, is returned empty.
+    """
+    business_days = len(pd.bdate_range(start, end, inclusive="left")) > 0
+    return lambda bars: business_days and bars.num_rows == 0
+
+
+def call_with_retries[T](
+    fn: Callable[[], T],
+    name: str,
+    bucket: TokenBucket | None,
+    max_retries: int,
+    backoff: float,
+    retry_if: Callable[[T], bool] | None = None,
+) -> T:
+    """
+    Calls `fn`, taking a token from `bucket` before every attempt and retrying
+    failures with exponential backoff. A result for which `retry_if` is true is
+    retried the same way, and returned once the retries run out.
+    """
+    attempt = 0
+    while True:
+        if bucket is not None:
+            bucket.acquire()
+        try:
+            result = fn()
+        except Exception:
+            if attempt >= max_retries:
+                raise
+            retry = "Fetch failed"
+        else:
+            if retry_if is None or attempt >= max_retries or not retry_if(result):
+                return result
+            retry = "Rejected result"
+        delay = backoff * 2**attempt
+        attempt += 1
+        log.warning(
+            "%s for %s (attempt %d/%d), retrying in %.2fs",
+            retry,
+            name,
+            attempt,
+            max_retries + 1,
+            delay,
+        )
+        time.sleep(delay)
+
+
+def _fetch_with_retries(
+    fetch: FetchFn,
+    symbol: str,
+    start: date,
+    end: date,
+    bucket: TokenBucket | None,
+    max_retries: int,
+    backoff: float,
+) -> pa.Table:
+    return call_with_retries(
+        lambda: bars_to_arrow(symbol, fetch(symbol, start, end)),
+        symbol,
+        bucket,
+        max_retries,
+        backoff,
+        may_be_throttled(start, end),
+    )
+
+
+def load_bars(
+    symbols: Iterable[str],
+    start_date: str | date | None = None,
+    end_date: str | date | None = None,
+    fetch: FetchFn = download_yfinance_bars,
+    max_workers: int = 8,
+    rate_per_sec: float | None = 5.0,
+    max_retries: int = 3,
+    backoff: float = 0.5,
+) -> LoadResult:
+    """
+    Downloads daily bars for many symbols concurrently.
+
+    Args:
+        symbols (Iterable[str]): Symbols to load; duplicates are loaded once.
+        start_date, end_date: Date range, `end_date` exclusive. Defaults to the full
+            history up to today.
+        fetch (FetchFn): Backend returning one symbol's bars; defaults to yfinance.
+        max_workers (int): Size of the download thread pool.
+        rate_per_sec (float | None): Shared token-bucket rate across all workers,
+            counting every attempt. None disables rate limiting.
+        max_retries (int): Retries per symbol after the first failed attempt.
+        backoff (float): Base delay in seconds, doubled after every failure.
+
+    Returns:
+        LoadResult: One long-format table (symbol, date, OHLCV) in input symbol
+            order, and the final error for every symbol that could not be loaded.
+    """
+    symbols = list(dict.fromkeys(symbols))
+    start = to_date(start_date, EPOCH)
+    end = to_date(end_date, date.today())
+    bucket = TokenBucket(rate_per_sec) if rate_per_sec else None
+
+    tables: dict[str, pa.Table] = {}
+    errors: dict[str, BaseException] = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(
+                _fetch_with_retries,
+                fetch,
+                symbol,
+                start,
+                end,
+                bucket,
+                max_retries,
+                backoff,
+            ): symbol
+            for symbol in symbols
+        }
+        for future in as_completed(futures):
+            symbol = futures[future]
+            try:
+                tables[symbol] = future.result()
+            except Exception as e:
+                log.exception("Giving up on %s", symbol)
+                errors[symbol] = e
+
+    ordered = [tables[s] for s in symbols if s in tables]
+    table = pa.concat_tables(ordered) if ordered else BARS_SCHEMA.empty_table()
+    log.info(
+        "Loaded %d rows for %d/%d symbols",
+        table.num_rows,
+        len(tables),
+        len(symbols),
+    )
+    return LoadResult(table, errors)
@@ -1,10 +1,34 @@
+from datetime import date
 from functools import lru_cache
-from typing import Literal
+from typing import TYPE_CHECKING, Literal
 
 import pandas as pd
-import yfinance as yf
 
 from app.common.models import Security, SP500Constituent
+from app.mkt_data.cache import BarCache
+from app.mkt_data.providers import MarketDataProvider, get_provider
+from app.mkt_data.security_master import SecurityMaster
+
+if TYPE_CHECKING:
+    import yfinance as yf
+
+    from app.common.validation import ValidationResult
+
+
+def download_yfinance_bars(
+    tickers: str,
+    start_date: str | date | None = None,
+    end_date: str | date | None = None,
+) -> pd.DataFrame:
+    """
+    Downloads daily bars through the active provider (yfinance unless replaced
+    with `app.mkt_data.providers.set_provider`).
+
+    An empty frame means either no bars in the range (holidays, before a listing)
+    or a failure that yfinance does not raise, such as throttling. The loaders
+    retry it, see `app.mkt_data.loader.may_be_throttled`.
+    """
+    return get_provider().get_bars(tickers, start_date, end_date)
 
 
 def get_yfinance_data(
@@ -12,48 +36,75 @@ def get_yfinance_data(
     start_date: str | None = None,
     end_date: str | None = None,
     market_data_type: Literal["close", "open", "high", "low", "volume"] = "close",
+    cache: BarCache | None = None,
 ) -> pd.Series:
-    data = yf.download(tickers, start_date, end_date, multi_level_index=False)
-    if data is None:
-        msg = "No data returned from yfinance for the specified tickers and date range"
-        raise ValueError(
-            msg,
-        )
-    data.columns = [col.lower() for col in data.columns]
-    return data[market_data_type]
+    """
+    Returns one field of daily bars for `tickers`.
 
+    When a `BarCache` is given, only the date ranges it does not already hold are
+    downloaded, e.g. ``BarCache(path, download_yfinance_bars)``.
+    """
+    if cache is not None:
+        return cache.get(tickers, market_data_type, start_date, end_date)
+    return download_yfinance_bars(tickers, start_date, end_date)[market_data_type]
+
+
+def fetch_yfinance_security(symbol: str) -> Security:
+    return get_provider().get_security(symbol)
 
-@lru_cache
-def get_yfinance_security_data(symbol: str) -> Security:
-    ticker_data = yf.Ticker(symbol)
-    symbol_data = yf.Ticker(symbol).info
-    isin = ticker_data.isin
 
-    if isin is None or isin == "-":
-        isin = ""
-    return Security(**symbol_data, isin=isin)
+def get_yfinance_security_data(
+    symbol: str,
+    master: SecurityMaster | None = None,
+) -> Security:
+    """
+    Returns reference data for `symbol`.
+
+    When a `SecurityMaster` is given it is served from the shared cache and only
+    fetched if missing or expired, e.g. ``SecurityMaster(db, fetch_yfinance_security)``.
+    """
+    if master is not None:
+        return master.get(symbol)
+    return fetch_yfinance_security(symbol)
 
 
 @lru_cache
-def get_yfinance_ticker_data(symbol: str) -> yf.Ticker:
+def get_yfinance_ticker_data(symbol: str) -> "yf.Ticker":
+    import yfinance as yf
+
     return yf.Ticker(symbol)
 
 
-@lru_cache
 def get_sp500_constituents() -> list[SP500Constituent]:
-    tickers: pd.DataFrame = pd.read_html(
-        "https://en.wikipedia.org/wiki/List_of_S%26P_500_companies",
-    )[0]
-
-    tickers.columns = [
-        "symbol",
-        "security_name",
-        "gics_sector",
-        "gics_sub_industry",
-        "headquarters_location",
-        "date_added",
-        "cik",
-        "founded",
-    ]
-
-    return [SP500Constituent(**ticker) for ticker in tickers.to_dict(orient="records")]  # type: ignore
+    """
+    Returns the S&P 500 constituents, validated column-wise and then built as
+    models without validating each row again.
+
+    Raises:
+        ValueError: If any row fails validation; use `get_sp500_constituents_table`
+            to get the valid rows and the rejected ones instead.
+    """
+    return _sp500_constituents(get_provider())
+
+
+@lru_cache(maxsize=4)
+def _sp500_constituents(provider: MarketDataProvider) -> list[SP500Constituent]:
+    result = get_sp500_constituents_table(provider)
+    if not result.ok:
+        summary = result.summary().to_string(index=False)
+        msg = f"S&P 500 constituents failed validation:\n{summary}"
+        raise ValueError(msg)
+    return list(result.models(SP500Constituent))
+
+
+def get_sp500_constituents_table(
+    provider: MarketDataProvider | None = None,
+) -> "ValidationResult[pd.DataFrame]":
+    """
+    Returns the S&P 500 constituents validated column-wise, without building
+    per-row models; invalid rows are dropped and listed in `errors`.
+    """
+    from app.common.validation import validate
+
+    tickers = (provider or get_provider()).get_sp500_constituents()
+    return validate(tickers, SP500Constituent)
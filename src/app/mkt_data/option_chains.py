@@ -0,0 +1,275 @@
+from collections.abc import Callable, Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import UTC, datetime
+from typing import Protocol
+
+import pandas as pd
+import pyarrow as pa
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    Date,
+    DateTime,
+    Float,
+    MetaData,
+    String,
+    Table,
+    insert,
+    select,
+)
+
+from app import get_logger
+from app.common.database import DB
+from app.mkt_data.loader import LoadResult, TokenBucket, call_with_retries
+from app.mkt_data.market_data import get_yfinance_ticker_data
+
+log = get_logger(__name__)
+
+OPTION_CHAIN_SCHEMA = pa.schema(
+    [
+        pa.field("underlier", pa.string(), nullable=False),
+        pa.field("snapshot", pa.timestamp("us", tz="UTC"), nullable=False),
+        pa.field("expiry", pa.date32(), nullable=False),
+        pa.field("option_type", pa.string(), nullable=False),
+        pa.field("strike", pa.float64(), nullable=False),
+        pa.field("bid", pa.float64()),
+        pa.field("ask", pa.float64()),
+        pa.field("last", pa.float64()),
+        pa.field("volume", pa.int64()),
+        pa.field("open_interest", pa.int64()),
+        pa.field("implied_volatility", pa.float64()),
+    ],
+)
+
+# Provider column names for each schema field
+_SOURCE_COLUMNS = {
+    "strike": "strike",
+    "bid": "bid",
+    "ask": "ask",
+    "last": "lastPrice",
+    "volume": "volume",
+    "open_interest": "openInterest",
+    "implied_volatility": "impliedVolatility",
+}
+
+_metadata = MetaData()
+
+# The primary key leads with (underlier, snapshot), so its index serves
+# snapshot lookups without a second index
+option_chains_table = Table(
+    "option_chains",
+    _metadata,
+    Column("underlier", String(32), primary_key=True),
+    Column("snapshot", DateTime(timezone=True), primary_key=True),
+    Column("expiry", Date, primary_key=True),
+    Column("option_type", String(4), primary_key=True),
+    Column("strike", Float, primary_key=True),
+    Column("bid", Float),
+    Column("ask", Float),
+    Column("last", Float),
+    Column("volume", BigInteger),
+    Column("open_interest", BigInteger),
+    Column("implied_volatility", Float),
+)
+
+
+class OptionChainBackend(Protocol):
+    """Source of listed expiries and per-expiry chains."""
+
+    def expiries(self, underlier: str) -> list[str]: ...
+
+    def chain(self, underlier: str, expiry: str) -> tuple[pd.DataFrame, pd.DataFrame]:
+        """Calls and puts in yfinance's column layout."""
+        ...
+
+
+class YFinanceChainBackend:
+    def expiries(self, underlier: str) -> list[str]:
+        return list(get_yfinance_ticker_data(underlier).options)
+
+    def chain(self, underlier: str, expiry: str) -> tuple[pd.DataFrame, pd.DataFrame]:
+        chain = get_yfinance_ticker_data(underlier).option_chain(expiry)
+        return chain.calls, chain.puts
+
+
+def chain_to_arrow(
+    underlier: str,
+    expiry: str,
+    snapshot: datetime,
+    calls: pd.DataFrame,
+    puts: pd.DataFrame,
+) -> pa.Table:
+    """
+    Normalizes one expiry's calls and puts into `OPTION_CHAIN_SCHEMA`.
+    """
+    frames = [
+        frame.assign(option_type=option_type)
+        for option_type, frame in (("call", calls), ("put", puts))
+        if not frame.empty
+    ]
+    data = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    if not data.empty:
+        data = data.drop_duplicates(["option_type", "strike"], keep="last")
+    n = len(data)
+    arrays: list[pa.Array] = [
+        pa.array([underlier.upper()] * n, pa.string()),
+        pa.array([snapshot] * n, OPTION_CHAIN_SCHEMA.field("snapshot").type),
+        pa.array([pd.Timestamp(expiry).date()] * n, pa.date32()),
+        pa.array(data.get("option_type", []), pa.string()),
+    ]
+    for name, source in _SOURCE_COLUMNS.items():
+        field = OPTION_CHAIN_SCHEMA.field(name)
+        if source not in data.columns:
+            arrays.append(pa.nulls(n, field.type))
+            continue
+        values = pa.array(data[source], pa.float64(), from_pandas=True)
+        arrays.append(values.cast(field.type, safe=False))
+    return pa.Table.from_arrays(arrays, schema=OPTION_CHAIN_SCHEMA)
+
+
+def fetch_option_chains(
+    underliers: Iterable[str],
+    backend: OptionChainBackend | None = None,
+    max_workers: int = 8,
+    rate_per_sec: float | None = 5.0,
+    max_retries: int = 3,
+    backoff: float = 0.5,
+    clock: Callable[[], datetime] = lambda: datetime.now(UTC),
+) -> LoadResult:
+    """
+    Fetches every listed expiry of every underlier concurrently.
+
+    Expiry lists are fetched first, then one task per (underlier, expiry) chain,
+    all sharing one thread pool and token bucket. Every row of a run carries the
+    same snapshot time.
+
+    Returns:
+        LoadResult: One `OPTION_CHAIN_SCHEMA` table, and the final error per
+            underlier (expiry list) or ``"<underlier> <expiry>"`` (chain).
+    """
+    backend = backend or YFinanceChainBackend()
+    underliers = list(dict.fromkeys(u.upper() for u in underliers))
+    snapshot = clock()
+    bucket = TokenBucket(rate_per_sec) if rate_per_sec else None
+    errors: dict[str, BaseException] = {}
+
+    def retry[T](fn: Callable[[], T], name: str) -> T:
+        return call_with_retries(fn, name, bucket, max_retries, backoff)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        expiry_futures = {
+            u: executor.submit(retry, lambda u=u: backend.expiries(u), u)
+            for u in underliers
+        }
+        chain_futures: dict[tuple[str, str], Future[pa.Table]] = {}
+        for underlier, future in expiry_futures.items():
+            try:
+                expiries = future.result()
+            except Exception as e:
+                log.exception("Giving up on expiries for %s", underlier)
+                errors[underlier] = e
+                continue
+            for expiry in expiries:
+                chain_futures[(underlier, expiry)] = executor.submit(
+                    retry,
+                    lambda u=underlier, x=expiry: chain_to_arrow(
+                        u,
+                        x,
+                        snapshot,
+                        *backend.chain(u, x),
+                    ),
+                    f"{underlier} {expiry}",
+                )
+
+        tables: list[pa.Table] = []
+        for (underlier, expiry), future in chain_futures.items():
+            try:
+                tables.append(future.result())
+            except Exception as e:
+                log.exception("Giving up on %s %s", underlier, expiry)
+                errors[f"{underlier} {expiry}"] = e
+
+    table = pa.concat_tables(tables) if tables else OPTION_CHAIN_SCHEMA.empty_table()
+    log.info(
+        "Fetched %d contracts in %d chains for %d underliers",
+        table.num_rows,
+        len(tables),
+        len(underliers),
+    )
+    return LoadResult(table, errors)
+
+
+class OptionChainStore:
+    """
+    Option chain snapshots in the ``option_chains`` table.
+
+    On PostgreSQL writes are bulk-loaded with ADBC and reads return Arrow directly
+    from the driver; other databases go through SQLAlchemy.
+    """
+
+    def __init__(self, db: DB) -> None:
+        self.db = db
+        _metadata.create_all(db.get_engine(), checkfirst=True)
+
+    def write(self, chains: pa.Table) -> int:
+        chains = chains.select(OPTION_CHAIN_SCHEMA.names).cast(OPTION_CHAIN_SCHEMA)
+        if chains.num_rows == 0:
+            return 0
+        if self.db.dialect == "postgresql":
+            self.db.bulk_insert(option_chains_table.name, chains)
+        else:
+            self.db.execute(insert(option_chains_table), chains.to_pylist())
+        log.debug("Stored %d option contracts", chains.num_rows)
+        return chains.num_rows
+
+    def ingest(self, underliers: Iterable[str], **kwargs) -> LoadResult:
+        """
+        Fetches chains with `fetch_option_chains` and stores them.
+        """
+        result = fetch_option_chains(underliers, **kwargs)
+        self.write(result.table)
+        return result
+
+    def snapshots(self, underlier: str) -> list[datetime]:
+        stmt = (
+            select(option_chains_table.c.snapshot)
+            .where(option_chains_table.c.underlier == underlier.upper())
+            .distinct()
+            .order_by(option_chains_table.c.snapshot)
+        )
+        return [_as_utc(row.snapshot) for row in self.db.fetch_all(stmt)]
+
+    def load(self, underlier: str, snapshot: datetime | None = None) -> pa.Table:
+        """
+        Returns one snapshot of an underlier's chain, the latest by default.
+        """
+        if snapshot is None:
+            snapshots = self.snapshots(underlier)
+            if not snapshots:
+                return OPTION_CHAIN_SCHEMA.empty_table()
+            snapshot = snapshots[-1]
+
+        if self.db.dialect == "postgresql":
+            columns = ", ".join(OPTION_CHAIN_SCHEMA.names)
+            with self.db.get_adbc_conn() as conn, conn.cursor() as cursor:
+                cursor.execute(
+                    f"SELECT {columns} FROM {option_chains_table.name} "
+                    "WHERE underlier = $1 AND snapshot = $2 "
+                    "ORDER BY expiry, option_type, strike",
+                    (underlier.upper(), snapshot),
+                )
+                return cursor.fetch_arrow_table().cast(OPTION_CHAIN_SCHEMA)
+
+        t = option_chains_table.c
+        stmt = (
+            select(*[t[name] for name in OPTION_CHAIN_SCHEMA.names])
+            .where(t.underlier == underlier.upper(), t.snapshot == snapshot)
+            .order_by(t.expiry, t.option_type, t.strike)
+        )
+        rows = [dict(row) for row in self.db.execute(stmt).fetchall()]
+        return pa.Table.from_pylist(rows, schema=OPTION_CHAIN_SCHEMA)
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite drops the offset of timezone-aware values; they are stored in UTC
+    return value.replace(tzinfo=UTC) if value.tzinfo is None else value
@@ -0,0 +1,214 @@
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import date
+from pathlib import Path
+from typing import Protocol
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+from app import get_logger
+from app.common.models import Security
+from app.mkt_data.constituents import SP500_URL, parse_sp500_constituents
+
+log = get_logger(__name__)
+
+
+class MarketDataProvider(Protocol):
+    """Source of bars, security reference data and index constituents."""
+
+    def get_bars(
+        self,
+        symbol: str,
+        start_date: str | date | None = None,
+        end_date: str | date | None = None,
+    ) -> pd.DataFrame:
+        """Daily bars indexed by date with lowercase OHLCV columns, `end_date` exclusive."""
+        ...
+
+    def get_security(self, symbol: str) -> Security: ...
+
+    def get_sp500_constituents(self) -> pd.DataFrame: ...
+
+
+class YFinanceProvider:
+    """Live provider backed by yfinance and Wikipedia."""
+
+    def get_bars(
+        self,
+        symbol: str,
+        start_date: str | date | None = None,
+        end_date: str | date | None = None,
+    ) -> pd.DataFrame:
+        import yfinance as yf
+
+        data = yf.download(symbol, start_date, end_date, multi_level_index=False)
+        if data is None:
+            msg = "No data returned from yfinance for the specified tickers and date range"
+            raise ValueError(
+                msg,
+            )
+        data.columns = [col.lower() for col in data.columns]
+        return data
+
+    def get_security(self, symbol: str) -> Security:
+        import yfinance as yf
+
+        ticker_data = yf.Ticker(symbol)
+        symbol_data = ticker_data.info
+        isin = ticker_data.isin
+
+        if isin is None or isin == "-":
+            isin = ""
+        return Security(**symbol_data, isin=isin)
+
+    def get_sp500_constituents(self) -> pd.DataFrame:
+        return parse_sp500_constituents(SP500_URL)
+
+
+class ReplayProvider:
+    """
+    Offline provider serving recorded data from a directory.
+
+    Layout::
+
+        <root>/bars/<SYMBOL>.arrow        Arrow IPC file (or .parquet), date + OHLCV
+        <root>/securities/<SYMBOL>.json   Security dumped by alias
+        <root>/sp500_constituents.parquet
+
+    Arrow IPC files are memory-mapped and kept open, so repeated reads are served
+    from the page cache without parsing or copying.
+    """
+
+    def __init__(self, root: str | Path) -> None:
+        self.root = Path(root)
+        self._bars: dict[str, pa.Table] = {}
+        self._lock = threading.Lock()
+
+    def _bars_path(self, symbol: str, suffix: str = ".arrow") -> Path:
+        return self.root / "bars" / f"{symbol.upper()}{suffix}"
+
+    def _security_path(self, symbol: str) -> Path:
+        return self.root / "securities" / f"{symbol.upper()}.json"
+
+    def _constituents_path(self) -> Path:
+        return self.root / "sp500_constituents.parquet"
+
+    def _load_bars(self, symbol: str) -> pa.Table:
+        with self._lock:
+            table = self._bars.get(symbol.upper())
+            if table is None:
+                path = self._bars_path(symbol)
+                if path.exists():
+                    table = ipc.open_file(pa.memory_map(str(path))).read_all()
+                elif (parquet_path := self._bars_path(symbol, ".parquet")).exists():
+                    table = pq.read_table(parquet_path, memory_map=True)
+                else:
+                    msg = f"No recorded bars for {symbol} in {self.root}"
+                    raise KeyError(msg)
+                self._bars[symbol.upper()] = table
+            return table
+
+    def get_bars(
+        self,
+        symbol: str,
+        start_date: str | date | None = None,
+        end_date: str | date | None = None,
+    ) -> pd.DataFrame:
+        table = self._load_bars(symbol)
+        mask = None
+        if start_date is not None:
+            mask = pc.greater_equal(table["date"], pd.Timestamp(start_date).date())
+        if end_date is not None:
+            before_end = pc.less(table["date"], pd.Timestamp(end_date).date())
+            mask = before_end if mask is None else pc.and_(mask, before_end)
+        if mask is not None:
+            table = table.filter(mask)
+        data = table.drop_columns(["date"]).to_pandas()
+        data.index = pd.DatetimeIndex(table["date"].to_numpy(), name="Date")
+        return data
+
+    def get_security(self, symbol: str) -> Security:
+        path = self._security_path(symbol)
+        if not path.exists():
+            msg = f"No recorded security for {symbol} in {self.root}"
+            raise KeyError(msg)
+        return Security.model_validate_json(path.read_text())
+
+    def get_sp500_constituents(self) -> pd.DataFrame:
+        return pd.read_parquet(self._constituents_path())
+
+    def record_bars(self, symbol: str, bars: pd.DataFrame) -> None:
+        """
+        Writes bars in the shape returned by `get_bars` as an Arrow IPC file.
+        """
+        table = pa.Table.from_pandas(bars.reset_index(drop=True), preserve_index=False)
+        table = table.add_column(
+            0,
+            "date",
+            pa.array(pd.DatetimeIndex(bars.index).date, pa.date32()),
+        )
+        path = self._bars_path(symbol)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".arrow.tmp")
+        with pa.OSFile(str(tmp), "wb") as sink, ipc.new_file(sink, table.schema) as w:
+            w.write_table(table)
+        tmp.replace(path)
+        with self._lock:
+            self._bars.pop(symbol.upper(), None)
+
+    def record_security(self, security: Security) -> None:
+        path = self._security_path(security.symbol)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(security.model_dump_json(by_alias=True))
+
+    def record_sp500_constituents(self, constituents: pd.DataFrame) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        constituents.to_parquet(self._constituents_path(), index=False)
+
+    def record_from(
+        self,
+        provider: MarketDataProvider,
+        symbols: list[str],
+        start_date: str | date | None = None,
+        end_date: str | date | None = None,
+    ) -> None:
+        """
+        Records bars and securities for `symbols` and the S&P 500 constituents
+        from another provider, typically `YFinanceProvider`.
+        """
+        for symbol in symbols:
+            self.record_bars(symbol, provider.get_bars(symbol, start_date, end_date))
+            self.record_security(provider.get_security(symbol))
+        self.record_sp500_constituents(provider.get_sp500_constituents())
+        log.info("Recorded %d symbols to %s", len(symbols), self.root)
+
+
+_provider: MarketDataProvider = YFinanceProvider()
+
+
+def get_provider() -> MarketDataProvider:
+    return _provider
+
+
+def set_provider(provider: MarketDataProvider) -> MarketDataProvider:
+    """
+    Sets the process-wide provider used by `app.mkt_data.market_data`, returns the
+    previous one.
+    """
+    global _provider
+    previous, _provider = _provider, provider
+    return previous
+
+
+@contextmanager
+def use_provider(provider: MarketDataProvider) -> Iterator[MarketDataProvider]:
+    previous = set_provider(provider)
+    try:
+        yield provider
+    finally:
+        set_provider(previous)
@@ -0,0 +1,182 @@
+import time
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from sqlalchemy import Column, Float, MetaData, String, Table, Text, select
+
+from app import get_logger
+from app.common.database import DB
+from app.common.models import Security
+
+log = get_logger(__name__)
+
+_metadata = MetaData()
+
+security_master_table = Table(
+    "security_master",
+    _metadata,
+    Column("symbol", String(32), primary_key=True),
+    Column("payload", Text, nullable=False),
+    Column("fetched_at", Float, nullable=False),
+)
+
+_UPSERT_SQL = """
+    INSERT INTO security_master (symbol, payload, fetched_at)
+    VALUES (:symbol, :payload, :fetched_at)
+    ON CONFLICT (symbol) DO UPDATE
+    SET payload = excluded.payload, fetched_at = excluded.fetched_at
+"""
+
+
+class SecurityMaster:
+    """
+    Security reference data cache shared by every process using the same database.
+
+    Entries older than `ttl` are refetched on access and the table is trimmed to the
+    `max_entries` most recently fetched symbols, never evicting the symbols a refresh
+    has just written. A SQLite file URL works for a single host; pass the PostgreSQL
+    `DB` to share the cache between hosts.
+    """
+
+    def __init__(
+        self,
+        db: DB,
+        fetch: Callable[[str], Security],
+        ttl: timedelta = timedelta(days=1),
+        max_entries: int = 10_000,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.db = db
+        self.fetch = fetch
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._clock = clock
+        _metadata.create_all(db.get_engine(), checkfirst=True)
+
+    def _is_fresh(self, fetched_at: float) -> bool:
+        return self._clock() - fetched_at < self.ttl.total_seconds()
+
+    def get_cached(
+        self,
+        symbols: Iterable[str],
+        *,
+        allow_stale: bool = False,
+    ) -> dict[str, Security]:
+        """
+        Returns the cached securities for `symbols` without touching the network.
+        Expired entries are skipped unless `allow_stale` is set.
+        """
+        stmt = select(security_master_table).where(
+            security_master_table.c.symbol.in_(list(symbols)),
+        )
+        return {
+            row["symbol"]: Security.model_validate_json(row["payload"])
+            for row in self.db.fetch_all(stmt)
+            if allow_stale or self._is_fresh(row["fetched_at"])
+        }
+
+    def get(self, symbol: str) -> Security:
+        """
+        Returns the security for `symbol`, fetching it only if missing or expired.
+        """
+        return self.get_many([symbol])[symbol]
+
+    def get_many(self, symbols: Iterable[str]) -> dict[str, Security]:
+        """
+        Returns securities for `symbols`, refreshing only the missing or expired ones.
+        Raises the fetch error of the first symbol that could not be refreshed.
+        """
+        symbols = list(dict.fromkeys(symbols))
+        cached = self.get_cached(symbols)
+        missing = [s for s in symbols if s not in cached]
+        if missing:
+            # The fetched securities are used as is: re-reading them could race
+            # with another process trimming the table
+            fetched, errors = self._refresh(missing)
+            if errors:
+                raise next(iter(errors.values()))
+            cached |= fetched
+        return {s: cached[s] for s in symbols}
+
+    def refresh(
+        self,
+        symbols: Iterable[str],
+        max_workers: int = 8,
+    ) -> dict[str, Exception]:
+        """
+        Fetches every symbol once, concurrently, and upserts the results in one batch.
+
+        Returns:
+            dict[str, Exception]: The fetch error for each symbol that failed.
+        """
+        return self._refresh(symbols, max_workers)[1]
+
+    def _refresh(
+        self,
+        symbols: Iterable[str],
+        max_workers: int = 8,
+    ) -> tuple[dict[str, Security], dict[str, Exception]]:
+        symbols = list(dict.fromkeys(symbols))
+        errors: dict[str, Exception] = {}
+
+        def fetch_one(symbol: str) -> Security | None:
+            try:
+                return self.fetch(symbol)
+            except Exception as e:
+                log.warning("Security fetch failed for %s: %s", symbol, e)
+                errors[symbol] = e
+                return None
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            securities = list(executor.map(fetch_one, symbols))
+
+        fetched = {
+            symbol: security
+            for symbol, security in zip(symbols, securities, strict=True)
+            if security is not None
+        }
+        now = self._clock()
+        rows = [
+            {
+                "symbol": symbol,
+                "payload": security.model_dump_json(by_alias=True),
+                "fetched_at": now,
+            }
+            for symbol, security in fetched.items()
+        ]
+        if rows:
+            self.db.execute(_UPSERT_SQL, rows)
+            self._trim(list(fetched))
+        log.info("Refreshed %d/%d securities", len(rows), len(symbols))
+        return fetched, errors
+
+    def _trim(self, written: list[str]) -> None:
+        """
+        Keeps `written` and the most recently fetched other symbols, up to
+        `max_entries` rows unless `written` alone exceeds it.
+        """
+        t = security_master_table.c
+        newest = (
+            select(t.symbol)
+            .where(t.symbol.not_in(written))
+            .order_by(t.fetched_at.desc(), t.symbol)
+            .limit(max(self.max_entries - len(written), 0))
+        )
+        self.db.execute(
+            security_master_table.delete().where(
+                t.symbol.not_in(written),
+                t.symbol.not_in(newest),
+            ),
+        )
+
+    def evict_expired(self) -> int:
+        """
+        Deletes expired entries, returns number of rows deleted.
+        """
+        cutoff = self._clock() - self.ttl.total_seconds()
+        stmt = security_master_table.delete().where(
+            security_master_table.c.fetched_at <= cutoff,
+        )
+        with self.db.get_engine().begin() as conn:
+            return conn.execute(stmt).rowcount
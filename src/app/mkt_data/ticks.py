@@ -0,0 +1,362 @@
+import asyncio
+import time
+from collections.abc import AsyncIterator, Callable, Iterable
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Float,
+    Index,
+    MetaData,
+    String,
+    Table,
+    insert,
+)
+
+from app import get_logger
+from app.common.database import DB
+
+log = get_logger(__name__)
+
+TICK_DTYPE = np.dtype(
+    [
+        ("ts", "<M8[ns]"),
+        ("price", "<f8"),
+        ("size", "<f8"),
+        ("bid", "<f8"),
+        ("ask", "<f8"),
+    ],
+)
+
+TICKS_SCHEMA = pa.schema(
+    [
+        pa.field("symbol", pa.string(), nullable=False),
+        pa.field("ts", pa.timestamp("us", tz="UTC"), nullable=False),
+        pa.field("price", pa.float64()),
+        pa.field("size", pa.float64()),
+        pa.field("bid", pa.float64()),
+        pa.field("ask", pa.float64()),
+    ],
+)
+
+# (symbol, ticks) pairs in arrival order
+type TickBatch = list[tuple[str, np.ndarray]]
+
+_metadata = MetaData()
+
+ticks_table = Table(
+    "ticks",
+    _metadata,
+    Column("symbol", String(32), nullable=False),
+    Column("ts", DateTime(timezone=True), nullable=False),
+    Column("price", Float),
+    Column("size", Float),
+    Column("bid", Float),
+    Column("ask", Float),
+    Index("ix_ticks_symbol_ts", "symbol", "ts"),
+)
+
+
+class TickRing:
+    """
+    Fixed-capacity ring buffer of `TICK_DTYPE` records.
+
+    Every record is written twice, at i and i + capacity of a buffer twice the
+    capacity, so the latest n <= capacity records are always one contiguous slice
+    and `latest` returns a view without copying. Views are overwritten by later
+    appends; copy them to keep them.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.count = 0
+        self._buffer = np.zeros(2 * capacity, dtype=TICK_DTYPE)
+
+    def append(self, ticks: np.ndarray) -> None:
+        # Only the last `capacity` ticks of a long batch can be kept
+        dropped = max(0, len(ticks) - self.capacity)
+        ticks = ticks[dropped:]
+        k = len(ticks)
+        start = (self.count + dropped) % self.capacity
+        first = min(k, self.capacity - start)
+        for offset in (0, self.capacity):
+            self._buffer[offset + start : offset + start + first] = ticks[:first]
+            self._buffer[offset : offset + k - first] = ticks[first:]
+        self.count += dropped + k
+
+    def latest(self, n: int | None = None) -> np.ndarray:
+        n = min(self.count, self.capacity if n is None else n, self.capacity)
+        end = self.count % self.capacity + self.capacity
+        view = self._buffer[end - n : end]
+        view.flags.writeable = False
+        return view
+
+
+@dataclass
+class IngestStats:
+    received: int = 0
+    written: int = 0
+    flushes: int = 0
+    spilled: int = 0
+    dropped: int = 0
+    blocked_seconds: float = 0.0
+    max_pending: int = 0
+
+
+def ticks_to_arrow(batches: TickBatch) -> pa.Table:
+    """
+    Concatenates per-symbol tick arrays into one `TICKS_SCHEMA` table.
+    """
+    if not batches:
+        return TICKS_SCHEMA.empty_table()
+    ticks = np.concatenate([t for _, t in batches])
+    symbols = np.repeat([s for s, _ in batches], [len(t) for _, t in batches])
+    columns = [
+        pa.array(symbols, pa.string()),
+        pa.array(ticks["ts"].astype("<M8[us]"), pa.timestamp("us")).cast(
+            TICKS_SCHEMA.field("ts").type,
+        ),
+    ]
+    columns += [pa.array(ticks[name]) for name in ("price", "size", "bid", "ask")]
+    return pa.Table.from_arrays(columns, schema=TICKS_SCHEMA)
+
+
+class TickStore:
+    """
+    Tick table indexed on (symbol, ts). On PostgreSQL batches are bulk-loaded with
+    ADBC, which uses COPY; other databases get one executemany per batch.
+    """
+
+    def __init__(self, db: DB) -> None:
+        self.db = db
+        _metadata.create_all(db.get_engine(), checkfirst=True)
+
+    def write(self, ticks: pa.Table) -> int:
+        if ticks.num_rows == 0:
+            return 0
+        if self.db.dialect == "postgresql":
+            self.db.bulk_insert(ticks_table.name, ticks)
+        else:
+            self.db.execute(insert(ticks_table), ticks.to_pylist())
+        return ticks.num_rows
+
+
+class TickIngestor:
+    """
+    Asyncio tick ingestion with per-symbol ring buffers and micro-batched writes.
+
+    `put` appends to the symbol's ring, so readers see ticks immediately, and adds
+    them to the pending batch. A batch is handed to the writer task when it reaches
+    `batch_size` ticks or is `flush_interval` seconds old. At most `max_pending`
+    batches wait for the writer; beyond that `put` blocks, so a lagging database
+    slows producers down instead of growing memory.
+
+    A failed write is retried with exponential backoff. A batch that still fails
+    is saved to `spill_dir` as a `TICKS_SCHEMA` Parquet file to be loaded later,
+    or dropped if there is none; both are counted in `stats`.
+
+    Args:
+        write (Callable[[pa.Table], object]): Blocking writer, run in a thread,
+            e.g. `TickStore.write`.
+        capacity (int): Ticks kept per symbol for `latest`.
+        batch_size (int): Ticks per flush.
+        flush_interval (float): Maximum age in seconds of a pending batch.
+        max_pending (int): Batches allowed to wait for the writer.
+        max_retries (int): Retries of a failed write.
+        backoff (float): Base retry delay in seconds, doubled after every failure.
+        spill_dir (Path | None): Directory for batches that could not be written.
+        clock (Callable[[], float]): Monotonic clock used to age pending batches.
+    """
+
+    def __init__(
+        self,
+        write: Callable[[pa.Table], object],
+        capacity: int = 100_000,
+        batch_size: int = 50_000,
+        flush_interval: float = 1.0,
+        max_pending: int = 4,
+        max_retries: int = 3,
+        backoff: float = 0.5,
+        spill_dir: Path | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.write = write
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.spill_dir = spill_dir
+        self.clock = clock
+        self.stats = IngestStats()
+        self._rings: dict[str, TickRing] = {}
+        self._batch: TickBatch = []
+        self._batch_rows = 0
+        self._batch_started = 0.0
+        self._queue: asyncio.Queue[TickBatch | None] = asyncio.Queue(max_pending)
+        self._tasks: list[asyncio.Task] = []
+        self._stopping = asyncio.Event()
+
+    async def __aenter__(self) -> "TickIngestor":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        await self.stop()
+
+    async def start(self) -> None:
+        self._stopping.clear()
+        self._tasks = [
+            asyncio.create_task(self._writer()),
+            asyncio.create_task(self._timer()),
+        ]
+
+    async def stop(self) -> None:
+        """
+        Flushes pending ticks and waits for the writer to finish. Does nothing if
+        the ingestor is not running.
+        """
+        if not self._tasks:
+            return
+        # The timer may be blocked handing a batch to the writer; cancelling it
+        # there would lose the batch, so let it return on its own
+        self._stopping.set()
+        await self._tasks[1]
+        await self.flush()
+        await self._queue.put(None)
+        await self._tasks[0]
+        self._tasks = []
+        log.info(
+            "Tick ingestion stopped: %d received, %d written in %d flushes",
+            self.stats.received,
+            self.stats.written,
+            self.stats.flushes,
+        )
+
+    def ring(self, symbol: str) -> TickRing:
+        ring = self._rings.get(symbol)
+        if ring is None:
+            ring = self._rings[symbol] = TickRing(self.capacity)
+        return ring
+
+    def latest(self, symbol: str, n: int | None = None) -> np.ndarray:
+        """
+        Returns a read-only view of the latest `n` ticks of `symbol`.
+        """
+        return self.ring(symbol).latest(n)
+
+    async def put(self, symbol: str, ticks: np.ndarray) -> None:
+        self.ring(symbol).append(ticks)
+        if not self._batch:
+            self._batch_started = self.clock()
+        # The ring may overwrite these records before the batch is written
+        self._batch.append((symbol, ticks.copy()))
+        self._batch_rows += len(ticks)
+        self.stats.received += len(ticks)
+        if self._batch_rows >= self.batch_size:
+            await self.flush()
+
+    async def flush(self) -> None:
+        if not self._batch:
+            return
+        batch, self._batch, self._batch_rows = self._batch, [], 0
+        started = time.monotonic()
+        await self._queue.put(batch)
+        self.stats.blocked_seconds += time.monotonic() - started
+        self.stats.max_pending = max(self.stats.max_pending, self._queue.qsize())
+
+    async def _flush_stale(self) -> None:
+        if self._batch and self.clock() - self._batch_started >= self.flush_interval:
+            await self.flush()
+
+    async def _timer(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._stopping.wait(), self.flush_interval / 4)
+            except TimeoutError:
+                await self._flush_stale()
+            else:
+                return
+
+    async def _writer(self) -> None:
+        while (batch := await self._queue.get()) is not None:
+            table = ticks_to_arrow(batch)
+            if await self._write_with_retries(table):
+                self.stats.written += table.num_rows
+                self.stats.flushes += 1
+            else:
+                await self._spill(table)
+
+    async def _write_with_retries(self, table: pa.Table) -> bool:
+        for attempt in range(self.max_retries + 1):
+            try:
+                await asyncio.to_thread(self.write, table)
+            except Exception:
+                if attempt == self.max_retries:
+                    log.exception("Failed to write %d ticks", table.num_rows)
+                    return False
+                delay = self.backoff * 2**attempt
+                log.warning(
+                    "Tick write failed (attempt %d/%d), retrying in %.2fs",
+                    attempt + 1,
+                    self.max_retries + 1,
+                    delay,
+                )
+                await asyncio.sleep(delay)
+            else:
+                return True
+        return False
+
+    async def _spill(self, table: pa.Table) -> None:
+        if self.spill_dir is None:
+            log.error("Dropped %d ticks", table.num_rows)
+            self.stats.dropped += table.num_rows
+            return
+        path = self.spill_dir / f"ticks-{time.time_ns()}.parquet"
+        try:
+            self.spill_dir.mkdir(parents=True, exist_ok=True)
+            await asyncio.to_thread(pq.write_table, table, path)
+        except Exception:
+            log.exception(
+                "Dropped %d ticks, spilling to %s failed",
+                table.num_rows,
+                path,
+            )
+            self.stats.dropped += table.num_rows
+            return
+        log.error("Spilled %d unwritten ticks to %s", table.num_rows, path)
+        self.stats.spilled += table.num_rows
+
+
+async def synthetic_ticks(
+    symbols: Iterable[str],
+    n_ticks: int,
+    batch: int = 1_000,
+    seed: int | None = None,
+) -> AsyncIterator[tuple[str, np.ndarray]]:
+    """
+    Yields `n_ticks` random-walk ticks per symbol in batches, round-robin across
+    symbols, yielding to the event loop between batches.
+    """
+    symbols = list(symbols)
+    rng = np.random.default_rng(seed)
+    prices = dict.fromkeys(symbols, 100.0)
+    now = time.time_ns()
+    for start in range(0, n_ticks, batch):
+        k = min(batch, n_ticks - start)
+        for symbol in symbols:
+            ticks = np.empty(k, dtype=TICK_DTYPE)
+            ticks["ts"] = now + (start + np.arange(k)) * 1_000
+            path = prices[symbol] * np.exp(np.cumsum(rng.normal(0, 1e-4, k)))
+            prices[symbol] = float(path[-1])
+            ticks["price"] = path
+            ticks["size"] = rng.integers(1, 500, k)
+            ticks["bid"] = path - 0.01
+            ticks["ask"] = path + 0.01
+            yield symbol, ticks
+        await asyncio.sleep(0)
@@ -1,7 +1,7 @@
 from collections.abc import Iterable
 
 import numpy as np
-from scipy import stats
+from scipy import special
 
 from app.common.utils import timeit
 
@@ -35,15 +35,15 @@ def black_scholes_vectorized(
 
     # Calculate call or put price based on option_type
     if option_type.lower() == "call":
-        option_price = spot_prices * stats.norm.cdf(d1) - strike_prices * np.exp(
+        option_price = spot_prices * special.ndtr(d1) - strike_prices * np.exp(
             -risk_free_rate * time_to_expiry,
-        ) * stats.norm.cdf(d2)
+        ) * special.ndtr(d2)
     elif option_type.lower() == "put":
         option_price = strike_prices * np.exp(
             -risk_free_rate * time_to_expiry,
-        ) * stats.norm.cdf(
+        ) * special.ndtr(
             -d2,
-        ) - spot_prices * stats.norm.cdf(
+        ) - spot_prices * special.ndtr(
             -d1,
         )
     else:
@@ -0,0 +1,349 @@
+import threading
+from collections.abc import Iterable
+from datetime import date
+from typing import Literal
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import (
+    Column,
+    Date,
+    Float,
+    MetaData,
+    String,
+    Table,
+    bindparam,
+    select,
+    text,
+)
+
+from app import get_logger
+from app.common.database import DB
+
+log = get_logger(__name__)
+
+type Interpolation = Literal["linear", "monotone_convex"]
+
+_metadata = MetaData()
+
+rate_points_table = Table(
+    "rate_points",
+    _metadata,
+    Column("as_of", Date, primary_key=True),
+    Column("instrument", String(16), primary_key=True),
+    Column("tenor", Float, primary_key=True),
+    Column("rate", Float, nullable=False),
+)
+
+_UPSERT_SQL = text(
+    """
+    INSERT INTO rate_points (as_of, instrument, tenor, rate)
+    VALUES (:as_of, :instrument, :tenor, :rate)
+    ON CONFLICT (as_of, instrument, tenor) DO UPDATE SET rate = excluded.rate
+    """,
+).bindparams(bindparam("as_of", type_=Date))
+
+
+def bootstrap_zero_rates(points: pd.DataFrame, frequency: int = 2) -> pd.Series:
+    """
+    Bootstraps continuously compounded zero rates from market points.
+
+    Args:
+        points (pd.DataFrame): `instrument`, `tenor` (years) and `rate` columns.
+            ``deposit`` rates are simple money-market rates; ``par`` rates are
+            par yields of bonds paying `frequency` coupons a year, such as
+            treasury notes.
+        frequency (int): Coupons per year of ``par`` instruments.
+
+    Returns:
+        pd.Series: Zero rates indexed by tenor, one per point. Coupon dates between
+            points use zero rates interpolated linearly, so every point reprices
+            exactly on a ``linear`` curve.
+    """
+    unknown = set(points["instrument"]) - {"deposit", "par"}
+    if unknown:
+        msg = f"Unknown instruments {sorted(unknown)}"
+        raise ValueError(msg)
+    from scipy import optimize
+
+    tenors: list[float] = []
+    zeros: list[float] = []
+    for row in points.sort_values("tenor").itertuples(index=False):
+        tenor, rate = float(row.tenor), float(row.rate)
+        if row.instrument == "deposit":
+            zero = np.log1p(rate * tenor) / tenor
+        else:
+            periods = np.arange(int(np.ceil(tenor * frequency - 1e-9)))
+            coupons = tenor - periods / frequency
+            zero = optimize.brentq(
+                _par_error,
+                -0.5,
+                1.0,
+                args=(coupons, rate / frequency, tenors, zeros),
+                xtol=1e-14,
+            )
+        tenors.append(tenor)
+        zeros.append(zero)
+    return pd.Series(zeros, index=pd.Index(tenors, name="tenor"), name="zero_rate")
+
+
+def _par_error(
+    zero: float,
+    coupons: np.ndarray,
+    coupon: float,
+    tenors: list[float],
+    zeros: list[float],
+) -> float:
+    # Price minus par of a bond maturing at coupons[0] if its zero rate is `zero`
+    curve = np.interp(coupons, [*tenors, coupons[0]], [*zeros, zero])
+    discount = np.exp(-curve * coupons)
+    return coupon * discount.sum() + discount[0] - 1.0
+
+
+def _monotone_convex(
+    tenors: np.ndarray,
+    zeros: np.ndarray,
+    t: np.ndarray,
+) -> np.ndarray:
+    """
+    Returns r(t) * t on `t` with the Hagan-West monotone convex method, which keeps
+    instantaneous forwards continuous and positive where the inputs allow it.
+    """
+    nodes = np.concatenate([[0.0], tenors])
+    rt = np.concatenate([[0.0], zeros * tenors])
+    width = np.diff(nodes)
+    discrete = np.diff(rt) / width
+
+    # Instantaneous forwards at the nodes, then collared for positivity
+    forward = np.empty(len(nodes))
+    if len(discrete) > 1:
+        forward[1:-1] = (width[:-1] * discrete[1:] + width[1:] * discrete[:-1]) / (
+            width[:-1] + width[1:]
+        )
+        forward[0] = discrete[0] - 0.5 * (forward[1] - discrete[0])
+        forward[-1] = discrete[-1] - 0.5 * (forward[-2] - discrete[-1])
+    else:
+        forward[:] = discrete[0]
+    if (discrete >= 0).all():
+        forward[0] = np.clip(forward[0], 0, 2 * discrete[0])
+        forward[1:-1] = np.clip(
+            forward[1:-1],
+            0,
+            2 * np.minimum(discrete[:-1], discrete[1:]),
+        )
+        forward[-1] = np.clip(forward[-1], 0, 2 * discrete[-1])
+
+    i = np.clip(np.searchsorted(nodes, t, side="right"), 1, len(nodes) - 1)
+    x = np.clip((t - nodes[i - 1]) / width[i - 1], 0.0, 1.0)
+    g0 = forward[i - 1] - discrete[i - 1]
+    g1 = forward[i] - discrete[i - 1]
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        # Integral of the forward correction g over [0, x] in each of the regions
+        g_flat = np.zeros_like(x)
+        g_cubic = g0 * (x - 2 * x**2 + x**3) + g1 * (x**3 - x**2)
+        eta = (g1 + 2 * g0) / (g1 - g0)
+        g_late = g0 * x + np.where(
+            x > eta,
+            (g1 - g0) * (x - eta) ** 3 / (3 * (1 - eta) ** 2),
+            0.0,
+        )
+        eta = 3 * g1 / (g1 - g0)
+        head = np.minimum(x, eta)
+        g_early = g1 * x + (g0 - g1) * (eta**3 - (eta - head) ** 3) / (3 * eta**2)
+        eta = g1 / (g1 + g0)
+        a = -g0 * g1 / (g0 + g1)
+        head = np.minimum(x, eta)
+        g_both = (
+            a * x
+            + (g0 - a) * (eta**3 - (eta - head) ** 3) / (3 * eta**2)
+            + np.where(
+                x > eta,
+                (g1 - a) * (x - eta) ** 3 / (3 * (1 - eta) ** 2),
+                0.0,
+            )
+        )
+
+    region_cubic = ((g0 < 0) & (-0.5 * g0 <= g1) & (g1 <= -2 * g0)) | (
+        (g0 > 0) & (-0.5 * g0 >= g1) & (g1 >= -2 * g0)
+    )
+    region_late = ((g0 < 0) & (g1 > -2 * g0)) | ((g0 > 0) & (g1 < -2 * g0))
+    region_early = ((g0 > 0) & (g1 < 0) & (g1 > -0.5 * g0)) | (
+        (g0 < 0) & (g1 > 0) & (g1 < -0.5 * g0)
+    )
+    g = np.select(
+        [
+            (g0 == 0) & (g1 == 0),
+            region_cubic,
+            region_late,
+            region_early,
+        ],
+        [g_flat, g_cubic, g_late, g_early],
+        g_both,
+    )
+    span = np.minimum(t, nodes[-1]) - nodes[i - 1]
+    inside = rt[i - 1] + discrete[i - 1] * span + width[i - 1] * g
+    # Flat zero rate beyond the last tenor, as on the grid
+    return np.where(t > nodes[-1], zeros[-1] * t, inside)
+
+
+class YieldCurve:
+    """
+    Continuously compounded zero curve sampled on a fine uniform grid.
+
+    r(t) * t is precomputed every `grid_step` years up to the last tenor, so a
+    lookup is an index computation and one linear interpolation, with no search,
+    for any number of expiries. Times shorter than one step are evaluated exactly
+    instead, since a step can be longer than the first tenor. Rates are flat
+    beyond the last tenor; before the first tenor they are flat with ``linear``
+    and follow the first segment's forwards from zero with ``monotone_convex``.
+
+    Args:
+        tenors (Iterable[float]): Node tenors in years.
+        zero_rates (Iterable[float]): Zero rates at the nodes.
+        method (Interpolation): ``linear`` in zero rates or ``monotone_convex``.
+        grid_step (float): Grid spacing in years, one day by default.
+    """
+
+    def __init__(
+        self,
+        tenors: Iterable[float],
+        zero_rates: Iterable[float],
+        method: Interpolation = "monotone_convex",
+        grid_step: float = 1 / 365,
+    ) -> None:
+        self.tenors = np.asarray(tenors, dtype=np.float64)
+        self.zero_rates = np.asarray(zero_rates, dtype=np.float64)
+        if len(self.tenors) == 0 or (np.diff(self.tenors) <= 0).any():
+            msg = "Tenors must be non-empty and strictly increasing"
+            raise ValueError(msg)
+        self.method = method
+        self.grid_step = grid_step
+
+        if method not in ("linear", "monotone_convex"):
+            msg = f"Unknown interpolation method {method}"
+            raise ValueError(msg)
+
+        grid = np.arange(int(np.ceil(self.tenors[-1] / grid_step)) + 1) * grid_step
+        self._grid_rt = self._exact_rt(grid)
+        self._max_tenor = grid[-1]
+        self._last_rate = self._grid_rt[-1] / self._max_tenor
+        # The limit of r(t) at zero, where r(t) * t / t is undefined
+        tiny = grid_step * 1e-9
+        self._short_rate = float(self._exact_rt(np.array([tiny]))[0] / tiny)
+
+    @classmethod
+    def from_points(
+        cls,
+        points: pd.DataFrame,
+        method: Interpolation = "monotone_convex",
+        grid_step: float = 1 / 365,
+    ) -> "YieldCurve":
+        zeros = bootstrap_zero_rates(points)
+        return cls(zeros.index, zeros.to_numpy(), method, grid_step)
+
+    def _exact_rt(self, t: np.ndarray) -> np.ndarray:
+        if self.method == "linear":
+            return np.interp(t, self.tenors, self.zero_rates) * t
+        return _monotone_convex(self.tenors, self.zero_rates, t)
+
+    def _rt(self, t: np.ndarray) -> np.ndarray:
+        position = np.clip(t, 0.0, self._max_tenor) / self.grid_step
+        i = np.minimum(position.astype(np.int64), len(self._grid_rt) - 2)
+        w = position - i
+        rt = self._grid_rt[i] + w * (self._grid_rt[i + 1] - self._grid_rt[i])
+        rt = np.where(t > self._max_tenor, self._last_rate * t, rt)
+        # Interpolating from r(0) * 0 misses the shape of the first step
+        short = t < self.grid_step
+        if short.any():
+            rt[short] = self._exact_rt(np.maximum(t[short], 0.0))
+        return rt
+
+    def zero_rate(self, t: Iterable[float] | float) -> np.ndarray:
+        """
+        Returns continuously compounded zero rates for times `t` in years.
+        """
+        t = np.asarray(t, dtype=np.float64)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            rates = self._rt(t) / t
+        return np.where(t > 0, rates, self._short_rate)
+
+    def discount(self, t: Iterable[float] | float) -> np.ndarray:
+        """
+        Returns discount factors for times `t` in years.
+        """
+        t = np.asarray(t, dtype=np.float64)
+        return np.exp(-self._rt(t))
+
+
+class YieldCurves:
+    """
+    Stored deposit and treasury rate points with one built curve cached per as-of
+    date and interpolation method. Adding points for a date drops its curves.
+    """
+
+    def __init__(self, db: DB, max_cached: int = 64) -> None:
+        self.db = db
+        self.max_cached = max_cached
+        self._curves: dict[tuple[date, str], YieldCurve] = {}
+        self._lock = threading.Lock()
+        _metadata.create_all(db.get_engine(), checkfirst=True)
+
+    def add(self, points: pd.DataFrame) -> int:
+        """
+        Upserts points from a frame with as_of, instrument, tenor and rate columns.
+        """
+        rows = [
+            {
+                "as_of": pd.Timestamp(row.as_of).date(),
+                "instrument": row.instrument,
+                "tenor": float(row.tenor),
+                "rate": float(row.rate),
+            }
+            for row in points.itertuples(index=False)
+        ]
+        if rows:
+            self.db.execute(_UPSERT_SQL, rows)
+        dates = {row["as_of"] for row in rows}
+        with self._lock:
+            for key in [k for k in self._curves if k[0] in dates]:
+                del self._curves[key]
+        return len(rows)
+
+    def points(self, as_of: str | date) -> pd.DataFrame:
+        stmt = (
+            select(
+                rate_points_table.c.instrument,
+                rate_points_table.c.tenor,
+                rate_points_table.c.rate,
+            )
+            .where(rate_points_table.c.as_of == pd.Timestamp(as_of).date())
+            .order_by(rate_points_table.c.tenor)
+        )
+        return pd.DataFrame(
+            self.db.fetch_all(stmt),
+            columns=["instrument", "tenor", "rate"],
+        )
+
+    def get(
+        self,
+        as_of: str | date,
+        method: Interpolation = "monotone_convex",
+    ) -> YieldCurve:
+        key = (pd.Timestamp(as_of).date(), method)
+        with self._lock:
+            curve = self._curves.get(key)
+        if curve is not None:
+            return curve
+
+        points = self.points(key[0])
+        if points.empty:
+            msg = f"No rate points stored for {key[0]}"
+            raise KeyError(msg)
+        curve = YieldCurve.from_points(points, method)
+        log.debug("Built %s curve for %s", method, key[0])
+        with self._lock:
+            if len(self._curves) >= self.max_cached:
+                self._curves.pop(next(iter(self._curves)))
+            self._curves[key] = curve
+        return curve
@@ -0,0 +1,13 @@
+"""
+Covariance estimation and portfolio optimization. Submodules are imported on first attribute access.
+"""
+
+from app._lazy import attach
+
+__getattr__, __dir__, __all__ = attach(
+    __name__,
+    [
+        "estimators",
+        "optimizer",
+    ],
+)
@@ -0,0 +1,151 @@
+from dataclasses import dataclass
+from typing import Literal
+
+import numpy as np
+
+type Estimator = Literal["sample", "ewma", "shrinkage"]
+
+
+@dataclass(frozen=True)
+class Moments:
+    """Expected returns and covariance for one universe, per period."""
+
+    mu: np.ndarray
+    covariance: np.ndarray
+    shrinkage: float = 0.0
+
+
+class IncrementalMoments:
+    """
+    Return moments for a fixed set of assets, updated one block of days at a time.
+
+    Running sums of raw first, second and fourth-order cross moments are kept for
+    every pair of assets, so sample and Ledoit-Wolf estimates for any subset of the
+    assets are exact and cost O(k * n^2) per update of k days instead of a refit on
+    the full history. Exponentially weighted mean and covariance are updated with
+    the incremental weighted (West) recurrence.
+
+    Args:
+        n_assets (int): Number of assets (columns of every update).
+        half_life (float): Half-life in periods of the exponential weights.
+    """
+
+    def __init__(self, n_assets: int, half_life: float = 63.0) -> None:
+        self.n_assets = n_assets
+        self.half_life = half_life
+        self.alpha = 1.0 - 0.5 ** (1.0 / half_life)
+        self.count = 0
+        self._sum = np.zeros(n_assets)
+        self._sum_sq = np.zeros(n_assets)
+        self._cross = np.zeros((n_assets, n_assets))
+        # sum_t a_i^2 a_j and sum_t a_i^2 a_j^2, for the shrinkage intensity
+        self._sq_cross = np.zeros((n_assets, n_assets))
+        self._sq_sq = np.zeros((n_assets, n_assets))
+        self._ew_mean = np.zeros(n_assets)
+        self._ew_cov = np.zeros((n_assets, n_assets))
+
+    def update(self, returns: np.ndarray) -> None:
+        """
+        Adds a (days x assets) block of returns without missing values.
+        """
+        x = np.atleast_2d(np.asarray(returns, dtype=np.float64))
+        if x.shape[1] != self.n_assets:
+            msg = f"Expected {self.n_assets} assets, got {x.shape[1]}"
+            raise ValueError(msg)
+        if np.isnan(x).any():
+            msg = "Returns must not contain NaN"
+            raise ValueError(msg)
+        if len(x) == 0:
+            return
+
+        sq = x * x
+        self._sum += x.sum(axis=0)
+        self._sum_sq += sq.sum(axis=0)
+        self._cross += x.T @ x
+        self._sq_cross += sq.T @ x
+        self._sq_sq += sq.T @ sq
+
+        rows = iter(x)
+        if self.count == 0:
+            self._ew_mean = next(rows).copy()
+        for row in rows:
+            diff = row - self._ew_mean
+            step = self.alpha * diff
+            self._ew_mean += step
+            self._ew_cov = (1.0 - self.alpha) * (self._ew_cov + np.outer(diff, step))
+        self.count += len(x)
+
+    def moments(
+        self,
+        estimator: Estimator = "shrinkage",
+        assets: np.ndarray | list[int] | None = None,
+    ) -> Moments:
+        """
+        Returns the estimate for the assets at positions `assets` (all by default).
+
+        ``sample`` is the sample mean and unbiased covariance, ``ewma`` the
+        exponentially weighted mean and covariance, and ``shrinkage`` the
+        Ledoit-Wolf covariance shrunk towards a scaled identity with the
+        James-Stein mean shrunk towards the cross-sectional average.
+        """
+        if self.count < 2:
+            msg = f"At least 2 observations are required, got {self.count}"
+            raise ValueError(msg)
+        idx = np.arange(self.n_assets) if assets is None else np.asarray(assets)
+        block = np.ix_(idx, idx)
+        if estimator == "ewma":
+            return Moments(self._ew_mean[idx].copy(), self._ew_cov[block].copy())
+
+        n = self.count
+        mean = self._sum[idx] / n
+        biased = self._cross[block] / n - np.outer(mean, mean)
+        if estimator == "sample":
+            return Moments(mean, biased * n / (n - 1))
+        if estimator != "shrinkage":
+            msg = f"Unknown estimator {estimator}"
+            raise ValueError(msg)
+
+        covariance, intensity = self._ledoit_wolf(idx, mean, biased)
+        return Moments(_james_stein(mean, covariance, n), covariance, intensity)
+
+    def _ledoit_wolf(
+        self,
+        idx: np.ndarray,
+        mean: np.ndarray,
+        biased: np.ndarray,
+    ) -> tuple[np.ndarray, float]:
+        n = self.count
+        block = np.ix_(idx, idx)
+        m_row, m_col = mean[:, None], mean[None, :]
+        sum_, sum_sq = self._sum[idx], self._sum_sq[idx]
+        sq_cross = self._sq_cross[block]
+        # sum_t sum_ij (a_i - m_i)^2 (a_j - m_j)^2 expanded into the raw sums
+        fourth = (
+            self._sq_sq[block]
+            - 2.0 * sq_cross * m_col
+            - 2.0 * sq_cross.T * m_row
+            + 4.0 * self._cross[block] * m_row * m_col
+            + sum_sq[:, None] * m_col**2
+            + sum_sq[None, :] * m_row**2
+            - 2.0 * sum_[:, None] * m_row * m_col**2
+            - 2.0 * sum_[None, :] * m_row**2 * m_col
+            + n * m_row**2 * m_col**2
+        ).sum()
+
+        target = np.trace(biased) / len(idx)
+        distance = np.sum((biased - target * np.eye(len(idx))) ** 2)
+        variance = max(fourth / n - np.sum(biased**2), 0.0) / n
+        intensity = 0.0 if distance == 0 else min(variance, distance) / distance
+        covariance = (1.0 - intensity) * biased
+        covariance[np.diag_indices_from(covariance)] += intensity * target
+        return covariance, float(intensity)
+
+
+def _james_stein(mean: np.ndarray, covariance: np.ndarray, n: int) -> np.ndarray:
+    grand = mean.mean()
+    excess = mean - grand
+    distance = n * excess @ np.linalg.solve(covariance, excess)
+    if len(mean) < 3 or distance <= 0:
+        return mean
+    intensity = min(1.0, (len(mean) - 2) / distance)
+    return grand + (1.0 - intensity) * excess
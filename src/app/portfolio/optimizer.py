@@ -0,0 +1,181 @@
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from skfolio.optimization import MeanRisk, ObjectiveFunction
+from skfolio.prior import BasePrior, ReturnDistribution
+
+from app import get_logger
+from app.portfolio.estimators import Estimator, IncrementalMoments, Moments
+
+log = get_logger(__name__)
+
+
+class FixedPrior(BasePrior):
+    """
+    skfolio prior serving precomputed moments, so `fit` does not re-estimate them
+    from the returns it is given.
+    """
+
+    def __init__(self, mu: np.ndarray, covariance: np.ndarray) -> None:
+        self.mu = mu
+        self.covariance = covariance
+
+    def fit(self, X: np.ndarray, y: None = None, **fit_params) -> "FixedPrior":  # noqa: N803
+        self.return_distribution_ = ReturnDistribution(
+            mu=self.mu,
+            covariance=self.covariance,
+            returns=np.asarray(X),
+        )
+        return self
+
+
+@dataclass(frozen=True)
+class OptimizationResult:
+    weights: pd.Series
+    expected_return: float
+    volatility: float
+    shrinkage: float
+    observations: int
+    used_fallback: bool
+
+
+class PortfolioService:
+    """
+    Mean-variance optimization over incrementally updated return moments.
+
+    Each `update` folds new days into the running moments of every asset, so an
+    optimization after a daily update only solves the problem instead of
+    re-estimating on the full history. Results are cached by universe, estimator,
+    optimizer parameters and the number of observations, and each solve is seeded
+    with the previous weights for the same universe and parameters: skfolio uses
+    them for turnover and falls back to them if the solver fails.
+
+    Args:
+        assets (list[str]): Every asset that can appear in a universe.
+        half_life (float): Half-life in days of the ``ewma`` estimator.
+        window (int): Number of recent days of returns passed to skfolio.
+        max_cached (int): Maximum number of cached results.
+    """
+
+    def __init__(
+        self,
+        assets: list[str],
+        half_life: float = 63.0,
+        window: int = 252,
+        max_cached: int = 128,
+    ) -> None:
+        self.assets = list(assets)
+        self.window = window
+        self.max_cached = max_cached
+        self._positions = {asset: i for i, asset in enumerate(self.assets)}
+        self._moments = IncrementalMoments(len(self.assets), half_life)
+        self._recent = np.empty((0, len(self.assets)))
+        self._results: OrderedDict[tuple, OptimizationResult] = OrderedDict()
+        self._previous: dict[tuple, np.ndarray] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def observations(self) -> int:
+        return self._moments.count
+
+    def update(self, returns: pd.DataFrame) -> None:
+        """
+        Adds new (dates x assets) returns; columns must include every asset.
+        """
+        block = returns[self.assets].to_numpy(dtype=np.float64)
+        with self._lock:
+            self._moments.update(block)
+            self._recent = np.concatenate([self._recent, block])[-self.window :]
+        log.debug("Updated moments with %d days", len(block))
+
+    def moments(
+        self,
+        universe: list[str] | None = None,
+        estimator: Estimator = "shrinkage",
+    ) -> Moments:
+        return self._moments.moments(estimator, self._indices(universe))
+
+    def _indices(self, universe: list[str] | None) -> list[int]:
+        if universe is None:
+            return list(range(len(self.assets)))
+        missing = [asset for asset in universe if asset not in self._positions]
+        if missing:
+            msg = f"Assets {missing} are not tracked by this service"
+            raise KeyError(msg)
+        return [self._positions[asset] for asset in universe]
+
+    def optimize(
+        self,
+        universe: list[str] | None = None,
+        estimator: Estimator = "shrinkage",
+        objective: ObjectiveFunction = ObjectiveFunction.MINIMIZE_RISK,
+        risk_aversion: float = 1.0,
+        min_weight: float = 0.0,
+        max_weight: float = 1.0,
+    ) -> OptimizationResult:
+        """
+        Returns long-only, fully invested mean-variance weights for `universe`.
+
+        Args:
+            universe (list[str] | None): Assets to allocate, all assets by default.
+            estimator (Estimator): ``sample``, ``ewma`` or ``shrinkage`` moments.
+            objective (ObjectiveFunction): skfolio objective function.
+            risk_aversion (float): Risk aversion for ``MAXIMIZE_UTILITY``.
+            min_weight (float): Lower bound of every weight.
+            max_weight (float): Upper bound of every weight.
+
+        Returns:
+            OptimizationResult: Weights indexed by asset with per-period expected
+                return and volatility of the portfolio.
+        """
+        universe = list(self.assets if universe is None else universe)
+        params = (
+            tuple(universe),
+            estimator,
+            objective,
+            risk_aversion,
+            min_weight,
+            max_weight,
+        )
+        key = (*params, self.observations)
+        with self._lock:
+            cached = self._results.get(key)
+            if cached is not None:
+                self._results.move_to_end(key)
+                return cached
+            idx = self._indices(universe)
+            moments = self._moments.moments(estimator, idx)
+            recent = self._recent[:, idx]
+            previous = self._previous.get(params)
+
+        model = MeanRisk(
+            objective_function=objective,
+            prior_estimator=FixedPrior(moments.mu, moments.covariance),
+            risk_aversion=risk_aversion,
+            min_weights=min_weight,
+            max_weights=max_weight,
+            previous_weights=previous,
+            fallback=None if previous is None else "previous_weights",
+        )
+        model.fit(pd.DataFrame(recent, columns=universe))
+        weights = np.asarray(model.weights_)
+        result = OptimizationResult(
+            weights=pd.Series(weights, index=universe, name="weight"),
+            expected_return=float(weights @ moments.mu),
+            volatility=float(np.sqrt(weights @ moments.covariance @ weights)),
+            shrinkage=moments.shrinkage,
+            observations=key[-1],
+            used_fallback=getattr(model, "fallback_", None) is not None,
+        )
+        if result.used_fallback:
+            log.warning("Optimization failed, kept previous weights for %s", params)
+
+        with self._lock:
+            self._previous[params] = weights
+            self._results[key] = result
+            while len(self._results) > self.max_cached:
+                self._results.popitem(last=False)
+        return result
@@ -0,0 +1,12 @@
+"""
+Value at risk. Submodules are imported on first attribute access.
+"""
+
+from app._lazy import attach
+
+__getattr__, __dir__, __all__ = attach(
+    __name__,
+    [
+        "var",
+    ],
+)
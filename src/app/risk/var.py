@@ -0,0 +1,322 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from app import get_logger
+from app.options.blackscholes import black_scholes_vectorized
+from app.options.curve import YieldCurve
+
+log = get_logger(__name__)
+
+BOOK_COLUMNS = (
+    "underlier",
+    "option_type",
+    "strike",
+    "time_to_expiry",
+    "sigma",
+    "quantity",
+)
+
+# The undecorated pricer: `timeit` would log every chunk
+_price_calls = black_scholes_vectorized.__wrapped__
+
+_MIN_EXPIRY = 1e-8
+_MIN_SIGMA = 1e-4
+
+
+@dataclass(frozen=True)
+class Scenarios:
+    """
+    Market scenarios as shocks per underlier: log spot returns and relative
+    implied volatility changes, both (scenarios x underliers).
+    """
+
+    underliers: list[str]
+    spot_shocks: np.ndarray
+    vol_shocks: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.spot_shocks)
+
+
+@dataclass(frozen=True)
+class VaRResult:
+    """
+    Losses are positive. `components` has one row per position with its Euler
+    contributions, which sum to `var` and `expected_shortfall`.
+    """
+
+    confidence: float
+    var: float
+    expected_shortfall: float
+    pnl: np.ndarray
+    components: pd.DataFrame
+
+
+def historical_scenarios(
+    prices: pd.DataFrame,
+    horizon: int = 1,
+    vols: pd.DataFrame | None = None,
+    window: int | None = None,
+) -> Scenarios:
+    """
+    Builds one scenario per (overlapping) `horizon`-day period of stored history.
+
+    Args:
+        prices (pd.DataFrame): Prices indexed by date, one column per underlier,
+            e.g. from `BarStore.panel`.
+        horizon (int): Holding period in days.
+        vols (pd.DataFrame | None): Implied volatilities in the same layout; without
+            them volatilities are left unchanged.
+        window (int | None): Use only the last `window` scenarios.
+    """
+    spot = np.log(prices).diff(horizon).iloc[horizon:]
+    if vols is None:
+        vol = pd.DataFrame(0.0, index=spot.index, columns=spot.columns)
+    else:
+        vol = (vols[prices.columns] / vols[prices.columns].shift(horizon) - 1.0).iloc[
+            horizon:
+        ]
+    if window is not None:
+        spot, vol = spot.iloc[-window:], vol.iloc[-window:]
+    return Scenarios(
+        list(prices.columns),
+        spot.fillna(0.0).to_numpy(),
+        vol.fillna(0.0).to_numpy(),
+    )
+
+
+def monte_carlo_scenarios(
+    prices: pd.DataFrame,
+    n_scenarios: int = 10_000,
+    horizon: int = 1,
+    vols: pd.DataFrame | None = None,
+    seed: int | None = None,
+) -> Scenarios:
+    """
+    Draws joint normal shocks with the mean and covariance of the historical
+    daily shocks, scaled to `horizon` days.
+    """
+    history = historical_scenarios(prices, 1, vols)
+    shocks = np.hstack([history.spot_shocks, history.vol_shocks])
+    n_underliers = len(history.underliers)
+    rng = np.random.default_rng(seed)
+    draws = rng.multivariate_normal(
+        shocks.mean(axis=0) * horizon,
+        np.cov(shocks, rowvar=False) * horizon,
+        size=n_scenarios,
+        method="eigh",
+    )
+    return Scenarios(
+        history.underliers,
+        draws[:, :n_underliers],
+        draws[:, n_underliers:],
+    )
+
+
+def _positions(
+    book: pd.DataFrame,
+    spot: pd.Series,
+    underliers: list[str],
+) -> dict[str, np.ndarray]:
+    missing = [c for c in BOOK_COLUMNS if c not in book.columns]
+    if missing:
+        msg = f"Book is missing columns {missing}"
+        raise ValueError(msg)
+    option_type = book["option_type"].str.lower()
+    if not option_type.isin(["call", "put"]).all():
+        msg = "Option type must be 'call' or 'put'"
+        raise ValueError(msg)
+    unknown = sorted(set(book["underlier"]) - set(underliers))
+    if unknown:
+        msg = f"No scenarios for underliers {unknown}"
+        raise ValueError(msg)
+
+    column = {name: i for i, name in enumerate(underliers)}
+    multiplier = book["multiplier"] if "multiplier" in book.columns else 1.0
+    return {
+        "column": book["underlier"].map(column).to_numpy(dtype=np.int64),
+        "spot": book["underlier"].map(spot).to_numpy(dtype=np.float64),
+        "strike": book["strike"].to_numpy(dtype=np.float64),
+        "expiry": book["time_to_expiry"].to_numpy(dtype=np.float64),
+        "sigma": book["sigma"].to_numpy(dtype=np.float64),
+        "size": (book["quantity"] * multiplier).to_numpy(dtype=np.float64),
+        "is_put": (option_type == "put").to_numpy(),
+    }
+
+
+def _option_values(
+    spot: np.ndarray,
+    strike: np.ndarray,
+    expiry: np.ndarray,
+    rate: float | YieldCurve,
+    sigma: np.ndarray,
+    is_put: np.ndarray,
+) -> np.ndarray:
+    expiry = np.maximum(expiry, _MIN_EXPIRY)
+    if isinstance(rate, YieldCurve):
+        rate = rate.zero_rate(expiry)
+    calls = _price_calls(spot, strike, expiry, rate, np.maximum(sigma, _MIN_SIGMA))
+    # Puts from put-call parity, so each chunk is priced in a single call
+    puts = calls - spot + strike * np.exp(-rate * expiry)
+    return np.where(is_put, puts, calls)
+
+
+def _revalue(
+    positions: dict[str, np.ndarray],
+    spot_shocks: np.ndarray,
+    vol_shocks: np.ndarray,
+    rate: float | YieldCurve,
+    horizon_years: float,
+) -> np.ndarray:
+    """Returns the (scenarios x positions) P&L matrix."""
+    p = positions
+    base = _option_values(
+        p["spot"],
+        p["strike"],
+        p["expiry"],
+        rate,
+        p["sigma"],
+        p["is_put"],
+    )
+    shocked = _option_values(
+        p["spot"] * np.exp(spot_shocks[:, p["column"]]),
+        p["strike"],
+        p["expiry"] - horizon_years,
+        rate,
+        p["sigma"] * (1.0 + vol_shocks[:, p["column"]]),
+        p["is_put"],
+    )
+    return (shocked - base) * p["size"]
+
+
+def _portfolio_pnl(
+    positions: dict[str, np.ndarray],
+    spot_shocks: np.ndarray,
+    vol_shocks: np.ndarray,
+    rate: float | YieldCurve,
+    horizon_years: float,
+    chunk_size: int,
+) -> np.ndarray:
+    pnl = np.zeros(len(spot_shocks))
+    n_positions = len(positions["strike"])
+    for start in range(0, n_positions, chunk_size):
+        chunk = {k: v[start : start + chunk_size] for k, v in positions.items()}
+        pnl += _revalue(chunk, spot_shocks, vol_shocks, rate, horizon_years).sum(
+            axis=1,
+        )
+    return pnl
+
+
+def value_at_risk(
+    book: pd.DataFrame,
+    spot: pd.Series,
+    scenarios: Scenarios,
+    confidence: float = 0.99,
+    rate: float | YieldCurve = 0.0,
+    horizon_days: int = 1,
+    max_cells: int = 2_000_000,
+    max_workers: int = 1,
+) -> VaRResult:
+    """
+    Revalues an option book under every scenario and returns VaR and expected
+    shortfall with per-position contributions.
+
+    Positions are revalued in chunks of at most `max_cells` scenario x position
+    prices and each chunk is summed into the portfolio P&L vector immediately, so
+    memory does not grow with the book. Contributions come from a second pass that
+    only revalues the tail scenarios.
+
+    Args:
+        book (pd.DataFrame): One row per position with `BOOK_COLUMNS` and an
+            optional `multiplier`; `time_to_expiry` is in years.
+        spot (pd.Series): Current spot price by underlier.
+        scenarios (Scenarios): From `historical_scenarios` or
+            `monte_carlo_scenarios`.
+        confidence (float): VaR confidence level.
+        rate (float | YieldCurve): Continuously compounded risk-free rate, or a
+            curve looked up at each position's remaining time to expiry.
+        horizon_days (int): Holding period in trading days, which also shortens
+            every option's time to expiry.
+        max_cells (int): Upper bound on prices computed per chunk.
+        max_workers (int): Worker processes for position chunks; 1 runs in this
+            process.
+
+    Returns:
+        VaRResult: VaR, ES, the scenario P&L vector and contributions.
+    """
+    positions = _positions(book, spot, scenarios.underliers)
+    n_positions = len(book)
+    n_scenarios = len(scenarios)
+    horizon_years = horizon_days / 252
+    chunk_size = max(1, max_cells // max(n_scenarios, 1))
+    log.info(
+        "Revaluing %d positions under %d scenarios",
+        n_positions,
+        n_scenarios,
+    )
+
+    if max_workers == 1 or n_positions <= chunk_size:
+        pnl = _portfolio_pnl(
+            positions,
+            scenarios.spot_shocks,
+            scenarios.vol_shocks,
+            rate,
+            horizon_years,
+            chunk_size,
+        )
+    else:
+        # One task per worker, each chunking its share of the book
+        shares = np.array_split(np.arange(n_positions), max_workers)
+        # Fork is unsafe from threaded callers such as Streamlit
+        context = multiprocessing.get_context("forkserver")
+        with ProcessPoolExecutor(max_workers, mp_context=context) as executor:
+            futures = [
+                executor.submit(
+                    _portfolio_pnl,
+                    {k: v[share] for k, v in positions.items()},
+                    scenarios.spot_shocks,
+                    scenarios.vol_shocks,
+                    rate,
+                    horizon_years,
+                    chunk_size,
+                )
+                for share in shares
+                if len(share)
+            ]
+            pnl = np.sum([future.result() for future in futures], axis=0)
+
+    # Tail: the worst scenarios, VaR being the best of them
+    n_tail = max(1, int(np.ceil(n_scenarios * (1.0 - confidence))))
+    tail = np.argsort(pnl, kind="stable")[:n_tail]
+    var_scenario = tail[-1]
+    tail_chunk = max(1, max_cells // n_tail)
+    tail_pnl = np.hstack(
+        [
+            _revalue(
+                {k: v[start : start + tail_chunk] for k, v in positions.items()},
+                scenarios.spot_shocks[tail],
+                scenarios.vol_shocks[tail],
+                rate,
+                horizon_years,
+            )
+            for start in range(0, n_positions, tail_chunk)
+        ],
+    )
+    components = pd.DataFrame(
+        {
+            "component_var": -tail_pnl[-1],
+            "component_es": -tail_pnl.mean(axis=0),
+        },
+        index=book.index,
+    )
+    return VaRResult(
+        confidence=confidence,
+        var=float(-pnl[var_scenario]),
+        expected_shortfall=float(-pnl[tail].mean()),
+        pnl=pnl,
+        components=components,
+    )
@@ -0,0 +1,17 @@
+"""
+Streamlit app. Submodules are imported on first attribute access.
+"""
+
+from app._lazy import attach
+
+__getattr__, __dir__, __all__ = attach(
+    __name__,
+    [
+        "charts",
+        "downsample",
+        "jobs",
+        "reports",
+        "resources",
+        "streamlit_app",
+    ],
+)
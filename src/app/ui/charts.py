@@ -0,0 +1,129 @@
+"""
+Line charts of long time series, downsampled on the server.
+
+Streamlit sends every row of a chart's data to the browser, which stalls on
+millions of points. `timeseries_chart` draws at most a few points per pixel
+column: each series is kept as a `SeriesPyramid`, cached across reruns and
+sessions, and every rerun reads only the level matching the visible x-range.
+"""
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import streamlit as st
+
+from app import get_logger
+from app.ui.downsample import Method, SeriesPyramid
+
+if TYPE_CHECKING:
+    import polars as pl
+
+log = get_logger(__name__)
+
+# Streamlit does not report the browser width to the server; this fits a wide
+# layout on a typical display
+DEFAULT_WIDTH = 1200
+
+
+def _to_arrow(data: "pa.Table | pd.DataFrame | pl.DataFrame") -> pa.Table:
+    if isinstance(data, pa.Table):
+        return data
+    if isinstance(data, pd.DataFrame):
+        return pa.Table.from_pandas(data, preserve_index=False)
+    # polars, without importing it for callers that do not use it
+    if hasattr(data, "to_arrow"):
+        return data.to_arrow()
+    msg = f"Unsupported chart data type {type(data).__name__}"
+    raise TypeError(msg)
+
+
+@st.cache_resource(max_entries=16)
+def _pyramids(
+    key: str,
+    x: str,
+    columns: tuple[str, ...],
+    _table: pa.Table,
+) -> tuple[np.ndarray, dict[str, SeriesPyramid]]:
+    log.info("Building chart pyramids for %s: %d rows", key, _table.num_rows)
+    xs = _table[x].to_numpy()
+    order = None if np.all(xs[1:] >= xs[:-1]) else np.argsort(xs, kind="stable")
+    if order is not None:
+        xs = xs[order]
+    pyramids = {}
+    for column in columns:
+        ys = _table[column].cast(pa.float64()).to_numpy()
+        pyramids[column] = SeriesPyramid(xs, ys if order is None else ys[order])
+    return xs, pyramids
+
+
+def timeseries_chart(
+    data: "pa.Table | pd.DataFrame | pl.DataFrame",
+    x: str,
+    y: str | list[str],
+    *,
+    key: str,
+    width: int = DEFAULT_WIDTH,
+    method: Method = "minmax_lttb",
+    zoom: bool = True,
+    height: int | None = None,
+) -> None:
+    """
+    Draws `y` against `x` with at most a few points per pixel of `width`.
+
+    Args:
+        data (pa.Table | pd.DataFrame | pl.DataFrame): Chart data.
+        x (str): Column of the x-axis, numeric or temporal.
+        y (str | list[str]): Columns drawn as one line each.
+        key (str): Identifies `data`; the downsampled levels are cached under it,
+            so it must change whenever `data` does (e.g. include a snapshot id).
+        width (int): Pixel columns the chart is drawn on.
+        method (Method): Downsampling method, see `app.ui.downsample`.
+        zoom (bool): Show a range slider; a narrower range reads a finer level.
+        height (int | None): Chart height in pixels.
+    """
+    columns = (y,) if isinstance(y, str) else tuple(y)
+    xs, pyramids = _pyramids(key, x, columns, _to_arrow(data))
+    if len(xs) == 0:
+        st.info("No data to chart.")
+        return
+
+    x_range = None
+    if zoom and xs[0] != xs[-1]:
+        ends = xs[[0, -1]]
+        if np.issubdtype(xs.dtype, np.datetime64) and xs.dtype != "datetime64[D]":
+            # Finer units convert to int rather than datetime
+            ends = ends.astype("datetime64[us]")
+        first, last = ends.tolist()
+        low, high = st.slider(
+            "Range",
+            min_value=first,
+            max_value=last,
+            value=(first, last),
+            key=f"{key}-range",
+        )
+        if (low, high) != (first, last):
+            x_range = (
+                np.asarray(low, dtype=xs.dtype),
+                np.asarray(high, dtype=xs.dtype),
+            )
+
+    frames = []
+    for column, pyramid in pyramids.items():
+        idx = pyramid.query(width, x_range, method)
+        frames.append(
+            pd.DataFrame(
+                {x: pyramid.x[idx], "series": column, "value": pyramid.y[idx]},
+            ),
+        )
+    chart = pd.concat(frames, ignore_index=True)
+    st.line_chart(
+        chart,
+        x=x,
+        y="value",
+        color="series" if len(columns) > 1 else None,
+        y_label=columns[0] if len(columns) == 1 else None,
+        height=height,
+    )
+    st.caption(f"{len(chart):,} of {len(xs) * len(columns):,} points drawn")
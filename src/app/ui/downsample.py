@@ -0,0 +1,217 @@
+"""
+Shape-preserving downsampling of time series for charts.
+
+- `minmax` keeps the lowest and highest point of each of `n_buckets` equal
+  x-ranges, so spikes survive; with one bucket per pixel column the line drawn
+  is the same as for the full series.
+- `lttb` (Largest-Triangle-Three-Buckets) keeps, per bucket, the point forming
+  the largest triangle with the previously kept point and the next bucket's
+  average, which follows the visual shape with one point per pixel.
+- `minmax_lttb` preselects with `minmax` and runs `lttb` on the preselection,
+  which gives LTTB's shape at `minmax`'s cost on large series.
+
+Every function returns indices into the input, so other columns can be taken
+with the same selection. `SeriesPyramid` caches coarser levels of one series so
+a zoomed-out view never reads more than it draws.
+"""
+
+from typing import Literal
+
+import numpy as np
+
+type Method = Literal["lttb", "minmax", "minmax_lttb"]
+
+# Candidate points per output point preselected by `minmax_lttb`
+MINMAX_RATIO = 4
+
+
+def _as_float(x: np.ndarray) -> np.ndarray:
+    if np.issubdtype(x.dtype, np.datetime64):
+        x = x.astype("datetime64[ns]").view(np.int64)
+    return np.asarray(x, dtype=np.float64)
+
+
+def minmax(x: np.ndarray, y: np.ndarray, n_buckets: int) -> np.ndarray:
+    """
+    Indices of the minimum and maximum of `y` in each of `n_buckets` equal
+    x-ranges, plus the first and last point, in ascending order.
+
+    `x` must be sorted ascending and `y` free of NaN.
+    """
+    n = len(y)
+    if n <= 2 * n_buckets + 2:
+        return np.arange(n)
+    xf = _as_float(x)
+    span = xf[-1] - xf[0]
+    if span <= 0:
+        bucket = np.zeros(n, dtype=np.int64)
+    else:
+        bucket = ((xf - xf[0]) * (n_buckets / span)).astype(np.int64)
+        np.minimum(bucket, n_buckets - 1, out=bucket)
+    # `x` is sorted, so each bucket is a contiguous run
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    counts = np.diff(np.r_[starts, n])
+    run = np.repeat(np.arange(len(starts)), counts)
+    lows = np.repeat(np.minimum.reduceat(y, starts), counts)
+    highs = np.repeat(np.maximum.reduceat(y, starts), counts)
+    keep = np.zeros(n, dtype=bool)
+    keep[[0, n - 1]] = True
+    keep[_first_per_run(run, y == lows)] = True
+    keep[_first_per_run(run, y == highs)] = True
+    return np.flatnonzero(keep)
+
+
+def _first_per_run(run: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """Index of the first True of `mask` within each run of equal `run` values."""
+    idx = np.flatnonzero(mask)
+    return idx[np.r_[True, run[idx][1:] != run[idx][:-1]]]
+
+
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Indices of `n_out` points chosen by Largest-Triangle-Three-Buckets, always
+    including the first and last point.
+
+    `x` must be sorted ascending and `y` free of NaN.
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    xf = _as_float(x)
+    xf = xf - xf[0]
+    yf = np.asarray(y, dtype=np.float64)
+
+    # Bucket i of the n - 2 inner points is [edges[i], edges[i + 1])
+    edges = (np.arange(n_out - 1) * ((n - 2) / (n_out - 2))).astype(np.int64) + 1
+    edges[-1] = n - 1
+    # Average of every bucket, and of the last point as the final "next" bucket
+    counts = np.diff(np.r_[edges, n])
+    avg_x = np.add.reduceat(xf, edges) / counts
+    avg_y = np.add.reduceat(yf, edges) / counts
+
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        ax, ay = xf[a], yf[a]
+        cx, cy = avg_x[i + 1], avg_y[i + 1]
+        # Twice the triangle area; the constant factor does not change the argmax
+        area = np.abs((ax - cx) * (yf[lo:hi] - ay) - (ax - xf[lo:hi]) * (cy - ay))
+        a = lo + int(np.argmax(area))
+        out[i + 1] = a
+    return out
+
+
+def downsample(
+    x: np.ndarray,
+    y: np.ndarray,
+    width: int,
+    method: Method = "minmax_lttb",
+) -> np.ndarray:
+    """
+    Indices of the points to draw `y` against `x` on `width` pixels: one point
+    per pixel for LTTB, the extremes of each pixel column for min/max. NaN values
+    of `y` are skipped.
+    """
+    valid = ~np.isnan(y) if np.issubdtype(y.dtype, np.floating) else None
+    if valid is not None and not valid.all():
+        index = np.flatnonzero(valid)
+        return index[downsample(x[index], y[index], width, method)]
+    if method == "minmax":
+        return minmax(x, y, width)
+    if method == "lttb":
+        return lttb(x, y, width)
+    if method == "minmax_lttb":
+        pre = minmax(x, y, width * MINMAX_RATIO // 2)
+        return pre[lttb(x[pre], y[pre], width)]
+    msg = f"Unknown downsampling method {method!r}"
+    raise ValueError(msg)
+
+
+class SeriesPyramid:
+    """
+    Downsampled levels of one series, built on first use and kept.
+
+    Level 0 is the series itself; each level above keeps the min/max points of
+    `factor` times fewer buckets than the level below, down to about
+    `min_points`. A query reads the coarsest level that still has `oversample`
+    points per pixel within the requested x-range, then downsamples that slice,
+    so its cost depends on the chart width rather than on the series length.
+
+    Args:
+        x (np.ndarray): Sorted x values, numeric or datetime64.
+        y (np.ndarray): Values; NaN values are dropped.
+    """
+
+    def __init__(
+        self,
+        x: np.ndarray,
+        y: np.ndarray,
+        factor: int = 4,
+        min_points: int = 4096,
+        oversample: int = 4,
+    ) -> None:
+        if len(x) != len(y):
+            msg = f"x and y lengths differ: {len(x)} != {len(y)}"
+            raise ValueError(msg)
+        if np.issubdtype(y.dtype, np.floating) and np.isnan(y).any():
+            valid = ~np.isnan(y)
+            x, y = x[valid], y[valid]
+        self.x = x
+        self.y = y
+        self.factor = factor
+        self.min_points = min_points
+        self.oversample = oversample
+        # Levels 1 and up, as ascending indices into `x` and `y`
+        self._levels: list[np.ndarray] = []
+
+    def level(self, k: int) -> np.ndarray | None:
+        """
+        Indices of level `k` >= 1, building the levels below it if needed; None
+        if the level below is already smaller than `min_points`.
+        """
+        while len(self._levels) < k:
+            if self._levels:
+                below = self._levels[-1]
+                x, y = self.x[below], self.y[below]
+            else:
+                below, x, y = None, self.x, self.y
+            if len(y) <= self.min_points:
+                return None
+            picked = minmax(x, y, max(1, len(y) // (2 * self.factor)))
+            self._levels.append(picked if below is None else below[picked])
+        return self._levels[k - 1]
+
+    def query(
+        self,
+        width: int,
+        x_range: tuple | None = None,
+        method: Method = "minmax_lttb",
+    ) -> np.ndarray:
+        """
+        Indices into `x` and `y` of the points to draw for `x_range` (inclusive,
+        the whole series by default) on `width` pixels.
+        """
+        lo, hi = 0, len(self.y)
+        if x_range is not None:
+            lo = int(np.searchsorted(self.x, x_range[0], side="left"))
+            hi = int(np.searchsorted(self.x, x_range[1], side="right"))
+        needed = width * self.oversample
+
+        selected = None
+        count, k = hi - lo, 0
+        # Move up while the next level still has enough points in the range
+        while count > needed * self.factor:
+            level = self.level(k + 1)
+            if level is None:
+                break
+            k += 1
+            start = np.searchsorted(level, lo, side="left")
+            stop = np.searchsorted(level, hi, side="left")
+            selected, count = level[start:stop], stop - start
+        if selected is None:
+            picked = downsample(self.x[lo:hi], self.y[lo:hi], width, method)
+            return lo + picked
+        picked = downsample(self.x[selected], self.y[selected], width, method)
+        return selected[picked]
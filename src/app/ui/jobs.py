@@ -0,0 +1,256 @@
+"""
+Background jobs for heavy computations started from Streamlit pages.
+
+`JobManager` runs functions on a process pool and hands out `Job` handles.
+Submitting a function with the same inputs as a running or recently finished job
+returns that job, so every session asking for the same computation shares one
+execution and its result. Finished results are kept in a bounded LRU.
+
+Jobs report progress, and notice cancellation, through `report_progress`:
+
+    def price_grid(spots, vols):
+        for i, spot in enumerate(spots):
+            report_progress(i / len(spots), f"spot {spot}")
+            ...
+
+Pending jobs are cancelled right away; running jobs stop at their next
+`report_progress` call, which raises `JobCancelled`.
+"""
+
+import contextlib
+import hashlib
+import multiprocessing
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import Executor, Future
+from multiprocessing.managers import DictProxy, SyncManager
+from typing import Any, Literal
+
+from app import get_logger
+
+log = get_logger(__name__)
+
+type JobStatus = Literal["pending", "running", "done", "failed", "cancelled"]
+
+
+class JobCancelled(Exception):  # noqa: N818
+    """Raised in a worker by `report_progress` once its job is cancelled."""
+
+
+# State of the job running in this worker process, shared with the manager
+_current: DictProxy | None = None
+
+
+def report_progress(fraction: float, message: str = "") -> None:
+    """
+    Publishes the progress of the job running in this process, a no-op outside
+    of a job, so job functions can also be called directly.
+
+    Raises:
+        JobCancelled: If the job has been cancelled.
+    """
+    if _current is None:
+        return
+    _current["progress"] = (min(1.0, max(0.0, fraction)), message)
+    if _current.get("cancelled"):
+        raise JobCancelled
+
+
+def _run(state: DictProxy, fn: Callable[..., Any], args: tuple, kwargs: dict) -> Any:
+    global _current
+    if state.get("cancelled"):
+        raise JobCancelled
+    _current = state
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        _current = None
+
+
+def job_key(fn: Callable[..., Any], args: tuple, kwargs: dict) -> str:
+    """Hash of the function and its pickled arguments."""
+    payload = (fn.__module__, fn.__qualname__, args, sorted(kwargs.items()))
+    return hashlib.sha256(pickle.dumps(payload, protocol=5)).hexdigest()
+
+
+class Job:
+    """Handle on a submitted computation, shared by every session that asked for it."""
+
+    def __init__(self, key: str, name: str, future: Future, state: DictProxy) -> None:
+        self.key = key
+        self.name = name
+        self.future = future
+        self.submitted = time.time()
+        self.finished: float | None = None
+        self._state: DictProxy | None = state
+        self._progress: tuple[float, str] = (0.0, "")
+        self.cancel_requested = False
+
+    @property
+    def status(self) -> JobStatus:
+        if self.future.cancelled():
+            return "cancelled"
+        if self.future.done():
+            error = self.future.exception()
+            if isinstance(error, JobCancelled):
+                return "cancelled"
+            return "failed" if error is not None else "done"
+        return "running" if self.future.running() else "pending"
+
+    @property
+    def done(self) -> bool:
+        return self.future.done()
+
+    @property
+    def progress(self) -> tuple[float, str]:
+        """Last reported (fraction, message); 1.0 once the job has succeeded."""
+        self._read_state()
+        if self.status == "done":
+            return (1.0, self._progress[1])
+        return self._progress
+
+    def _read_state(self) -> None:
+        state = self._state
+        if state is not None:
+            # The manager is gone after shutdown; keep the last known progress
+            with contextlib.suppress(OSError, EOFError):
+                self._progress = state.get("progress", self._progress)
+
+    def result(self, timeout: float | None = None) -> Any:
+        """
+        Waits for and returns the result. Results are shared between sessions and
+        must not be mutated.
+
+        Raises:
+            JobCancelled: If the job was cancelled while running.
+        """
+        return self.future.result(timeout)
+
+    def cancel(self) -> bool:
+        """
+        Cancels the job for every session sharing it.
+
+        Returns:
+            bool: False if the job had already finished.
+        """
+        if self.future.done():
+            return False
+        self.cancel_requested = True
+        state = self._state
+        if state is not None:
+            state["cancelled"] = True
+        self.future.cancel()
+        return True
+
+    def _finish(self) -> None:
+        self.finished = time.time()
+        self._read_state()
+        # Releases the shared dict in the manager process
+        self._state = None
+
+    def __repr__(self) -> str:
+        return f"Job({self.name!r}, {self.status}, key={self.key[:12]})"
+
+
+class JobManager:
+    """
+    Deduplicating job runner on top of a process pool.
+
+    Args:
+        executor (Executor): Pool the jobs run on, usually a ProcessPoolExecutor.
+        max_results (int): Finished jobs kept for reuse, least recently used
+            first out. Failed and cancelled jobs are not kept.
+        ttl (float | None): Seconds a finished result is reused for; forever if None.
+    """
+
+    def __init__(
+        self,
+        executor: Executor,
+        max_results: int = 128,
+        ttl: float | None = None,
+    ) -> None:
+        self.executor = executor
+        self.max_results = max_results
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._active: dict[str, Job] = {}
+        self._results: OrderedDict[str, Job] = OrderedDict()
+        self._manager: SyncManager | None = None
+
+    def _shared_dict(self) -> DictProxy:
+        # The manager process holds the progress and cancellation flag of every
+        # job, since pool workers are started before the jobs exist
+        if self._manager is None:
+            # Spawned: forking a server process with running threads can deadlock
+            self._manager = SyncManager(ctx=multiprocessing.get_context("spawn"))
+            self._manager.start()
+        return self._manager.dict()
+
+    def submit(self, fn: Callable[..., Any], /, *args: Any, **kwargs: Any) -> Job:
+        """
+        Runs `fn(*args, **kwargs)` in the pool, unless a job with the same inputs
+        is running or has a cached result, in which case that job is returned.
+
+        `fn` and its arguments must be picklable; `fn` should be defined at module
+        level.
+        """
+        key = job_key(fn, args, kwargs)
+        with self._lock:
+            job = self._results.get(key)
+            if job is not None:
+                if self._is_fresh(job):
+                    self._results.move_to_end(key)
+                    return job
+                del self._results[key]
+            job = self._active.get(key)
+            # The done callback may not have run yet for a job that just ended
+            if job is not None and self._is_reusable(job):
+                return job
+            state = self._shared_dict()
+            future = self.executor.submit(_run, state, fn, args, kwargs)
+            job = Job(key, fn.__qualname__, future, state)
+            self._active[key] = job
+        log.info("Submitted job %r", job)
+        # Outside the lock: the callback runs right away if the job already ended
+        future.add_done_callback(lambda _: self._finished(job))
+        return job
+
+    @staticmethod
+    def _is_reusable(job: Job) -> bool:
+        if job.done:
+            return job.status == "done"
+        return not job.cancel_requested
+
+    def _is_fresh(self, job: Job) -> bool:
+        return self.ttl is None or time.time() - (job.finished or 0.0) < self.ttl
+
+    def _finished(self, job: Job) -> None:
+        job._finish()
+        with self._lock:
+            if self._active.get(job.key) is job:
+                del self._active[job.key]
+            if job.status == "done":
+                self._results[job.key] = job
+                self._results.move_to_end(job.key)
+                while len(self._results) > self.max_results:
+                    self._results.popitem(last=False)
+        log.info("Job %r finished in %.1fs", job, job.finished - job.submitted)  # type: ignore[operator]
+
+    def get(self, key: str) -> Job | None:
+        with self._lock:
+            return self._active.get(key) or self._results.get(key)
+
+    def jobs(self) -> list[Job]:
+        """Running and cached jobs, most recently submitted first."""
+        with self._lock:
+            jobs = [*self._active.values(), *self._results.values()]
+        return sorted(jobs, key=lambda job: job.submitted, reverse=True)
+
+    def shutdown(self) -> None:
+        """Stops the manager process; the executor is left to its owner."""
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
@@ -0,0 +1,15 @@
+"""
+Materialized reports read by the UI. Submodules are imported on first attribute
+access.
+"""
+
+from app._lazy import attach
+
+__getattr__, __dir__, __all__ = attach(
+    __name__,
+    [
+        "definitions",
+        "registry",
+        "store",
+    ],
+)
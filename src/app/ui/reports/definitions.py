@@ -0,0 +1,126 @@
+"""
+Reports shown in the UI, computed from ``daily_bars``.
+
+Aggregation runs in the database; each report's output is bounded by the number
+of symbols or dates rather than by the number of bars.
+"""
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+from sqlalchemy import Float, Select, and_, func, select
+
+from app.common.database import DB
+from app.ui.reports.registry import report
+
+DAILY_BARS = "daily_bars"
+
+BAR_COVERAGE_SCHEMA = pa.schema(
+    [
+        pa.field("symbol", pa.string()),
+        pa.field("first_date", pa.date32()),
+        pa.field("last_date", pa.date32()),
+        pa.field("bars", pa.int64()),
+    ],
+)
+
+LATEST_BARS_SCHEMA = pa.schema(
+    [
+        pa.field("symbol", pa.string()),
+        pa.field("date", pa.date32()),
+        pa.field("close", pa.float64()),
+        pa.field("volume", pa.int64()),
+        pa.field("return_1d", pa.float64()),
+    ],
+)
+
+EQUAL_WEIGHT_INDEX_SCHEMA = pa.schema(
+    [
+        pa.field("date", pa.date32()),
+        pa.field("symbols", pa.int64()),
+        pa.field("return", pa.float64()),
+        pa.field("level", pa.float64()),
+    ],
+)
+
+
+def _fetch(db: DB, stmt: Select, schema: pa.Schema) -> pa.Table:
+    rows = [dict(row) for row in db.execute(stmt).fetchall()]
+    return pa.Table.from_pylist(rows, schema=schema)
+
+
+@report("bar_coverage", upstream=[DAILY_BARS])
+def bar_coverage(db: DB) -> pa.Table:
+    """First and last date and number of bars per symbol."""
+    t = db.get_table(DAILY_BARS).c
+    stmt = (
+        select(
+            t.symbol,
+            func.min(t.date).label("first_date"),
+            func.max(t.date).label("last_date"),
+            func.count().label("bars"),
+        )
+        .group_by(t.symbol)
+        .order_by(t.symbol)
+    )
+    return _fetch(db, stmt, BAR_COVERAGE_SCHEMA)
+
+
+@report("latest_bars", upstream=[DAILY_BARS])
+def latest_bars(db: DB) -> pa.Table:
+    """Latest close and volume per symbol, with the one-day return."""
+    t = db.get_table(DAILY_BARS).c
+    ranked = select(
+        t.symbol,
+        t.date,
+        t.close,
+        t.volume,
+        func.row_number()
+        .over(partition_by=t.symbol, order_by=t.date.desc())
+        .label("rn"),
+    ).cte("ranked")
+    last, prev = ranked.alias("last"), ranked.alias("prev")
+    stmt = (
+        select(
+            last.c.symbol,
+            last.c.date,
+            last.c.close,
+            last.c.volume,
+            (last.c.close / prev.c.close - 1).label("return_1d"),
+        )
+        .select_from(
+            last.outerjoin(
+                prev,
+                and_(prev.c.symbol == last.c.symbol, prev.c.rn == 2),
+            ),
+        )
+        .where(last.c.rn == 1)
+        .order_by(last.c.symbol)
+    )
+    return _fetch(db, stmt, LATEST_BARS_SCHEMA)
+
+
+@report("equal_weight_index", upstream=[DAILY_BARS], chart=("date", "level"))
+def equal_weight_index(db: DB) -> pa.Table:
+    """Equal-weighted index of the universe's daily close-to-close returns."""
+    t = db.get_table(DAILY_BARS).c
+    prev_close = func.lag(t.close, type_=Float).over(
+        partition_by=t.symbol,
+        order_by=t.date,
+    )
+    returns = select(t.date, (t.close / prev_close - 1).label("ret")).subquery()
+    stmt = (
+        select(
+            returns.c.date,
+            func.count(returns.c.ret).label("symbols"),
+            func.avg(returns.c.ret).label("return"),
+        )
+        .group_by(returns.c.date)
+        .order_by(returns.c.date)
+    )
+    table = _fetch(db, stmt, EQUAL_WEIGHT_INDEX_SCHEMA.remove(3))
+    daily = pc.fill_null(table["return"], 0.0).to_numpy()
+    return table.append_column(
+        EQUAL_WEIGHT_INDEX_SCHEMA.field("level"),
+        pa.array(np.cumprod(1.0 + daily), pa.float64()),
+    )
@@ -0,0 +1,133 @@
+"""
+Report definitions and their incremental refresh.
+
+A report is a function computing a table from the database, registered with the
+`report` decorator together with the tables it reads. `refresh_report` rebuilds a
+report only if one of those tables was bumped (see `app.common.table_versions`)
+or the definition's version changed since its live snapshot was built.
+"""
+
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+import pyarrow as pa
+
+from app import get_logger
+from app.common.database import DB
+from app.common.table_versions import get_table_versions
+from app.ui.reports.store import ReportStore, SnapshotMeta
+
+log = get_logger(__name__)
+
+BuildFn = Callable[[DB], pa.Table]
+
+
+@dataclass(frozen=True)
+class Report:
+    name: str
+    build: BuildFn
+    upstream: tuple[str, ...]
+    # Bump when `build` changes, so existing snapshots are rebuilt
+    version: str = "1"
+    description: str = ""
+    # Columns the UI plots, x first; empty for reports shown as tables
+    chart: tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class RefreshResult:
+    report: str
+    built: bool
+    meta: SnapshotMeta
+
+
+_reports: dict[str, Report] = {}
+
+
+def report(
+    name: str,
+    upstream: list[str],
+    version: str = "1",
+    description: str = "",
+    chart: tuple[str, ...] = (),
+) -> Callable[[BuildFn], BuildFn]:
+    """Registers the decorated function as the build of report `name`."""
+
+    def register(build: BuildFn) -> BuildFn:
+        if name in _reports:
+            msg = f"Report {name!r} is already registered"
+            raise ValueError(msg)
+        _reports[name] = Report(
+            name,
+            build,
+            tuple(upstream),
+            version,
+            description or (build.__doc__ or "").strip(),
+            chart,
+        )
+        return build
+
+    return register
+
+
+def get_reports(names: list[str] | None = None) -> list[Report]:
+    """
+    Registered reports, all of them by default.
+
+    Raises:
+        KeyError: If a name is not registered.
+    """
+    # Registers the bundled definitions
+    from app.ui.reports import definitions  # noqa: F401
+
+    if names is None:
+        return list(_reports.values())
+    unknown = sorted(set(names) - set(_reports))
+    if unknown:
+        msg = f"Unknown reports {unknown}"
+        raise KeyError(msg)
+    return [_reports[name] for name in names]
+
+
+def is_stale(
+    report: Report,
+    meta: SnapshotMeta | None,
+    versions: dict[str, int],
+) -> bool:
+    return (
+        meta is None
+        or meta.definition_version != report.version
+        or meta.upstream != versions
+    )
+
+
+def refresh_report(
+    db: DB,
+    store: ReportStore,
+    report: Report,
+    *,
+    force: bool = False,
+) -> RefreshResult:
+    """
+    Rebuilds `report` if it is stale, or always with `force`.
+
+    Upstream versions are read before the build, so a change landing while it
+    runs makes the snapshot stale again and it is rebuilt on the next refresh.
+    """
+    versions = get_table_versions(db, report.upstream)
+    meta = store.meta(report.name)
+    if not force and not is_stale(report, meta, versions):
+        log.debug("Report %s is up to date at %s", report.name, versions)
+        return RefreshResult(report.name, False, meta)  # type: ignore[arg-type]
+
+    started = time.perf_counter()
+    data = report.build(db)
+    meta = store.write(
+        report.name,
+        data,
+        report.version,
+        versions,
+        time.perf_counter() - started,
+    )
+    return RefreshResult(report.name, True, meta)
@@ -0,0 +1,27 @@
+import streamlit as st
+
+from app import log
+from app.ui.charts import timeseries_chart
+from app.ui.reports.registry import get_reports
+from app.ui.resources import load_report
+
+log.info("Running reports page")
+st.title("Reports")
+
+reports = {r.name: r for r in get_reports()}
+name = st.selectbox("Report", list(reports))
+report = reports[name]
+try:
+    table, meta = load_report(name)
+except FileNotFoundError:
+    st.info(f"{name} has not been materialized yet; run materialize_reports_flow.")
+    st.stop()
+
+st.caption(
+    f"{report.description} {meta.rows} rows, built {meta.built_at:%Y-%m-%d %H:%M} "
+    f"UTC from {meta.upstream}.",
+)
+if report.chart:
+    x, *y = report.chart
+    timeseries_chart(table, x, y, key=f"{name}-{meta.snapshot}")
+st.dataframe(table)
@@ -0,0 +1,161 @@
+"""
+On-disk snapshots of materialized reports.
+
+Each build of a report is written to its own directory, as Parquet for archival
+and interchange and as an uncompressed Arrow IPC file that readers memory-map::
+
+    <root>/<report>/<snapshot>/data.parquet
+    <root>/<report>/<snapshot>/data.arrow
+    <root>/<report>/current.json
+
+``current.json`` holds the `SnapshotMeta` of the live snapshot, including the
+upstream table versions it was built from, and is replaced atomically, so a
+reader sees either the old or the new snapshot. Reading a snapshot maps the file
+without copying it, so its cost does not depend on the history behind it.
+"""
+
+import itertools
+import json
+import shutil
+import uuid
+from dataclasses import asdict, dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+from app import get_logger
+
+log = get_logger(__name__)
+
+META_KEY = b"report_meta"
+
+# Snapshot directories are named <built_at in this format>-<random suffix>
+_SNAPSHOT_TIME = "%Y%m%dT%H%M%S%f"
+
+
+@dataclass(frozen=True)
+class SnapshotMeta:
+    report: str
+    snapshot: str
+    # `Report.version` of the definition that built the snapshot
+    definition_version: str
+    # Version of every upstream table when the build started
+    upstream: dict[str, int]
+    rows: int
+    built_at: datetime
+    build_seconds: float
+
+    def to_json(self) -> str:
+        return json.dumps({**asdict(self), "built_at": self.built_at.isoformat()})
+
+    @classmethod
+    def from_json(cls, data: str) -> "SnapshotMeta":
+        values = json.loads(data)
+        return cls(**{**values, "built_at": datetime.fromisoformat(values["built_at"])})
+
+
+class ReportStore:
+    """
+    Args:
+        root (str | Path): Directory holding one subdirectory per report.
+        keep (int): Snapshots kept per report, the live one included. Older ones
+            are deleted after a new snapshot is published.
+        min_age (float): Seconds a snapshot is kept after it was replaced, even
+            beyond `keep`, so a reader that resolved it just before can still
+            open it.
+    """
+
+    def __init__(self, root: str | Path, keep: int = 2, min_age: float = 600.0) -> None:
+        self.root = Path(root)
+        self.keep = max(1, keep)
+        self.min_age = min_age
+
+    def _current(self, report: str) -> Path:
+        return self.root / report / "current.json"
+
+    def meta(self, report: str) -> SnapshotMeta | None:
+        """Metadata of the live snapshot, None if the report was never built."""
+        try:
+            return SnapshotMeta.from_json(self._current(report).read_text())
+        except FileNotFoundError:
+            return None
+
+    def write(
+        self,
+        report: str,
+        data: pa.Table,
+        definition_version: str,
+        upstream: dict[str, int],
+        build_seconds: float,
+    ) -> SnapshotMeta:
+        """Writes `data` as a new snapshot and makes it the live one."""
+        built_at = datetime.now(UTC)
+        meta = SnapshotMeta(
+            report=report,
+            snapshot=f"{built_at:{_SNAPSHOT_TIME}}-{uuid.uuid4().hex[:6]}",
+            definition_version=definition_version,
+            upstream=dict(upstream),
+            rows=data.num_rows,
+            built_at=built_at,
+            build_seconds=build_seconds,
+        )
+        directory = self.root / report / meta.snapshot
+        directory.mkdir(parents=True)
+        data = data.replace_schema_metadata(
+            {**(data.schema.metadata or {}), META_KEY: meta.to_json().encode()},
+        )
+        pq.write_table(data, directory / "data.parquet", compression="zstd")
+        with (
+            pa.OSFile(str(directory / "data.arrow"), "wb") as sink,
+            ipc.new_file(sink, data.schema) as writer,
+        ):
+            writer.write_table(data)
+
+        current = self._current(report)
+        tmp = current.with_suffix(f".{meta.snapshot}.tmp")
+        tmp.write_text(meta.to_json())
+        tmp.replace(current)
+        self._prune(report, meta.snapshot)
+        log.info("Published %s snapshot %s (%d rows)", report, meta.snapshot, meta.rows)
+        return meta
+
+    def _prune(self, report: str, live: str) -> None:
+        snapshots = sorted(
+            (p for p in (self.root / report).iterdir() if p.is_dir()),
+            key=lambda p: p.name,
+        )
+        now = datetime.now(UTC)
+        # Mapped files stay readable after deletion, so open readers are unaffected;
+        # one that has read current.json but not yet opened the file is covered by
+        # the time since the snapshot was replaced by its successor
+        stale = len(snapshots) - self.keep
+        for path, successor in itertools.pairwise(snapshots[: stale + 1]):
+            replaced_at = datetime.strptime(
+                successor.name.split("-")[0],
+                _SNAPSHOT_TIME,
+            ).replace(tzinfo=UTC)
+            if (
+                path.name != live
+                and (now - replaced_at).total_seconds() >= self.min_age
+            ):
+                shutil.rmtree(path, ignore_errors=True)
+
+    def read(self, report: str, snapshot: str | None = None) -> pa.Table:
+        """
+        Memory-maps a snapshot, the live one by default; the returned table is
+        backed by the file rather than copied into memory.
+
+        Raises:
+            FileNotFoundError: If the report has no such snapshot.
+        """
+        if snapshot is None:
+            meta = self.meta(report)
+            if meta is None:
+                msg = f"Report {report!r} has not been materialized in {self.root}"
+                raise FileNotFoundError(msg)
+            snapshot = meta.snapshot
+        path = self.root / report / snapshot / "data.arrow"
+        return ipc.open_file(pa.memory_map(str(path))).read_all()
@@ -1,11 +1,68 @@
 from concurrent.futures import ProcessPoolExecutor
 
+import pyarrow as pa
 import streamlit as st
 
-from app import log
+from app import config, log
+from app.ui.jobs import Job, JobManager
+from app.ui.reports.store import ReportStore, SnapshotMeta
 
 
 @st.cache_resource
 def get_executor() -> ProcessPoolExecutor:
     log.info("Initializing executor")
     return ProcessPoolExecutor(max_workers=2, max_tasks_per_child=100)
+
+
+@st.cache_resource
+def get_job_manager() -> JobManager:
+    """Job manager shared by every session of this server."""
+    log.info("Initializing job manager")
+    return JobManager(get_executor(), max_results=64)
+
+
+def show_job(job: Job, run_every: float = 1.0) -> None:
+    """
+    Shows a progress bar and a cancel button for `job`, refreshed every
+    `run_every` seconds, and reruns the page once the job has finished. Pages call
+    this while `job.done` is False and show `job.result()` afterwards.
+    """
+
+    @st.fragment(run_every=run_every)
+    def _progress() -> None:
+        if job.done:
+            st.rerun(scope="app")
+        fraction, message = job.progress
+        st.progress(fraction, text=message or f"{job.name}: {job.status}")
+        if st.button("Cancel", key=f"cancel-{job.key}"):
+            job.cancel()
+
+    _progress()
+
+
+@st.cache_resource
+def get_report_store() -> ReportStore:
+    return ReportStore(config.REPORTS_DIR)
+
+
+@st.cache_resource(max_entries=32)
+def _map_snapshot(report: str, snapshot: str) -> pa.Table:
+    log.info("Mapping %s snapshot %s", report, snapshot)
+    return get_report_store().read(report, snapshot)
+
+
+def load_report(report: str) -> tuple[pa.Table, SnapshotMeta]:
+    """
+    Returns the live snapshot of a materialized report and its metadata.
+
+    Each snapshot is memory-mapped once and shared by every session; a page load
+    only reads the small ``current.json`` to find the live snapshot.
+
+    Raises:
+        FileNotFoundError: If the report has not been materialized yet.
+    """
+    meta = get_report_store().meta(report)
+    if meta is None:
+        msg = f"Report {report!r} has not been materialized yet"
+        raise FileNotFoundError(msg)
+    return _map_snapshot(report, meta.snapshot), meta
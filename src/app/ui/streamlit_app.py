@@ -32,12 +32,20 @@ def sidebar():
             icon="📊",
         ),
     ]
+    reports_pages: list[StreamlitPage] = [
+        st.Page(
+            "reports/reports_page.py",
+            title="Reports",
+            icon="📋",
+        ),
+    ]
     pg: StreamlitPage = st.navigation(
         # [home_page, options_pages[0]],
         {
             "Home": [home_page],
             "Options": options_pages,
             "Portfolio Optimization": portfolio_pages,
+            "Reports": reports_pages,
         },
     )
     log.info(pg.url_path)
@@ -1,4 +1,28 @@
-def test_email_send_message():
+import socket
+
+import pytest
+
+
+@pytest.fixture
+def smtp_pool():
+    """Pool connected to a local SMTP server that accepts every message."""
+    from aiosmtpd.controller import Controller
+    from aiosmtpd.handlers import Sink
+
+    from app.common.email_sender import SMTPPool
+
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    controller = Controller(Sink(), hostname="127.0.0.1", port=port)
+    controller.start()
+    pool = SMTPPool("127.0.0.1", port)
+    yield pool
+    pool.close()
+    controller.stop()
+
+
+def test_email_send_message(smtp_pool):
     from app import log
     from app.common.email_sender import email_send_message
 
@@ -17,5 +41,6 @@ def test_email_send_message():
         email_to_bcc=None,
         priority=3,
         attachments=["./pyproject.toml", "./README.md"],
+        pool=smtp_pool,
     )
     log.info(f"Email sent successfully: {result}")
@@ -0,0 +1,117 @@
+from datetime import date
+
+import pytest
+
+
+@pytest.fixture(scope="module")
+def prefect_harness():
+    from prefect.logging.handlers import APILogHandler
+    from prefect.testing.utilities import prefect_test_harness
+
+    from app import log
+    from app.flows import notifications
+
+    # State hooks deliver digests to a list instead of the SMTP relay
+    sent = []
+    dispatcher = notifications.NotificationDispatcher(lambda s, b: sent.append(s))
+    previous, notifications._dispatcher = notifications._dispatcher, dispatcher
+    with prefect_test_harness():
+        yield sent
+    dispatcher.close()
+    notifications._dispatcher = previous
+    # Prefect attaches its API handler to the app logger (extra_loggers), which
+    # warns on every log call made outside a flow by later tests
+    log.handlers[:] = [h for h in log.handlers if not isinstance(h, APILogHandler)]
+
+
+class Provider:
+    def __init__(self, fail_after=None, listed=None):
+        self.fail_after = fail_after
+        self.listed = listed or {}
+        self.calls = []
+
+    def get_bars(self, symbol, start_date=None, end_date=None):
+        import pandas as pd
+
+        self.calls.append((symbol, start_date))
+        if symbol == "EEE" and self.fail_after and end_date > self.fail_after:
+            msg = "provider outage"
+            raise ConnectionError(msg)
+        start_date = max(start_date, self.listed.get(symbol, start_date))
+        index = pd.bdate_range(start_date, end_date, inclusive="left")
+        return pd.DataFrame({"close": 1.0, "volume": 10}, index=index)
+
+
+def test_next_chunk_days_tracks_target_duration():
+    from app.flows.backfill_bars import next_chunk_days
+
+    assert next_chunk_days(100, 30.0, 60.0, 7, 1000) == 200
+    assert next_chunk_days(100, 1.0, 60.0, 7, 1000) == 200
+    assert next_chunk_days(100, 80.0, 60.0, 7, 1000) == 75
+    assert next_chunk_days(10, 600.0, 60.0, 7, 1000) == 7
+    assert next_chunk_days(800, 0.0, 60.0, 7, 1000) == 1000
+
+
+def test_backfill_resumes_from_watermarks(prefect_harness, tmp_path):
+    from app.common.database import DB
+    from app.flows.backfill_bars import backfill_bars_flow, get_watermarks
+    from app.mkt_data.providers import use_provider
+
+    db_url = f"sqlite:///{tmp_path / 'backfill.db'}"
+    params = {
+        "symbols": ["AAA", "BBB", "CCC", "DDD", "EEE", "FFF"],
+        "start_date": date(2024, 1, 1),
+        "end_date": date(2024, 4, 1),
+        "db_url": db_url,
+        "bucket_size": 2,
+        "parallelism": 2,
+        "chunk_days": 14,
+        "rate_per_sec": None,
+        "max_retries": 0,
+    }
+
+    provider = Provider(fail_after=date(2024, 2, 1))
+    with use_provider(provider), pytest.raises(RuntimeError, match="rerun"):
+        backfill_bars_flow(**params)
+    db = DB(db_url)
+    marks = get_watermarks(db, "daily_bars")
+    assert marks["AAA"] == marks["DDD"] == date(2024, 4, 1)
+    assert date(2024, 1, 1) < marks["EEE"] == marks["FFF"] <= date(2024, 2, 1)
+
+    provider = Provider()
+    with use_provider(provider):
+        chunks = backfill_bars_flow(**params)
+    assert {symbol for symbol, _ in provider.calls} == {"EEE", "FFF"}
+    assert min(start for _, start in provider.calls) == marks["EEE"]
+    assert chunks[0].start == marks["EEE"]
+    assert chunks[-1].end == date(2024, 4, 1)
+    assert all(c.rows_per_sec > 0 for c in chunks)
+
+    rows = db.fetch_all("SELECT symbol, COUNT(*) AS n FROM daily_bars GROUP BY symbol")
+    assert {row.n for row in rows} == {65}
+    assert len(rows) == 6
+    assert set(get_watermarks(db, "daily_bars").values()) == {date(2024, 4, 1)}
+
+
+def test_backfill_advances_symbols_without_bars(prefect_harness, tmp_path):
+    from app.common.database import DB
+    from app.flows.backfill_bars import backfill_bars_flow, get_watermarks
+    from app.mkt_data.providers import use_provider
+
+    db_url = f"sqlite:///{tmp_path / 'backfill.db'}"
+    provider = Provider(listed={"NEW": date(2024, 3, 1)})
+    with use_provider(provider):
+        backfill_bars_flow(
+            ["AAA", "NEW"],
+            date(2024, 1, 1),
+            date(2024, 4, 1),
+            db_url=db_url,
+            chunk_days=14,
+            rate_per_sec=None,
+            max_retries=0,
+        )
+    db = DB(db_url)
+    # Chunks before the listing return no bars and still complete
+    assert set(get_watermarks(db, "daily_bars").values()) == {date(2024, 4, 1)}
+    rows = db.fetch_all("SELECT symbol, COUNT(*) AS n FROM daily_bars GROUP BY symbol")
+    assert {row.symbol: row.n for row in rows} == {"AAA": 65, "NEW": 21}
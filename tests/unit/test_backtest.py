@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def prices():
+    rng = np.random.default_rng(3)
+    values = 100 * np.exp(np.cumsum(rng.normal(0.0005, 0.02, (300, 6)), axis=0))
+    values[:40, 0] = np.nan
+    return pd.DataFrame(values, columns=[f"S{i}" for i in range(6)])
+
+
+def test_rolling_mean_matches_pandas(prices):
+    from app.backtest.strategies import rolling_mean
+
+    means = rolling_mean(prices.to_numpy(), np.array([5, 20]))
+    for i, window in enumerate([5, 20]):
+        expected = prices.rolling(window).mean().to_numpy()
+        np.testing.assert_allclose(means[i], expected)
+
+
+def test_simulate_holds_weights_for_the_next_day():
+    from app.backtest.engine import simulate
+
+    prices = np.array([[100.0, 50.0], [110.0, 50.0], [121.0, 25.0]])
+    weights = np.array([[[1.0, 0.0], [0.5, 0.5], [0.5, 0.5]]])
+
+    result = simulate(prices, weights, cost_bps=10)
+
+    np.testing.assert_allclose(result["turnover"], [[1.0, 1.0, 0.0]])
+    np.testing.assert_allclose(result["gross"], [[0.0, 0.1, -0.2]])
+    np.testing.assert_allclose(result["net"], [[-0.001, 0.099, -0.2]])
+
+
+def test_backtest_sweep_matches_between_processes(prices):
+    from app.backtest.engine import STAT_COLUMNS, backtest, param_grid
+    from app.backtest.strategies import moving_average_crossover
+
+    grid = param_grid(fast=[5, 10], slow=[20, 50, 80])
+
+    local = backtest(prices, moving_average_crossover, grid, chunk_size=4)
+    pooled = backtest(
+        prices,
+        moving_average_crossover,
+        grid,
+        chunk_size=2,
+        max_workers=2,
+    )
+
+    assert local.column_names == ["fast", "slow", *STAT_COLUMNS]
+    assert local.num_rows == 6
+    assert local.equals(pooled)
+    assert local["slow"].to_pylist() == [20, 50, 80, 20, 50, 80]
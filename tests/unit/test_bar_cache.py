@@ -0,0 +1,127 @@
+from datetime import date
+
+import pytest
+
+
+@pytest.fixture
+def fetch_calls():
+    return []
+
+
+@pytest.fixture
+def cache(tmp_path, fetch_calls):
+    import pandas as pd
+
+    from app.mkt_data.cache import BarCache
+
+    def fetch(ticker, start, end):
+        fetch_calls.append((ticker, start, end))
+        index = pd.bdate_range(start, end, inclusive="left", name="Date")
+        return pd.DataFrame(
+            {
+                "Close": [float(d.day) for d in index],
+                "Volume": [100.0] * len(index),
+            },
+            index=index,
+        )
+
+    return BarCache(tmp_path, fetch)
+
+
+def test_missing_ranges():
+    from app.mkt_data.cache import merge_ranges, missing_ranges
+
+    covered = merge_ranges(
+        [
+            (date(2024, 1, 10), date(2024, 1, 20)),
+            (date(2024, 1, 1), date(2024, 1, 5)),
+            (date(2024, 1, 5), date(2024, 1, 8)),
+        ],
+    )
+    assert covered == [
+        (date(2024, 1, 1), date(2024, 1, 8)),
+        (date(2024, 1, 10), date(2024, 1, 20)),
+    ]
+    assert missing_ranges(covered, date(2023, 12, 1), date(2024, 2, 1)) == [
+        (date(2023, 12, 1), date(2024, 1, 1)),
+        (date(2024, 1, 8), date(2024, 1, 10)),
+        (date(2024, 1, 20), date(2024, 2, 1)),
+    ]
+    assert missing_ranges(covered, date(2024, 1, 2), date(2024, 1, 7)) == []
+
+
+def test_bar_cache_fetches_only_gaps(cache, fetch_calls):
+    first = cache.get("aapl", "close", "2024-01-01", "2024-02-01")
+    assert len(first) == 23
+    assert first.name == "close"
+    assert fetch_calls == [("aapl", date(2024, 1, 1), date(2024, 2, 1))]
+
+    # Fully covered: no fetch, served from disk
+    again = cache.get("AAPL", "close", "2024-01-10", "2024-01-20")
+    assert len(fetch_calls) == 1
+    assert again.index.min().date() == date(2024, 1, 10)
+    assert again.index.max().date() == date(2024, 1, 19)
+
+    # Extending the range only fetches the new tail
+    longer = cache.get("AAPL", "close", "2024-01-01", "2024-02-08")
+    assert fetch_calls[-1] == ("AAPL", date(2024, 2, 1), date(2024, 2, 8))
+    assert len(longer) == 28
+    assert cache.coverage("AAPL", "close") == [(date(2024, 1, 1), date(2024, 2, 8))]
+
+
+def test_bar_cache_stores_all_fetched_fields(cache, fetch_calls):
+    cache.get("MSFT", "close", "2024-03-01", "2024-03-15")
+    volume = cache.get("MSFT", "volume", "2024-03-01", "2024-03-15")
+    assert len(fetch_calls) == 1
+    assert (volume == 100.0).all()
+
+
+def test_bar_cache_does_not_cover_empty_fetches(tmp_path):
+    import pandas as pd
+
+    from app.mkt_data.cache import BarCache
+
+    calls = []
+
+    def flaky_fetch(ticker, start, end):
+        # yfinance reports throttling and network errors as an empty frame
+        calls.append((start, end))
+        if len(calls) == 1:
+            return pd.DataFrame()
+        index = pd.bdate_range(start, end, inclusive="left", name="Date")
+        return pd.DataFrame({"Close": 1.0}, index=index)
+
+    cache = BarCache(tmp_path, flaky_fetch)
+    assert cache.get("IBM", "close", "2024-01-01", "2024-01-08").empty
+    assert cache.coverage("IBM", "close") == []
+
+    assert len(cache.get("IBM", "close", "2024-01-01", "2024-01-08")) == 5
+    assert calls == [(date(2024, 1, 1), date(2024, 1, 8))] * 2
+    assert cache.coverage("IBM", "close") == [(date(2024, 1, 1), date(2024, 1, 8))]
+
+    # An empty range needs no fetch and no file
+    assert cache.get("MSFT", "close", "2024-01-05", "2024-01-05").empty
+    assert len(calls) == 2
+
+
+def test_bar_cache_fills_holiday_only_gaps(tmp_path):
+    import pandas as pd
+
+    from app.mkt_data.cache import BarCache
+    from app.mkt_data.market_data import download_yfinance_bars, get_yfinance_data
+    from app.mkt_data.providers import use_provider
+
+    class HolidayProvider:
+        def get_bars(self, symbol, start_date=None, end_date=None):
+            index = pd.bdate_range(start_date, end_date, inclusive="left", name="Date")
+            index = index[index != pd.Timestamp("2024-12-25")]
+            return pd.DataFrame({"Close": 1.0}, index=index)
+
+    cache = BarCache(tmp_path, download_yfinance_bars)
+    with use_provider(HolidayProvider()):
+        assert (
+            len(get_yfinance_data("IBM", "2024-12-20", "2024-12-25", cache=cache)) == 3
+        )
+        # The only missing day is a holiday with no bars
+        close = get_yfinance_data("IBM", "2024-12-20", "2024-12-26", cache=cache)
+    assert len(close) == 3
@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def bars():
+    import pandas as pd
+
+    index = pd.bdate_range("2024-01-01", "2024-03-29")
+    return pd.DataFrame(
+        {"Close": np.arange(len(index), dtype=float), "Volume": 100.0},
+        index=index,
+    )
+
+
+@pytest.fixture
+def store(tmp_path):
+    from app.mkt_data.bar_store import BarStore
+
+    return BarStore(tmp_path)
+
+
+def test_append_and_read_views(store, bars):
+    assert store.append("AAPL", bars.iloc[:40]) == 40
+    assert store.append("AAPL", bars.iloc[30:]) == len(bars) - 40
+    assert store.symbols() == ["AAPL"]
+
+    columns = store.read("AAPL", "2024-01-08", "2024-01-13")
+    assert columns["date"].astype(str).tolist() == [
+        "2024-01-08",
+        "2024-01-09",
+        "2024-01-10",
+        "2024-01-11",
+        "2024-01-12",
+    ]
+    assert columns["close"].tolist() == [5.0, 6.0, 7.0, 8.0, 9.0]
+    assert isinstance(columns["close"].base, np.memmap)
+    assert not columns["close"].flags.writeable
+
+
+def test_appends_are_visible_to_other_readers(tmp_path, store, bars):
+    from app.mkt_data.bar_store import BarStore
+
+    reader = BarStore(tmp_path)
+    store.append("MSFT", bars.iloc[:10])
+    assert len(reader.read("MSFT")["close"]) == 10
+    store.append("MSFT", bars.iloc[10:20])
+    assert len(reader.read("MSFT")["close"]) == 20
+
+
+def test_interrupted_append_is_ignored_and_truncated(tmp_path, store, bars):
+    store.append("IBM", bars.iloc[:5])
+    with (tmp_path / "IBM" / "close.bin").open("ab") as f:
+        f.write(b"partial")
+    assert store.read("IBM")["close"].tolist() == [0.0, 1.0, 2.0, 3.0, 4.0]
+
+    store.append("IBM", bars.iloc[5:7])
+    assert store.read("IBM")["close"].tolist() == [0.0, 1.0, 2.0, 3.0, 4.0, 5.0, 6.0]
+
+
+def test_panel_aligns_symbols(store, bars):
+    store.append("AAPL", bars.iloc[:3])
+    store.append("MSFT", bars.iloc[1:4])
+    panel = store.panel(["AAPL", "MSFT"], "close")
+    assert panel.shape == (4, 2)
+    assert np.isnan(panel["MSFT"].iloc[0])
+    assert np.isnan(panel["AAPL"].iloc[-1])
+    assert panel["MSFT"].iloc[1:].tolist() == [1.0, 2.0, 3.0]
+
+
+def test_unknown_fields_are_rejected(store, bars):
+    store.append("AAPL", bars.iloc[:3])
+    with pytest.raises(ValueError, match="not stored"):
+        store.append("AAPL", bars.iloc[3:5].assign(Open=1.0))
+    with pytest.raises(KeyError):
+        store.read("AAPL", fields=["open"])
@@ -2,3 +2,41 @@ def test_config():
     from app import config
 
     assert config
+
+
+def test_import_is_side_effect_free(tmp_path):
+    import os
+    import subprocess
+    import sys
+
+    code = (
+        "import sys, app, app.common.utils, app.mkt_data.loader\n"
+        "assert 'app._config' not in sys.modules\n"
+        "assert 'yfinance' not in sys.modules\n"
+        "assert 'concurrent_log_handler' not in sys.modules\n"
+        "assert app.mkt_data.cache is sys.modules['app.mkt_data.cache']\n"
+    )
+    # No settings in the environment and no .env in the working directory
+    env = {k: v for k, v in os.environ.items() if k not in {"LOG_LEVEL", "LOG_DIR"}}
+    proc = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=tmp_path,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    assert proc.returncode == 0, proc.stderr
+
+
+def test_reports_dir_defaults_under_project_dir(tmp_path, monkeypatch):
+    from app._config import Config
+
+    monkeypatch.setenv("LOG_DIR", str(tmp_path))
+    monkeypatch.delenv("REPORTS_DIR", raising=False)
+    reports_dir = Config().REPORTS_DIR
+    assert reports_dir == tmp_path / "reports"
+
+    monkeypatch.setenv("REPORTS_DIR", str(tmp_path / "snapshots"))
+    reports_dir = Config().REPORTS_DIR
+    assert reports_dir == tmp_path / "snapshots"
@@ -0,0 +1,106 @@
+from datetime import date
+from io import StringIO
+
+import pytest
+
+SP500_HTML = """
+<html><body>
+<table>
+  <thead><tr>
+    <th>Symbol</th><th>Security</th><th>GICS Sector</th><th>GICS Sub-Industry</th>
+    <th>Headquarters Location</th><th>Date added</th><th>CIK</th><th>Founded</th>
+  </tr></thead>
+  <tbody>
+    <tr><td>AAPL</td><td>Apple Inc.</td><td>Information Technology</td>
+      <td>Technology Hardware</td><td>Cupertino, California</td><td>1982-11-30</td>
+      <td>320193</td><td>1977</td></tr>
+    <tr><td>MSFT</td><td>Microsoft</td><td>Information Technology</td>
+      <td>Systems Software</td><td>Redmond, Washington</td><td>1994-06-01</td>
+      <td>789019</td><td>1975</td></tr>
+    <tr><td>PLTR</td><td>Palantir Technologies</td><td>Information Technology</td>
+      <td>Application Software</td><td>Denver, Colorado</td><td>2024-09-23</td>
+      <td>1321655</td><td>2003</td></tr>
+  </tbody>
+</table>
+<table>
+  <thead>
+    <tr><th rowspan="2">Effective Date</th><th colspan="2">Added</th>
+      <th colspan="2">Removed</th><th rowspan="2">Reason</th></tr>
+    <tr><th>Ticker</th><th>Security</th><th>Ticker</th><th>Security</th></tr>
+  </thead>
+  <tbody>
+    <tr><td>September 23, 2024</td><td>PLTR</td><td>Palantir Technologies</td>
+      <td>AAL</td><td>American Airlines Group</td><td>Market cap change.</td></tr>
+    <tr><td>March 23, 2015</td><td>AAL</td><td>American Airlines Group</td>
+      <td>HSP</td><td>Hospira</td><td>Acquired.</td></tr>
+  </tbody>
+</table>
+</body></html>
+"""
+
+
+@pytest.fixture
+def store(tmp_path):
+    from app.common.database import DB
+    from app.mkt_data.constituents import ConstituentsStore
+
+    return ConstituentsStore(DB(f"sqlite:///{tmp_path / 'constituents.db'}"))
+
+
+def test_parse_from_fixture():
+    from app.mkt_data.constituents import parse_sp500_changes, parse_sp500_constituents
+
+    constituents = parse_sp500_constituents(StringIO(SP500_HTML))
+    assert constituents["symbol"].tolist() == ["AAPL", "MSFT", "PLTR"]
+    assert constituents["date_added"].iloc[0] == "1982-11-30"
+
+    changes = parse_sp500_changes(StringIO(SP500_HTML))
+    assert set(map(tuple, changes.to_numpy().tolist())) == {
+        ("PLTR", date(2024, 9, 23), "add"),
+        ("AAL", date(2015, 3, 23), "add"),
+        ("AAL", date(2024, 9, 23), "remove"),
+        ("HSP", date(2015, 3, 23), "remove"),
+    }
+
+
+def test_members_as_of(store):
+    from app.mkt_data.constituents import parse_sp500_changes, parse_sp500_constituents
+
+    store.record_changes(parse_sp500_changes(StringIO(SP500_HTML)))
+    added, removed = store.record_snapshot(
+        parse_sp500_constituents(StringIO(SP500_HTML)),
+        date(2025, 1, 2),
+    )
+    assert added == {"AAPL", "MSFT"}
+    assert removed == set()
+
+    index = store.index()
+    assert index.members_as_of(date(1990, 1, 1)) == {"AAPL", "HSP"}
+    assert index.members_as_of("2015-03-23") == {"AAPL", "MSFT", "AAL"}
+    assert index.members_as_of(date(2024, 9, 22)) == {"AAPL", "MSFT", "AAL"}
+    assert index.members_as_of(date(2024, 9, 23)) == {"AAPL", "MSFT", "PLTR"}
+
+    matrix = index.membership_matrix(["2010-01-04", "2020-01-02", "2025-01-02"])
+    assert matrix["HSP"].tolist() == [True, False, False]
+    assert matrix["AAL"].tolist() == [False, True, False]
+    assert matrix["PLTR"].tolist() == [False, False, True]
+
+
+def test_record_snapshot_stores_only_diffs(store):
+    import pandas as pd
+
+    store.record_snapshot(pd.DataFrame({"symbol": ["AAPL", "MSFT"]}), date(2025, 1, 2))
+    assert len(store.events()) == 2
+
+    # Unchanged snapshot writes nothing
+    store.record_snapshot(pd.DataFrame({"symbol": ["AAPL", "MSFT"]}), date(2025, 1, 3))
+    assert len(store.events()) == 2
+
+    added, removed = store.record_snapshot(
+        pd.DataFrame({"symbol": ["AAPL", "NVDA"]}),
+        date(2025, 1, 6),
+    )
+    assert (added, removed) == ({"NVDA"}, {"MSFT"})
+    assert len(store.events()) == 4
+    assert store.index().members_as_of(date(2025, 1, 3)) == {"AAPL", "MSFT"}
+    assert store.index().current_members() == {"AAPL", "NVDA"}
@@ -0,0 +1,136 @@
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def engine(tmp_path):
+    import pandas as pd
+
+    from app.common.database import DB
+    from app.mkt_data.bar_store import BarStore
+    from app.mkt_data.corporate_actions import AdjustmentEngine, CorporateActionsStore
+
+    bars = BarStore(tmp_path / "bars")
+    index = pd.bdate_range("2024-01-01", periods=6)
+    bars.append(
+        "AAPL",
+        pd.DataFrame(
+            {
+                "close": [100.0, 100.0, 25.0, 25.0, 20.0, 20.0],
+                "volume": [10.0, 10.0, 40.0, 40.0, 40.0, 40.0],
+            },
+            index=index,
+        ),
+    )
+    actions = CorporateActionsStore(DB(f"sqlite:///{tmp_path / 'actions.db'}"))
+    return AdjustmentEngine(bars, actions)
+
+
+def test_adjustment_factors():
+    import pandas as pd
+
+    from app.mkt_data.corporate_actions import adjustment_factors
+
+    dates = np.array(["2024-01-01", "2024-01-02", "2024-01-03"], dtype="datetime64[D]")
+    close = np.array([50.0, 40.0, 40.0])
+    actions = pd.DataFrame(
+        {
+            "ex_date": ["2024-01-02", "2024-01-03", "2023-12-01"],
+            "action": ["split", "dividend", "split"],
+            "value": [2.0, 4.0, 10.0],
+        },
+    )
+    price, volume = adjustment_factors(dates, close, actions)
+    np.testing.assert_allclose(price, [0.5 * 0.9, 0.9, 1.0])
+    np.testing.assert_allclose(volume, [2.0, 1.0, 1.0])
+
+
+def test_new_action_changes_factors_not_history(engine):
+    import pandas as pd
+
+    raw_before = engine.bars.read("AAPL")["close"].copy()
+    np.testing.assert_allclose(engine.read("AAPL")["close"], raw_before)
+
+    engine.actions.add(
+        pd.DataFrame(
+            {
+                "symbol": ["aapl"],
+                "ex_date": ["2024-01-03"],
+                "action": ["split"],
+                "value": [4.0],
+            },
+        ),
+    )
+    adjusted = engine.read("AAPL")
+    np.testing.assert_allclose(adjusted["close"], [25.0, 25.0, 25.0, 25.0, 20.0, 20.0])
+    np.testing.assert_allclose(adjusted["volume"], [40.0] * 6)
+    np.testing.assert_array_equal(engine.bars.read("AAPL")["close"], raw_before)
+
+    engine.actions.add(
+        pd.DataFrame(
+            {
+                "symbol": ["AAPL"],
+                "ex_date": ["2024-01-05"],
+                "action": ["dividend"],
+                "value": [5.0],
+            },
+        ),
+    )
+    sliced = engine.read("AAPL", "2024-01-02", "2024-01-05", ["close"])
+    np.testing.assert_allclose(sliced["close"], [20.0, 20.0, 20.0])
+
+
+def test_factors_are_cached_until_inputs_change(engine):
+    first = engine.factors("AAPL")
+    assert engine.factors("AAPL")[0] is first[0]
+
+
+def test_adjusted_panel(engine):
+    import pandas as pd
+
+    engine.actions.add(
+        pd.DataFrame(
+            {
+                "symbol": ["AAPL"],
+                "ex_date": ["2024-01-03"],
+                "action": ["split"],
+                "value": [4.0],
+            },
+        ),
+    )
+    panel = engine.panel(["AAPL"], "close", "2024-01-01", "2024-01-04")
+    assert panel["AAPL"].tolist() == [25.0, 25.0, 25.0]
+
+
+def test_panel_loads_actions_in_one_query(engine, monkeypatch):
+    import pandas as pd
+
+    engine.bars.append(
+        "MSFT",
+        pd.DataFrame(
+            {"close": [10.0, 11.0]},
+            index=pd.bdate_range("2024-01-04", periods=2),
+        ),
+    )
+    engine.actions.add(
+        pd.DataFrame(
+            {
+                "symbol": ["AAPL", "MSFT"],
+                "ex_date": ["2024-01-03", "2024-01-05"],
+                "action": ["split", "split"],
+                "value": [4.0, 2.0],
+            },
+        ),
+    )
+    actions = engine.actions.get_many(["AAPL", "msft", "IBM"])
+    pd.testing.assert_frame_equal(actions["AAPL"], engine.actions.get("AAPL"))
+    assert actions["msft"]["value"].tolist() == [2.0]
+    assert actions["IBM"].empty
+
+    def no_single_reads(symbol):
+        raise AssertionError(symbol)
+
+    monkeypatch.setattr(engine.actions, "get", no_single_reads)
+    panel = engine.panel(["AAPL", "MSFT"], "close", "2024-01-02", "2024-01-06")
+    assert panel["AAPL"].tolist() == [25.0, 25.0, 25.0, 20.0]
+    assert panel["MSFT"].dropna().tolist() == [5.0, 11.0]
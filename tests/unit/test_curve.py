@@ -0,0 +1,110 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+POINTS = pd.DataFrame(
+    {
+        "instrument": ["deposit", "deposit", "deposit", "par", "par", "par", "par"],
+        "tenor": [0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0],
+        "rate": [0.052, 0.051, 0.049, 0.045, 0.041, 0.042, 0.045],
+    },
+)
+
+
+def test_bootstrap_reprices_points():
+    from app.options.curve import YieldCurve, bootstrap_zero_rates
+
+    zeros = bootstrap_zero_rates(POINTS)
+    assert zeros.loc[0.5] == pytest.approx(np.log1p(0.051 * 0.5) / 0.5)
+
+    curve = YieldCurve(zeros.index, zeros.to_numpy(), "linear")
+    coupons = 10.0 - np.arange(20) / 2
+    price = 0.042 / 2 * curve.discount(coupons).sum() + curve.discount(10.0)
+    assert price == pytest.approx(1.0, abs=1e-6)
+
+
+def test_monotone_convex_curve_matches_nodes_with_positive_forwards():
+    from app.options.curve import YieldCurve, bootstrap_zero_rates
+
+    zeros = bootstrap_zero_rates(POINTS)
+    curve = YieldCurve(zeros.index, zeros.to_numpy())
+
+    np.testing.assert_allclose(
+        curve.zero_rate(zeros.index.to_numpy()),
+        zeros.to_numpy(),
+        atol=1e-6,
+    )
+    t = np.linspace(0.01, 30, 2000)
+    forwards = -np.gradient(np.log(curve.discount(t)), t)
+    assert (forwards > 0).all()
+    assert curve.zero_rate(0.0) == pytest.approx(curve.zero_rate(0.001))
+    assert curve.zero_rate(40.0) == pytest.approx(zeros.iloc[-1])
+    assert curve.discount(0.0) == 1.0
+
+
+@pytest.mark.parametrize("method", ["linear", "monotone_convex"])
+def test_curve_with_tenors_shorter_than_grid_step(method):
+    from app.options.curve import YieldCurve
+
+    flat = YieldCurve([0.001], [0.03], method)
+    t = np.array([0.0, 0.0005, 0.001, 0.002, 0.5])
+    np.testing.assert_allclose(flat.zero_rate(t), 0.03)
+    np.testing.assert_allclose(flat.discount(t), np.exp(-0.03 * t))
+
+    # Continuous across the first grid step
+    curve = YieldCurve([0.001, 1.0], [0.03, 0.04], method)
+    step = curve.grid_step
+    assert curve.zero_rate(0.001) == pytest.approx(0.03)
+    assert curve.zero_rate(step * (1 - 1e-9)) == pytest.approx(curve.zero_rate(step))
+
+
+def test_yield_curves_cache_per_as_of_date(tmp_path):
+    from app.common.database import DB
+    from app.options.curve import YieldCurves
+
+    curves = YieldCurves(DB(f"sqlite:///{tmp_path / 'rates.db'}"))
+    curves.add(POINTS.assign(as_of="2024-06-28"))
+
+    curve = curves.get("2024-06-28")
+    assert curves.get("2024-06-28") is curve
+    assert curves.get("2024-06-28", "linear") is not curve
+
+    curves.add(
+        pd.DataFrame(
+            {"as_of": ["2024-06-28"], "instrument": ["deposit"], "tenor": [0.25]},
+        ).assign(rate=0.06),
+    )
+    rebuilt = curves.get("2024-06-28")
+    assert rebuilt is not curve
+    assert rebuilt.zero_rate(0.25) == pytest.approx(
+        np.log1p(0.06 * 0.25) / 0.25,
+        abs=1e-5,
+    )
+
+    with pytest.raises(KeyError):
+        curves.get("2024-07-01")
+
+
+def test_value_at_risk_accepts_a_curve():
+    from app.options.curve import YieldCurve
+    from app.risk.var import Scenarios, value_at_risk
+
+    book = pd.DataFrame(
+        {
+            "underlier": ["AAA", "AAA"],
+            "option_type": ["call", "put"],
+            "strike": [100.0, 95.0],
+            "time_to_expiry": [0.5, 1.5],
+            "sigma": [0.2, 0.3],
+            "quantity": [1, 2],
+        },
+    )
+    shocks = np.array([[-0.05], [0.0], [0.03]])
+    scenarios = Scenarios(["AAA"], shocks, np.zeros_like(shocks))
+    spot = pd.Series({"AAA": 100.0})
+
+    flat = YieldCurve([1.0, 2.0], [0.03, 0.03])
+    np.testing.assert_allclose(
+        value_at_risk(book, spot, scenarios, rate=flat).pnl,
+        value_at_risk(book, spot, scenarios, rate=0.03).pnl,
+    )
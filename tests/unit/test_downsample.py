@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+
+
+def reference_lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> list[int]:
+    """Straightforward LTTB with the same bucket edges as `app.ui.downsample`."""
+    n = len(y)
+    every = (n - 2) / (n_out - 2)
+    out, a = [0], 0
+    for i in range(n_out - 2):
+        lo, hi = int(i * every) + 1, int((i + 1) * every) + 1
+        # The next bucket; only the last point after the last bucket
+        nxt = slice(hi, int((i + 2) * every) + 1)
+        cx, cy = x[nxt].mean(), y[nxt].mean()
+        best, best_area = lo, -1.0
+        for j in range(lo, hi):
+            area = abs((x[a] - cx) * (y[j] - y[a]) - (x[a] - x[j]) * (cy - y[a]))
+            if area > best_area:
+                best, best_area = j, area
+        out.append(best)
+        a = best
+    out.append(n - 1)
+    return out
+
+
+@pytest.fixture
+def series():
+    rng = np.random.default_rng(7)
+    n = 100_000
+    x = np.datetime64("2020-01-01T00:00") + np.arange(n).astype("timedelta64[m]")
+    y = rng.standard_normal(n).cumsum()
+    # Spikes one-point wide that a stride would miss
+    y[[12_345, 67_890]] = [1e3, -1e3]
+    return x, y
+
+
+def test_lttb_matches_reference():
+    from app.ui.downsample import lttb
+
+    rng = np.random.default_rng(0)
+    x = np.cumsum(rng.uniform(0.5, 1.5, 1_003))
+    y = rng.standard_normal(1_003).cumsum()
+
+    idx = lttb(x, y, 50)
+    assert len(idx) == 50
+    assert idx.tolist() == reference_lttb(x - x[0], y, 50)
+
+
+def test_minmax_keeps_extremes(series):
+    from app.ui.downsample import downsample, minmax
+
+    x, y = series
+    idx = minmax(x, y, 500)
+    assert np.all(np.diff(idx) > 0)
+    assert {0, len(y) - 1, 12_345, 67_890} <= set(idx.tolist())
+    assert len(idx) <= 2 * 500 + 2
+
+    # NaN values are skipped rather than returned
+    y = y.copy()
+    y[::3] = np.nan
+    idx = downsample(x, y, 500, "minmax_lttb")
+    assert len(idx) == 500
+    assert not np.isnan(y[idx]).any()
+
+    with pytest.raises(ValueError, match="Unknown downsampling method"):
+        downsample(x, y, 500, "stride")  # type: ignore[arg-type]
+
+
+def test_pyramid_reads_coarse_levels_and_refines_on_zoom(series):
+    from app.ui.downsample import SeriesPyramid
+
+    x, y = series
+    pyramid = SeriesPyramid(x, y, factor=4, min_points=1_000, oversample=4)
+
+    full = pyramid.query(100, method="minmax")
+    assert {12_345, 67_890} <= set(full.tolist())
+    # The whole range reads the coarsest level with 4 points per pixel
+    assert 1 < len(pyramid._levels) < 4
+    assert np.all(np.diff(pyramid.level(1)) > 0)
+
+    # A range narrow enough to draw from level 0 returns its own points
+    zoomed = pyramid.query(100, (x[50_000], x[50_099]))
+    assert zoomed.tolist() == list(range(50_000, 50_100))
+    mid = pyramid.query(100, (x[60_000], x[70_000]), method="minmax")
+    assert x[mid[0]] >= x[60_000]
+    assert x[mid[-1]] <= x[70_000]
+    assert 67_890 in mid.tolist()
@@ -0,0 +1,120 @@
+import email
+import os
+import socket
+from email import policy
+
+import pytest
+
+
+class Recorder:
+    def __init__(self):
+        self.messages = []
+        self.sessions = 0
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):  # noqa: N802
+        self.sessions += 1
+        session.host_name = hostname
+        return responses
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):  # noqa: N802
+        if address.startswith("nobody@"):
+            return "550 no such user"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):  # noqa: N802
+        if b"Subject: Rejected" in envelope.original_content:
+            return "554 rejected"
+        self.messages.append((envelope.rcpt_tos, envelope.original_content))
+        return "250 OK"
+
+
+@pytest.fixture
+def smtp_server():
+    from aiosmtpd.controller import Controller
+
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    recorder = Recorder()
+    controller = Controller(recorder, hostname="127.0.0.1", port=port)
+    controller.start()
+    yield recorder, "127.0.0.1", port
+    controller.stop()
+
+
+def test_send_streams_attachments(smtp_server, tmp_path):
+    from app.common.email_sender import SMTPPool, email_send_message
+
+    recorder, host, port = smtp_server
+    payload = os.urandom(3_000_001)
+    attachment = tmp_path / "report.bin"
+    attachment.write_bytes(payload)
+
+    pool = SMTPPool(host, port)
+    message = email_send_message(
+        subject="Report",
+        msg="<p>" + "x" * 10_000 + "</p>",
+        email_from="sender@example.com",
+        email_to=["a@example.com", "b@example.com"],
+        msg_plain="line one\n.leading dot\n",
+        email_to_bcc="hidden@example.com",
+        attachments=attachment,
+        pool=pool,
+    )
+    pool.close()
+    # Bcc is stripped from what is sent, not from the caller's message
+    assert message["Bcc"] == "hidden@example.com"
+
+    rcpt_tos, raw = recorder.messages[0]
+    assert rcpt_tos == ["a@example.com", "b@example.com", "hidden@example.com"]
+    received = email.message_from_bytes(raw, policy=policy.default)
+    assert "Bcc" not in received
+    parts = list(received.iter_parts())
+    assert parts[0].get_content() == "line one\n.leading dot\n"
+    assert parts[2].get_filename() == "report.bin"
+    assert parts[2].get_payload(decode=True) == payload
+
+
+def test_send_bulk_reuses_one_session(smtp_server):
+    from app.common.email_sender import Email, SMTPPool
+
+    recorder, host, port = smtp_server
+    pool = SMTPPool(host, port)
+    emails = [
+        Email(
+            subject="Rejected" if i == 9 else f"Digest {i}",
+            msg=f"<p>{i}</p>",
+            email_from="sender@example.com",
+            email_to="nobody@example.com" if i == 7 else f"user{i}@example.com",
+        )
+        for i in range(200)
+    ]
+    result = pool.send_bulk(emails)
+    assert result.sent == 198
+    assert list(result.errors) == [7, 9]
+    assert result.messages_per_sec > 0
+
+    pool.send(emails[0])
+    pool.close()
+    assert len(recorder.messages) == 199
+    assert recorder.sessions == 1
+
+
+def test_failed_send_closes_session(smtp_server):
+    import smtplib
+
+    from app.common.email_sender import Email, SMTPPool
+
+    recorder, host, port = smtp_server
+    pool = SMTPPool(host, port, size=1)
+    rejected = Email("Rejected", "<p>x</p>", "sender@example.com", "a@example.com")
+    with pytest.raises(smtplib.SMTPDataError):
+        pool.send(rejected)
+    assert pool._idle.empty()
+
+    pool.send(Email("Digest", "<p>x</p>", "sender@example.com", "a@example.com"))
+    assert pool._idle.qsize() == 1
+    pool.close()
+    assert len(recorder.messages) == 1
+    assert recorder.sessions == 2
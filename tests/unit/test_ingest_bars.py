@@ -0,0 +1,129 @@
+from datetime import date
+
+import pytest
+
+
+@pytest.fixture(scope="module")
+def prefect_harness():
+    from prefect.logging.handlers import APILogHandler
+    from prefect.testing.utilities import prefect_test_harness
+
+    from app import log
+    from app.flows import notifications
+
+    # State hooks deliver digests to a list instead of the SMTP relay
+    sent = []
+    dispatcher = notifications.NotificationDispatcher(lambda s, b: sent.append(s))
+    previous, notifications._dispatcher = notifications._dispatcher, dispatcher
+    with prefect_test_harness():
+        yield sent
+    dispatcher.close()
+    notifications._dispatcher = previous
+    # Prefect attaches its API handler to the app logger (extra_loggers), which
+    # warns on every log call made outside a flow by later tests
+    log.handlers[:] = [h for h in log.handlers if not isinstance(h, APILogHandler)]
+
+
+class FlakyProvider:
+    def __init__(self, failing):
+        self.failing = set(failing)
+        self.calls = []
+        self.starts = []
+
+    def get_bars(self, symbol, start_date=None, end_date=None):
+        import pandas as pd
+
+        self.calls.append(symbol)
+        self.starts.append(start_date)
+        if symbol in self.failing:
+            msg = f"no data for {symbol}"
+            raise ValueError(msg)
+        index = pd.bdate_range(start_date, end_date, inclusive="left")
+        return pd.DataFrame(
+            {"open": 1.0, "high": 2.0, "low": 0.5, "close": 1.5, "volume": 100},
+            index=index,
+        )
+
+
+def test_rerun_only_fetches_failed_symbols(prefect_harness, tmp_path):
+    from app.common.database import DB
+    from app.flows.ingest_bars import ingest_bars_flow
+    from app.mkt_data.providers import use_provider
+
+    db_url = f"sqlite:///{tmp_path / 'bars.db'}"
+    params = {
+        "symbols": ["aaa", "BBB", "CCC"],
+        "start_date": date(2024, 1, 1),
+        "end_date": date(2024, 1, 8),
+        "db_url": db_url,
+        "staging_dir": str(tmp_path / "staging"),
+        "max_retries": 1,
+        "backoff": 0,
+    }
+
+    provider = FlakyProvider(failing=["CCC"])
+    with use_provider(provider), pytest.raises(RuntimeError, match="CCC"):
+        ingest_bars_flow(**params)
+    assert sorted(provider.calls) == ["AAA", "BBB", "CCC", "CCC"]
+    db = DB(db_url)
+    assert db.fetch_one("SELECT COUNT(*) AS n FROM daily_bars").n == 10
+
+    provider = FlakyProvider(failing=[])
+    with use_provider(provider):
+        assert ingest_bars_flow(**params) == 15
+    assert provider.calls == ["CCC"]
+
+    # A removed staged file is refetched instead of served from the cache
+    (tmp_path / "staging" / "yfinance-1" / "BBB_2024-01-01_2024-01-08.arrow").unlink()
+    with use_provider(provider):
+        assert ingest_bars_flow(**params) == 15
+    assert provider.calls == ["CCC", "BBB"]
+    rows = db.fetch_all("SELECT symbol, COUNT(*) AS n FROM daily_bars GROUP BY symbol")
+    assert {row.symbol: row.n for row in rows} == {"AAA": 5, "BBB": 5, "CCC": 5}
+
+    # Task states are coalesced into one digest per flow run
+    from app.flows import notifications
+
+    assert notifications._dispatcher.flush(timeout=5)
+    assert len(prefect_harness) == 3
+    assert prefect_harness[0].endswith("Failed: 3 tasks, 1 failed")
+
+
+def test_scheduled_run_only_fetches_new_days(prefect_harness, tmp_path):
+    from app.common.database import DB
+    from app.flows.ingest_bars import ingest_bars_flow
+    from app.mkt_data.providers import use_provider
+
+    db_url = f"sqlite:///{tmp_path / 'bars.db'}"
+    params = {
+        "db_url": db_url,
+        "staging_dir": str(tmp_path / "staging"),
+        "max_retries": 0,
+        "overlap_days": 2,
+    }
+    with use_provider(FlakyProvider(failing=[])):
+        ingest_bars_flow(["AAA"], date(2024, 1, 1), date(2024, 1, 8), **params)
+
+    # No start date: AAA resumes from its last stored bar, Friday 2024-01-05,
+    # less the overlap; BBB has no bars and gets its full history
+    provider = FlakyProvider(failing=[])
+    with use_provider(provider):
+        ingest_bars_flow(["AAA", "BBB"], end_date=date(2024, 1, 12), **params)
+    starts = dict(zip(provider.calls, provider.starts, strict=True))
+    assert starts == {"AAA": date(2024, 1, 4), "BBB": date(1970, 1, 1)}
+
+    rows = DB(db_url).fetch_all(
+        "SELECT symbol, MIN(date) AS first, MAX(date) AS last "
+        "FROM daily_bars GROUP BY symbol",
+    )
+    assert {row.symbol: str(row.last) for row in rows} == {
+        "AAA": "2024-01-11",
+        "BBB": "2024-01-11",
+    }
+    assert str(next(row.first for row in rows if row.symbol == "AAA")) == "2024-01-01"
+
+    # Up to date: only the overlap is fetched again
+    provider = FlakyProvider(failing=[])
+    with use_provider(provider):
+        assert ingest_bars_flow(["AAA"], end_date=date(2024, 1, 12), **params) > 0
+    assert provider.starts == [date(2024, 1, 10)]
@@ -0,0 +1,81 @@
+import time
+
+import pytest
+
+
+def slow_square(x: int, steps: int = 5, delay: float = 0.05) -> int:
+    from app.ui.jobs import report_progress
+
+    for i in range(steps):
+        report_progress(i / steps, f"step {i}")
+        time.sleep(delay)
+    return x * x
+
+
+def fail(x: int) -> int:
+    msg = f"bad input {x}"
+    raise ValueError(msg)
+
+
+@pytest.fixture(scope="module")
+def executor():
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        yield executor
+
+
+@pytest.fixture
+def manager(executor):
+    from app.ui.jobs import JobManager
+
+    manager = JobManager(executor, max_results=2)
+    yield manager
+    manager.shutdown()
+
+
+def test_jobs_are_deduplicated_and_shared(manager):
+    job = manager.submit(slow_square, 3)
+    assert manager.submit(slow_square, 3) is job
+    assert manager.submit(slow_square, x=3) is not job
+    assert job.result(timeout=10) == 9
+    assert job.status == "done"
+    assert job.progress[0] == 1.0
+    # A finished job is reused until evicted
+    assert manager.submit(slow_square, 3) is job
+    assert manager.get(job.key) is job
+
+
+def test_progress_and_cancel(manager):
+    from app.ui.jobs import JobCancelled
+
+    job = manager.submit(slow_square, 4, steps=200)
+    deadline = time.monotonic() + 10
+    while job.progress[0] == 0.0 and time.monotonic() < deadline:
+        time.sleep(0.02)
+    fraction, message = job.progress
+    assert 0 < fraction < 1
+    assert message.startswith("step")
+
+    assert job.cancel()
+    with pytest.raises(JobCancelled):
+        job.result(timeout=10)
+    assert job.status == "cancelled"
+    # Cancelled jobs are not cached; the same inputs run again
+    retry = manager.submit(slow_square, 4, steps=200)
+    assert retry is not job
+    retry.cancel()
+
+
+def test_results_are_bounded_and_failures_not_cached(manager):
+    jobs = [manager.submit(slow_square, x, steps=1, delay=0) for x in range(3)]
+    assert [job.result(timeout=10) for job in jobs] == [0, 1, 4]
+    time.sleep(0.1)  # done callbacks run on the executor's thread
+    assert manager.get(jobs[0].key) is None
+    assert manager.submit(slow_square, 2, steps=1, delay=0) is jobs[2]
+
+    failed = manager.submit(fail, 1)
+    with pytest.raises(ValueError, match="bad input"):
+        failed.result(timeout=10)
+    assert failed.status == "failed"
+    assert manager.submit(fail, 1) is not failed
@@ -6,3 +6,68 @@ def test_logger():
     log.warning("Warning")
     log.error("Error")
     log.critical("Critical")
+
+
+def test_logger_uses_queue_listener():
+    from app import get_logger, log
+    from app._logger import DeferredQueueHandler, setup_logging
+
+    handler = setup_logging()
+    assert setup_logging() is handler
+    assert isinstance(handler, DeferredQueueHandler)
+    # Looked up on the logger: Prefect's own dictConfig clears the handler names
+    assert log.handlers == [handler]
+    assert handler.listener is not None
+    assert handler.listener._thread is not None
+
+    module_log = get_logger("app.some_module")
+    assert module_log.handlers == []
+    assert module_log.getEffectiveLevel() == log.level
+
+
+def test_queue_handler_defers_formatting():
+    import logging
+    import queue
+
+    from app._logger import DeferredQueueHandler
+
+    q: queue.SimpleQueue = queue.SimpleQueue()
+    handler = DeferredQueueHandler(q)
+    record = logging.LogRecord("app", logging.INFO, "", 0, "%s=%s", ("a", [1]), None)
+    handler.handle(record)
+
+    queued = q.get_nowait()
+    assert queued is record
+    assert queued.msg == "%s=%s"
+    assert queued.args == ("a", [1])
+
+
+def test_json_formatter():
+    import json
+    import logging
+
+    from app._logger import JsonFormatter
+
+    record = logging.LogRecord("app.x", logging.WARNING, "", 0, "%d rows", (3,), None)
+    record.symbol = "AAPL"
+    payload = json.loads(JsonFormatter().format(record))
+
+    assert payload["level"] == "WARNING"
+    assert payload["logger"] == "app.x"
+    assert payload["message"] == "3 rows"
+    assert payload["symbol"] == "AAPL"
+
+
+def test_set_levels():
+    import logging
+
+    from app import get_logger
+    from app._logger import set_levels
+
+    module_log = get_logger("app.noisy_module")
+    try:
+        set_levels({"app.noisy_module": "error"})
+        assert module_log.level == logging.ERROR
+        assert not module_log.isEnabledFor(logging.WARNING)
+    finally:
+        module_log.setLevel(logging.NOTSET)
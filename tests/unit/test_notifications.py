@@ -0,0 +1,98 @@
+import threading
+import time
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+from uuid import uuid4
+
+
+def _event(run_id, task_name, state="Completed", duration=1.0, message=None):
+    from app.flows.notifications import StateEvent
+
+    return StateEvent(
+        flow_run_id=run_id,
+        flow_name="ingest",
+        state=state,
+        timestamp=datetime.now(UTC),
+        task_name=task_name,
+        duration=duration,
+        message=message,
+    )
+
+
+def test_dispatcher_sends_one_digest_per_flow_run():
+    from app.flows.notifications import NotificationDispatcher
+
+    sent = []
+    release = threading.Event()
+
+    def send(subject, body):
+        release.wait()
+        sent.append((subject, body))
+
+    dispatcher = NotificationDispatcher(send)
+    start = time.perf_counter()
+    for i in range(500):
+        state = "Failed" if i % 100 == 0 else "Completed"
+        dispatcher.put(_event("run-1", f"fetch-{i}", state, duration=i / 100))
+    dispatcher.put(_event("run-2", "other"))
+    dispatcher.put(_event("run-1", None, "Failed", message="5 symbols failed"))
+    assert time.perf_counter() - start < 0.5
+
+    release.set()
+    assert dispatcher.flush(timeout=5)
+    dispatcher.close()
+    assert len(sent) == 2
+    subject, body = sent[0]
+    assert subject == "Flow ingest run run-1 Failed: 500 tasks, 5 failed"
+    assert "Completed: 495" in body
+    assert body.index("fetch-499: 5.0s") < body.index("fetch-498: 5.0s")
+    assert "5 symbols failed" in body
+    assert sent[1][0].startswith("Flow ingest run run-2 Running: 1 tasks")
+
+
+def test_dispatcher_retries_and_flushes_idle_runs():
+    from app.flows.notifications import NotificationDispatcher
+
+    attempts = []
+
+    def flaky_send(subject, body):
+        attempts.append(subject)
+        if len(attempts) < 3:
+            msg = "SMTP unavailable"
+            raise ConnectionError(msg)
+
+    dispatcher = NotificationDispatcher(flaky_send, idle_timeout=0.05, backoff=0)
+    dispatcher.put(_event("run-1", "fetch-AAA"))
+    deadline = time.monotonic() + 5
+    while dispatcher.delivered == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    dispatcher.close()
+    assert dispatcher.delivered == 1
+    assert len(attempts) == 3
+
+
+def test_state_hooks_only_queue_events(monkeypatch):
+    from app.flows import flow_utils, notifications
+
+    sent = []
+    dispatcher = notifications.NotificationDispatcher(lambda s, b: sent.append(s))
+    monkeypatch.setattr(notifications, "_dispatcher", dispatcher)
+    monkeypatch.setattr(flow_utils, "send_email", lambda s, b: sent.append(s))
+
+    run_id = uuid4()
+    now = datetime.now(UTC)
+    state = SimpleNamespace(name="Completed", timestamp=now, message=None)
+    task_run = SimpleNamespace(
+        flow_run_id=run_id,
+        name="fetch-AAA",
+        start_time=now - timedelta(seconds=2),
+    )
+    flow_utils.task_state_hook(SimpleNamespace(name="fetch"), task_run, state)
+    flow_utils.flow_state_hook(
+        SimpleNamespace(name="ingest"),
+        SimpleNamespace(id=run_id),
+        state,
+    )
+    assert dispatcher.flush(timeout=5)
+    dispatcher.close()
+    assert sent == [f"Flow ingest run {run_id} Completed: 1 tasks, 0 failed"]
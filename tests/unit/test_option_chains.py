@@ -0,0 +1,73 @@
+from datetime import UTC, datetime
+
+import pandas as pd
+
+
+class FakeBackend:
+    def __init__(self):
+        self.calls = []
+
+    def expiries(self, underlier):
+        if underlier == "BAD":
+            msg = "no options"
+            raise ValueError(msg)
+        return ["2025-01-17", "2025-02-21"]
+
+    def chain(self, underlier, expiry):
+        self.calls.append((underlier, expiry))
+        if expiry == "2025-02-21" and underlier == "MSFT":
+            msg = "timeout"
+            raise TimeoutError(msg)
+        calls = pd.DataFrame(
+            {
+                "contractSymbol": ["C1", "C2"],
+                "strike": [100.0, 105.0],
+                "lastPrice": [5.0, 2.5],
+                "bid": [4.9, 2.4],
+                "ask": [5.1, 2.6],
+                "volume": [10.0, float("nan")],
+                "openInterest": [100, 50],
+                "impliedVolatility": [0.2, 0.22],
+            },
+        )
+        puts = calls.assign(lastPrice=[1.0, 3.0])
+        return calls, puts
+
+
+def test_ingest_and_load_option_chains(tmp_path):
+    from app.common.database import DB
+    from app.mkt_data.option_chains import OPTION_CHAIN_SCHEMA, OptionChainStore
+
+    store = OptionChainStore(DB(f"sqlite:///{tmp_path / 'chains.db'}"))
+    backend = FakeBackend()
+    first = datetime(2024, 6, 28, 15, 0, tzinfo=UTC)
+    second = datetime(2024, 6, 28, 16, 0, tzinfo=UTC)
+
+    result = store.ingest(
+        ["aapl", "MSFT", "BAD"],
+        backend=backend,
+        rate_per_sec=None,
+        max_retries=1,
+        backoff=0,
+        clock=lambda: first,
+    )
+    assert result.table.schema == OPTION_CHAIN_SCHEMA
+    assert result.table.num_rows == 12
+    assert set(result.errors) == {"BAD", "MSFT 2025-02-21"}
+    assert backend.calls.count(("MSFT", "2025-02-21")) == 2
+
+    store.ingest(["AAPL"], backend=backend, rate_per_sec=None, clock=lambda: second)
+    assert store.snapshots("aapl") == [first, second]
+
+    latest = store.load("AAPL")
+    assert latest.schema == OPTION_CHAIN_SCHEMA
+    assert latest.num_rows == 8
+    assert set(latest["snapshot"].to_pylist()) == {second}
+
+    earlier = store.load("MSFT", first).to_pandas()
+    assert len(earlier) == 4
+    assert earlier["option_type"].tolist() == ["call", "call", "put", "put"]
+    assert earlier["last"].tolist() == [5.0, 2.5, 1.0, 3.0]
+    assert earlier["volume"].isna().tolist() == [False, True, False, True]
+
+    assert store.load("NONE").num_rows == 0
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def returns():
+    import pandas as pd
+
+    rng = np.random.default_rng(7)
+    factor = rng.normal(0, 0.01, (250, 1))
+    data = factor @ rng.normal(1, 0.3, (1, 8)) + rng.normal(0.0005, 0.01, (250, 8))
+    return pd.DataFrame(data, columns=[f"S{i}" for i in range(8)])
+
+
+def test_incremental_moments_match_batch_estimates(returns):
+    from sklearn.covariance import ledoit_wolf
+
+    from app.portfolio.estimators import IncrementalMoments
+
+    x = returns.to_numpy()
+    moments = IncrementalMoments(x.shape[1], half_life=20)
+    for block in np.array_split(x, 9):
+        moments.update(block)
+
+    sample = moments.moments("sample")
+    np.testing.assert_allclose(sample.mu, x.mean(axis=0))
+    np.testing.assert_allclose(sample.covariance, np.cov(x.T))
+
+    subset = [1, 4, 6]
+    expected, intensity = ledoit_wolf(x[:, subset])
+    shrunk = moments.moments("shrinkage", subset)
+    np.testing.assert_allclose(shrunk.covariance, expected)
+    assert shrunk.shrinkage == pytest.approx(intensity)
+
+    ewm = returns.ewm(halflife=20, adjust=False)
+    ewma = moments.moments("ewma")
+    np.testing.assert_allclose(ewma.mu, ewm.mean().iloc[-1])
+    np.testing.assert_allclose(ewma.covariance, ewm.cov(bias=True).loc[len(x) - 1])
+
+
+def test_portfolio_service_caches_until_update(returns):
+    from skfolio.optimization import ObjectiveFunction
+
+    from app.portfolio.optimizer import PortfolioService
+
+    service = PortfolioService(list(returns.columns), window=60)
+    service.update(returns.iloc[:-1])
+
+    result = service.optimize(max_weight=0.3)
+    assert result.weights.sum() == pytest.approx(1.0)
+    assert result.weights.max() <= 0.3 + 1e-6
+    assert result.observations == len(returns) - 1
+    assert service.optimize(max_weight=0.3) is result
+
+    service.update(returns.iloc[-1:])
+    updated = service.optimize(max_weight=0.3)
+    assert updated is not result
+    assert updated.observations == len(returns)
+
+    subset = service.optimize(
+        ["S0", "S3", "S5"],
+        estimator="ewma",
+        objective=ObjectiveFunction.MAXIMIZE_UTILITY,
+    )
+    assert list(subset.weights.index) == ["S0", "S3", "S5"]
+    assert subset.weights.sum() == pytest.approx(1.0)
+
+    with pytest.raises(KeyError):
+        service.optimize(["S0", "NOPE"])
@@ -0,0 +1,105 @@
+import pytest
+
+
+@pytest.fixture
+def replay(tmp_path):
+    import pandas as pd
+
+    from app.common.models import Security
+    from app.mkt_data.providers import ReplayProvider
+
+    provider = ReplayProvider(tmp_path)
+    index = pd.bdate_range("2024-01-01", "2024-01-31", name="Date")
+    provider.record_bars(
+        "AAPL",
+        pd.DataFrame(
+            {
+                "close": range(len(index)),
+                "high": 1.0,
+                "low": 1.0,
+                "open": 1.0,
+                "volume": 10,
+            },
+            index=index,
+            dtype="float64",
+        ),
+    )
+    provider.record_security(
+        Security(
+            symbol="AAPL",
+            isin="US0378331005",
+            shortName="Apple Inc.",
+            longName="Apple Inc.",
+            quoteType="EQUITY",
+            currency="USD",
+            exchange="NMS",
+            industryKey="consumer-electronics",
+            sectorKey="technology",
+            longBusinessSummary="",
+        ),
+    )
+    provider.record_sp500_constituents(
+        pd.DataFrame(
+            {
+                "symbol": ["AAPL"],
+                "security_name": ["Apple Inc."],
+                "gics_sector": ["Information Technology"],
+                "gics_sub_industry": ["Technology Hardware"],
+                "date_added": ["1982-11-30"],
+            },
+        ),
+    )
+    return provider
+
+
+def test_replay_provider_serves_market_data_offline(replay):
+    from app.mkt_data import market_data
+    from app.mkt_data.providers import YFinanceProvider, get_provider, use_provider
+
+    with use_provider(replay):
+        close = market_data.get_yfinance_data("AAPL", "2024-01-10", "2024-01-13")
+        assert close.tolist() == [7.0, 8.0, 9.0]
+        assert close.index.name == "Date"
+
+        security = market_data.get_yfinance_security_data("AAPL")
+        assert security.quote_type == "EQUITY"
+
+        constituents = market_data.get_sp500_constituents()
+        assert [c.symbol for c in constituents] == ["AAPL"]
+
+    assert isinstance(get_provider(), YFinanceProvider)
+
+
+def test_replay_provider_full_history_and_missing_symbol(replay):
+    bars = replay.get_bars("aapl")
+    assert len(bars) == 23
+    assert list(bars.columns) == ["close", "high", "low", "open", "volume"]
+
+    with pytest.raises(KeyError):
+        replay.get_bars("MSFT")
+
+
+def test_invalid_sp500_constituents_are_rejected(replay):
+    import pandas as pd
+
+    from app.mkt_data import market_data
+    from app.mkt_data.providers import use_provider
+
+    replay.record_sp500_constituents(
+        pd.DataFrame(
+            {
+                "symbol": ["AAPL", "MSFT"],
+                "security_name": ["Apple Inc.", "Microsoft"],
+                "gics_sector": ["Information Technology", None],
+                "gics_sub_industry": ["Technology Hardware", "Systems Software"],
+                "date_added": ["1982-11-30", "1994-06-01"],
+            },
+        ),
+    )
+    with use_provider(replay):
+        with pytest.raises(ValueError, match="gics_sector"):
+            market_data.get_sp500_constituents()
+
+        result = market_data.get_sp500_constituents_table()
+        assert result.data["symbol"].tolist() == ["AAPL"]
+        assert result.errors["index"].tolist() == [1]
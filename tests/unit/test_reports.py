@@ -0,0 +1,146 @@
+from datetime import date
+
+import pytest
+
+
+@pytest.fixture(scope="module")
+def prefect_harness():
+    from prefect.logging.handlers import APILogHandler
+    from prefect.testing.utilities import prefect_test_harness
+
+    from app import log
+    from app.flows import notifications
+
+    # State hooks deliver digests to a list instead of the SMTP relay
+    sent = []
+    dispatcher = notifications.NotificationDispatcher(lambda s, b: sent.append(s))
+    previous, notifications._dispatcher = notifications._dispatcher, dispatcher
+    with prefect_test_harness():
+        yield sent
+    dispatcher.close()
+    notifications._dispatcher = previous
+    # Prefect attaches its API handler to the app logger (extra_loggers), which
+    # warns on every log call made outside a flow by later tests
+    log.handlers[:] = [h for h in log.handlers if not isinstance(h, APILogHandler)]
+
+
+def merge_bars(db, rows):
+    import pyarrow as pa
+
+    from app.flows.ingest_bars import (
+        create_merge_tables,
+        daily_bars_table,
+        merge_table,
+    )
+    from app.mkt_data.loader import BARS_SCHEMA
+
+    data = pa.Table.from_pylist(
+        [
+            {
+                "symbol": s,
+                "date": d,
+                "open": c,
+                "high": c,
+                "low": c,
+                "close": c,
+                "volume": 100,
+            }
+            for s, d, c in rows
+        ],
+        schema=BARS_SCHEMA,
+    )
+    create_merge_tables(db, [daily_bars_table])
+    merge_table(db, daily_bars_table, data)
+
+
+@pytest.fixture
+def bars_db(prefect_harness, tmp_path):
+    # Importing the flows configures Prefect logging; the harness cleans it up
+    from app.common.database import DB
+
+    db = DB(f"sqlite:///{tmp_path / 'reports.db'}")
+    merge_bars(
+        db,
+        [
+            ("AAA", date(2024, 1, 2), 10.0),
+            ("AAA", date(2024, 1, 3), 11.0),
+            ("AAA", date(2024, 1, 4), 12.1),
+            ("BBB", date(2024, 1, 2), 20.0),
+            ("BBB", date(2024, 1, 3), 20.0),
+            ("BBB", date(2024, 1, 4), 22.0),
+        ],
+    )
+    return db
+
+
+def test_reports_refresh_only_when_upstream_changes(bars_db, tmp_path):
+    import pyarrow.parquet as pq
+
+    from app.common.table_versions import get_table_versions
+    from app.ui.reports.registry import get_reports, refresh_report
+    from app.ui.reports.store import META_KEY, ReportStore, SnapshotMeta
+
+    store = ReportStore(tmp_path / "reports", keep=2, min_age=0)
+    reports = get_reports()
+    assert {r.name for r in reports} >= {"bar_coverage", "latest_bars"}
+    assert all(refresh_report(bars_db, store, r).built for r in reports)
+
+    latest = store.read("latest_bars").to_pylist()
+    assert [(r["symbol"], r["close"]) for r in latest] == [("AAA", 12.1), ("BBB", 22.0)]
+    assert [round(r["return_1d"], 6) for r in latest] == [0.1, 0.1]
+    index = store.read("equal_weight_index")
+    assert [round(v, 6) for v in index["level"].to_pylist()] == [1.0, 1.05, 1.155]
+
+    meta = store.meta("latest_bars")
+    assert (
+        meta.upstream
+        == get_table_versions(bars_db, ["daily_bars"])
+        == {"daily_bars": 1}
+    )
+    parquet = tmp_path / "reports" / "latest_bars" / meta.snapshot / "data.parquet"
+    assert SnapshotMeta.from_json(pq.read_schema(parquet).metadata[META_KEY]) == meta
+
+    # Unchanged upstream: nothing is rebuilt
+    assert not any(refresh_report(bars_db, store, r).built for r in reports)
+
+    merge_bars(bars_db, [("AAA", date(2024, 1, 5), 13.31)])
+    assert all(refresh_report(bars_db, store, r).built for r in reports)
+    assert store.meta("latest_bars").upstream == {"daily_bars": 2}
+    assert store.read("latest_bars")["date"][0].as_py() == date(2024, 1, 5)
+
+    refresh_report(bars_db, store, reports[0], force=True)
+    snapshots = [
+        p for p in (tmp_path / "reports" / reports[0].name).iterdir() if p.is_dir()
+    ]
+    assert len(snapshots) == 2
+
+
+def test_materialize_reports_flow(bars_db, tmp_path):
+    from app.flows.materialize_reports import materialize_reports_flow
+
+    params = {"db_url": str(bars_db.db_url), "reports_dir": str(tmp_path / "reports")}
+    results = materialize_reports_flow(**params)
+    assert {r.report for r in results} >= {"bar_coverage", "latest_bars"}
+    assert materialize_reports_flow(**params) == []
+    assert [
+        r.report
+        for r in materialize_reports_flow(["latest_bars"], **params, force=True)
+    ] == ["latest_bars"]
+
+
+def test_report_store_keeps_recently_replaced_snapshots(tmp_path):
+    import pyarrow as pa
+
+    from app.ui.reports.store import ReportStore
+
+    table = pa.table({"x": [1, 2]})
+    store = ReportStore(tmp_path, keep=1)
+    for _ in range(3):
+        store.write("r", table, "v1", {}, 0.0)
+    # Replaced moments ago, so a reader may still be about to open them
+    assert len([p for p in (tmp_path / "r").iterdir() if p.is_dir()]) == 3
+
+    live = ReportStore(tmp_path, keep=2, min_age=0).write("r", table, "v1", {}, 0.0)
+    snapshots = sorted(p.name for p in (tmp_path / "r").iterdir() if p.is_dir())
+    assert len(snapshots) == 2
+    assert snapshots[-1] == live.snapshot
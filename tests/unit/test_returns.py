@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+
+@pytest.fixture(scope="module")
+def bars():
+    import pandas as pd
+
+    rng = np.random.default_rng(7)
+    dates = pd.bdate_range("2023-01-02", periods=300)
+    market = rng.normal(0, 0.01, len(dates))
+    frames = []
+    for symbol, beta in (("SPY", 1.0), ("AAA", 1.5), ("BBB", 0.5)):
+        noise = 0 if symbol == "SPY" else rng.normal(0, 0.005, len(dates))
+        close = 100 * np.exp(np.cumsum(beta * market + noise))
+        frames.append(pd.DataFrame({"symbol": symbol, "date": dates, "close": close}))
+    return pd.concat(frames, ignore_index=True)
+
+
+def test_rolling_stats_match_pandas(bars):
+    from app.analytics.returns import rolling_stats
+
+    stats = (
+        rolling_stats(bars, window=60, benchmark="SPY")
+        .collect(engine="streaming")
+        .to_pandas()
+    )
+    wide = bars.pivot_table(index="date", columns="symbol", values="close")
+    log_ret = np.log(wide).diff()
+    expected_vol = log_ret.rolling(60).std() * np.sqrt(252)
+    expected_beta = (
+        log_ret.rolling(60)
+        .cov(log_ret["SPY"])
+        .div(
+            log_ret["SPY"].rolling(60).var(),
+            axis=0,
+        )
+    )
+
+    aaa = stats[stats["symbol"] == "AAA"].set_index("date")
+    np.testing.assert_allclose(aaa["rolling_vol"], expected_vol["AAA"], rtol=1e-9)
+    # Population and sample moments cancel in the beta ratio
+    np.testing.assert_allclose(aaa["rolling_beta"], expected_beta["AAA"], rtol=1e-6)
+    assert aaa["rolling_beta"].iloc[-1] == pytest.approx(1.5, abs=0.2)
+
+
+def test_simple_returns(bars):
+    from app.analytics.returns import with_returns
+
+    ret = with_returns(bars, kind="simple").collect().to_pandas()
+    bbb = bars[bars["symbol"] == "BBB"]["close"]
+    np.testing.assert_allclose(
+        ret[ret["symbol"] == "BBB"]["ret"].to_numpy()[1:],
+        bbb.pct_change().to_numpy()[1:],
+    )
+
+
+def test_correlation_matrix_matches_pandas(bars):
+    from app.analytics.returns import correlation_matrix
+
+    gappy = bars.drop(index=bars.index[(bars["symbol"] == "BBB")][:50])
+    corr = correlation_matrix(gappy)
+    wide = gappy.pivot_table(index="date", columns="symbol", values="close")
+    expected = np.log(wide).diff().corr()
+    np.testing.assert_allclose(corr.to_numpy(), expected.to_numpy(), rtol=1e-9)
+    assert list(corr.columns) == ["AAA", "BBB", "SPY"]
@@ -0,0 +1,110 @@
+from datetime import timedelta
+
+import pytest
+
+
+def make_security(symbol):
+    from app.common.models import Security
+
+    return Security(
+        symbol=symbol,
+        isin=f"US{symbol}",
+        shortName=f"{symbol} Inc",
+        longName=f"{symbol} Incorporated",
+        quoteType="EQUITY",
+        currency="USD",
+        exchange="NMS",
+        industryKey="software",
+        sectorKey="technology",
+        longBusinessSummary="",
+    )
+
+
+@pytest.fixture
+def clock():
+    return [1_000_000.0]
+
+
+@pytest.fixture
+def fetched():
+    return []
+
+
+@pytest.fixture
+def master(tmp_path, clock, fetched):
+    from app.common.database import DB
+    from app.mkt_data.security_master import SecurityMaster
+
+    def fetch(symbol):
+        fetched.append(symbol)
+        if symbol == "BAD":
+            msg = "no such symbol"
+            raise KeyError(msg)
+        return make_security(symbol)
+
+    return SecurityMaster(
+        DB(f"sqlite:///{tmp_path / 'security_master.db'}"),
+        fetch,
+        ttl=timedelta(hours=1),
+        max_entries=3,
+        clock=lambda: clock[0],
+    )
+
+
+def test_get_serves_from_cache_until_expired(master, clock, fetched):
+    first = master.get("AAPL")
+    assert first.symbol == "AAPL"
+    assert first.short_name == "AAPL Inc"
+    assert master.get("AAPL") == first
+    assert fetched == ["AAPL"]
+
+    clock[0] += 3600
+    assert master.get_cached(["AAPL"]) == {}
+    assert master.get_cached(["AAPL"], allow_stale=True) == {"AAPL": first}
+    master.get("AAPL")
+    assert fetched == ["AAPL", "AAPL"]
+
+
+def test_refresh_fetches_once_per_symbol_and_bounds_size(master, clock, fetched):
+    errors = master.refresh(["AAPL", "MSFT", "AAPL", "BAD"])
+    assert sorted(fetched) == ["AAPL", "BAD", "MSFT"]
+    assert list(errors) == ["BAD"]
+
+    clock[0] += 1
+    master.refresh(["IBM", "NVDA"])
+    cached = master.get_cached(["AAPL", "MSFT", "IBM", "NVDA"])
+    assert len(cached) == 3
+    assert {"IBM", "NVDA"} <= set(cached)
+
+
+def test_get_many_returns_more_symbols_than_max_entries(master, clock, fetched):
+    symbols = ["A", "B", "C", "D", "E"]
+    securities = master.get_many(symbols)
+    assert list(securities) == symbols
+    assert all(securities[s].symbol == s for s in symbols)
+    # Rows written by one refresh are never trimmed by it
+    assert len(master.get_cached(symbols)) == 5
+
+    clock[0] += 1
+    master.refresh(["F"])
+    assert set(master.get_cached([*symbols, "F"])) == {"A", "B", "F"}
+
+
+def test_cache_is_shared_between_instances(master, tmp_path, clock):
+    from app.common.database import DB
+    from app.mkt_data.security_master import SecurityMaster
+
+    master.refresh(["AAPL"])
+
+    def offline(symbol):
+        msg = "network access"
+        raise AssertionError(msg)
+
+    other = SecurityMaster(
+        DB(f"sqlite:///{tmp_path / 'security_master.db'}"),
+        offline,
+        clock=lambda: clock[0],
+    )
+    assert other.get("AAPL").symbol == "AAPL"
+    clock[0] += 86_400
+    assert other.evict_expired() == 1
@@ -0,0 +1,129 @@
+import asyncio
+import time
+
+import numpy as np
+
+
+def _ticks(start, n):
+    from app.mkt_data.ticks import TICK_DTYPE
+
+    ticks = np.zeros(n, dtype=TICK_DTYPE)
+    ticks["ts"] = np.arange(start, start + n)
+    ticks["price"] = np.arange(start, start + n, dtype=np.float64)
+    return ticks
+
+
+def test_tick_ring_returns_zero_copy_views_across_wraps():
+    from app.mkt_data.ticks import TickRing
+
+    ring = TickRing(capacity=5)
+    ring.append(_ticks(0, 3))
+    ring.append(_ticks(3, 4))
+    ring.append(_ticks(7, 12))
+
+    latest = ring.latest(4)
+    assert latest["price"].tolist() == [15.0, 16.0, 17.0, 18.0]
+    assert ring.latest()["price"].tolist() == [14.0, 15.0, 16.0, 17.0, 18.0]
+    assert np.shares_memory(latest, ring._buffer)
+    assert not latest.flags.writeable
+    assert ring.count == 19
+
+
+def test_tick_ingestor_flushes_by_size_and_time(tmp_path):
+    from app.common.database import DB
+    from app.mkt_data.ticks import TickIngestor, TickStore, synthetic_ticks
+
+    db = DB(f"sqlite:///{tmp_path / 'ticks.db'}")
+    store = TickStore(db)
+    now = [0.0]
+
+    async def run():
+        ingestor = TickIngestor(
+            store.write,
+            capacity=500,
+            batch_size=2_000,
+            clock=lambda: now[0],
+        )
+        async with ingestor:
+            async for symbol, ticks in synthetic_ticks(
+                ["AAA", "BBB"],
+                2_500,
+                batch=500,
+                seed=1,
+            ):
+                await ingestor.put(symbol, ticks)
+            # The last 1,000 ticks are below batch_size and flushed by age
+            await ingestor._flush_stale()
+            assert ingestor._batch_rows == 1_000
+            now[0] += ingestor.flush_interval
+            await ingestor._flush_stale()
+            assert ingestor._batch_rows == 0
+            latest = ingestor.latest("BBB", 10)
+        return ingestor.stats, latest
+
+    stats, latest = asyncio.run(run())
+    assert stats.written == 5_000
+    assert stats.flushes == 3
+    assert len(latest) == 10
+    rows = db.fetch_all("SELECT symbol, COUNT(*) AS n FROM ticks GROUP BY symbol")
+    assert {row.symbol: row.n for row in rows} == {"AAA": 2_500, "BBB": 2_500}
+
+
+def test_tick_ingestor_retries_and_spills_failed_writes(tmp_path):
+    import pyarrow.parquet as pq
+
+    from app.mkt_data.ticks import TICKS_SCHEMA, TickIngestor
+
+    calls = []
+
+    def flaky_write(table):
+        calls.append(table.num_rows)
+        # The first batch succeeds on its third attempt, the second never does
+        if len(calls) < 3 or len(calls) > 3:
+            msg = "database unavailable"
+            raise ConnectionError(msg)
+
+    async def run():
+        ingestor = TickIngestor(
+            flaky_write,
+            batch_size=100,
+            max_retries=2,
+            backoff=0.0,
+            spill_dir=tmp_path / "spill",
+        )
+        async with ingestor:
+            await ingestor.put("AAA", _ticks(0, 100))
+            await ingestor.put("BBB", _ticks(100, 50))
+        # Stopping again, or an ingestor that never started, is a no-op
+        await ingestor.stop()
+        await TickIngestor(flaky_write).stop()
+        return ingestor.stats
+
+    stats = asyncio.run(run())
+    assert calls == [100, 100, 100, 50, 50, 50]
+    assert (stats.written, stats.spilled, stats.dropped) == (100, 50, 0)
+    [spilled] = (tmp_path / "spill").iterdir()
+    table = pq.read_table(spilled)
+    assert table.schema == TICKS_SCHEMA
+    assert table["symbol"].to_pylist() == ["BBB"] * 50
+
+
+def test_tick_ingestor_applies_backpressure():
+    from app.mkt_data.ticks import TickIngestor, synthetic_ticks
+
+    written = []
+
+    def slow_write(table):
+        time.sleep(0.02)
+        written.append(table.num_rows)
+
+    async def run():
+        async with TickIngestor(slow_write, batch_size=100, max_pending=1) as ingestor:
+            async for symbol, ticks in synthetic_ticks(["AAA"], 1_000, batch=100):
+                await ingestor.put(symbol, ticks)
+        return ingestor.stats
+
+    stats = asyncio.run(run())
+    assert stats.max_pending <= 1
+    assert stats.blocked_seconds > 0
+    assert sum(written) == stats.received == 1_000
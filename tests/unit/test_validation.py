@@ -0,0 +1,121 @@
+from datetime import date
+
+import pytest
+
+
+@pytest.fixture
+def bars():
+    import pandas as pd
+
+    return pd.DataFrame(
+        {
+            "symbol": ["AAPL", "AAPL", "AAPL", "MSFT", "MSFT"],
+            "date": [
+                "2024-01-02",
+                "2024-01-03",
+                "not a date",
+                "2024-01-02",
+                "2024-01-02",
+            ],
+            "open": [1.0, 1.0, 1.0, -1.0, 1.0],
+            "high": [2.0, 0.5, 2.0, 2.0, 2.0],
+            "low": [1.0, 1.0, 1.0, 1.0, 1.0],
+            "close": [1.5, 1.0, 1.5, 1.5, 1.5],
+            "volume": [100, 100, 100, 100, 100],
+        },
+    )
+
+
+def test_validate_bars_splits_valid_rows_and_errors(bars):
+    from app.common.validation import BARS_SCHEMA, validate
+
+    result = validate(bars, BARS_SCHEMA)
+    assert not result.ok
+    assert len(result.data) == 1
+    assert result.data["date"].iloc[0].date() == date(2024, 1, 2)
+    summary = result.summary().set_index("check")
+    assert summary.loc["high_ge_low", "rows"] == 1
+    assert summary.loc["greater_than(0)", "columns"] == "open"
+    assert summary.loc["coerce_dtype('datetime64[ns]')", "example"] == "not a date"
+    # both duplicated (symbol, date) rows are reported
+    assert summary.loc["multiple_fields_uniqueness", "rows"] == 2
+    assert set(result.errors["index"]) == {1, 2, 3, 4}
+
+
+@pytest.mark.parametrize("backend", ["arrow", "polars"])
+def test_validate_returns_input_type(bars, backend):
+    import polars as pl
+    import pyarrow as pa
+
+    from app.common.validation import BARS_SCHEMA, validate
+
+    clean = bars.iloc[[0]].assign(date=[date(2024, 1, 2)])
+    table = pa.Table.from_pandas(clean, preserve_index=False)
+    data = table if backend == "arrow" else pl.from_arrow(table)
+    result = validate(data, BARS_SCHEMA)
+    assert result.ok
+    assert type(result.data) is type(data)
+    assert result.data.schema == data.schema
+
+
+def test_validate_models_are_built_on_demand():
+    import pandas as pd
+
+    from app.common.models import SP500Constituent
+    from app.common.validation import validate
+
+    tickers = pd.DataFrame(
+        {
+            "symbol": ["AAPL", "MSFT"],
+            "security_name": ["Apple Inc.", "Microsoft"],
+            "gics_sector": ["Information Technology", None],
+            "gics_sub_industry": ["Technology Hardware", "Systems Software"],
+            "headquarters_location": ["Cupertino", "Redmond"],
+            "date_added": ["1982-11-30", "1994-06-01"],
+        },
+    )
+    result = validate(tickers, SP500Constituent)
+    assert result.errors["column"].tolist() == ["gics_sector"]
+    [apple] = result.models(SP500Constituent)
+    assert apple == SP500Constituent(
+        symbol="AAPL",
+        security_name="Apple Inc.",
+        gics_sector="Information Technology",
+        gics_sub_industry="Technology Hardware",
+        date_added=date(1982, 11, 30),
+    )
+
+
+def test_validate_revalidates_aliased_models():
+    import pandas as pd
+
+    from app.common.models import Security
+    from app.common.validation import validate
+
+    securities = pd.DataFrame(
+        {
+            "symbol": ["AAPL", "BAD"],
+            "isin": ["US0378331005", ""],
+            "shortName": ["Apple Inc.", "Bad"],
+            "longName": ["Apple Inc.", "Bad"],
+            "quoteType": ["EQUITY", "EQUITY"],
+            "currency": ["USD", "DOLLARS"],
+            "exchange": ["NMS", "NMS"],
+            "industryKey": ["consumer-electronics", ""],
+            "sectorKey": ["technology", ""],
+            "longBusinessSummary": ["", ""],
+        },
+    )
+    result = validate(securities, Security)
+    assert result.errors["column"].tolist() == ["currency"]
+    [apple] = result.models(Security, revalidate=True)
+    assert apple == Security.model_validate(securities.iloc[0].to_dict())
+    assert apple.short_name == "Apple Inc."
+
+
+def test_validate_missing_column_rejects_table(bars):
+    from app.common.validation import BARS_SCHEMA, validate
+
+    result = validate(bars.drop(columns="close"), BARS_SCHEMA)
+    assert result.data.empty
+    assert "column_in_dataframe" in result.errors["check"].tolist()
@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def market():
+    rng = np.random.default_rng(11)
+    underliers = ["AAA", "BBB", "CCC"]
+    prices = pd.DataFrame(
+        100 * np.exp(np.cumsum(rng.normal(0, 0.02, (400, 3)), axis=0)),
+        columns=underliers,
+    )
+    spot = prices.iloc[-1]
+    book = pd.DataFrame(
+        {
+            "underlier": ["AAA", "AAA", "BBB", "CCC", "CCC"],
+            "option_type": ["call", "put", "call", "put", "Call"],
+            "strike": spot[["AAA", "AAA", "BBB", "CCC", "CCC"]].to_numpy() * 1.05,
+            "time_to_expiry": [0.5, 0.25, 1.0, 0.1, 2.0],
+            "sigma": [0.2, 0.25, 0.3, 0.35, 0.2],
+            "quantity": [10, -5, 3, 8, -2],
+        },
+    )
+    return prices, spot, book
+
+
+def test_value_at_risk_revalues_every_scenario():
+    from app.options.blackscholes import black_scholes_vectorized
+    from app.risk.var import Scenarios, value_at_risk
+
+    book = pd.DataFrame(
+        {
+            "underlier": ["AAA"],
+            "option_type": ["call"],
+            "strike": [100.0],
+            "time_to_expiry": [0.5],
+            "sigma": [0.2],
+            "quantity": [2],
+            "multiplier": [100],
+        },
+    )
+    shocks = np.log(np.array([[0.9], [0.95], [1.0], [1.05]]))
+    scenarios = Scenarios(["AAA"], shocks, np.zeros_like(shocks))
+
+    result = value_at_risk(
+        book,
+        pd.Series({"AAA": 100.0}),
+        scenarios,
+        confidence=0.5,
+    )
+
+    base = black_scholes_vectorized(100.0, 100.0, 0.5, 0.0, 0.2)
+    shocked = black_scholes_vectorized(
+        100 * np.exp(shocks[:, 0]),
+        100.0,
+        0.5 - 1 / 252,
+        0.0,
+        0.2,
+    )
+    np.testing.assert_allclose(result.pnl, (shocked - base) * 200)
+    assert result.var == pytest.approx(-result.pnl[1])
+    assert result.expected_shortfall == pytest.approx(-result.pnl[:2].mean())
+    assert result.components["component_es"].sum() == pytest.approx(
+        result.expected_shortfall,
+    )
+
+
+def test_value_at_risk_chunked_and_parallel_runs_agree(market):
+    from app.risk.var import historical_scenarios, monte_carlo_scenarios, value_at_risk
+
+    prices, spot, book = market
+    scenarios = historical_scenarios(prices, horizon=5)
+    assert scenarios.spot_shocks.shape == (395, 3)
+
+    serial = value_at_risk(book, spot, scenarios, horizon_days=5)
+    parallel = value_at_risk(
+        book,
+        spot,
+        scenarios,
+        horizon_days=5,
+        max_cells=500,
+        max_workers=2,
+    )
+    np.testing.assert_allclose(parallel.pnl, serial.pnl)
+    assert parallel.var == pytest.approx(serial.var)
+    assert serial.components["component_var"].sum() == pytest.approx(serial.var)
+
+    simulated = monte_carlo_scenarios(prices, n_scenarios=2000, seed=5)
+    assert len(simulated) == 2000
+    result = value_at_risk(book, spot, simulated, confidence=0.975)
+    assert result.expected_shortfall >= result.var > 0
+
+
+def test_value_at_risk_rejects_unknown_underliers(market):
+    from app.risk.var import historical_scenarios, value_at_risk
+
+    prices, spot, book = market
+    book.loc[0, "underlier"] = "ZZZ"
+    with pytest.raises(ValueError, match="ZZZ"):
+        value_at_risk(book, spot, historical_scenarios(prices))